@@ -0,0 +1,92 @@
+"""
+CPU cost of turning a DynamoDB read of restaurants into a JSON response body:
+
+* resource: boto3's `TypeDeserializer` (what `boto3.resource("dynamodb")` runs on every item), then the default
+  serializer of the resolver, which converts the `Decimal`s back
+* low-level: the schema-aware conversion of `restaurant_store` from AttributeValues to JSON-ready types, then
+  `fast_json` (`orjson` when installed)
+
+The items are synthetic AttributeValues, as returned by the low-level client, so no DynamoDB is needed:
+
+    PYTHONPATH=src/layers/shared python benchmarks/dynamodb_deserialization.py --items 1000 10000 100000
+"""
+import argparse
+import json
+import statistics
+import time
+from collections.abc import Callable
+from functools import partial
+
+from aws_lambda_powertools.shared.json_encoder import Encoder
+from boto3.dynamodb.types import TypeDeserializer
+
+from big_mouth import fast_json, restaurant_store
+
+THEMES = ["cartoon", "netflix", "movie", "rick and morty", "toy story", "harry potter", "true blood", "house of cards"]
+
+
+def low_level_items(count: int) -> list[dict]:
+    return [
+        {
+            "name": {"S": f"restaurant {i:07d}"},
+            "image": {"S": f"https://d2qt42rcwzspd6.cloudfront.net/manning/restaurant-{i:07d}.png"},
+            "themes": {"L": [{"S": THEMES[i % len(THEMES)]}, {"S": THEMES[(i * 7 + 3) % len(THEMES)]}]},
+        }
+        for i in range(count)
+    ]
+
+
+def resource_path() -> tuple[Callable[[dict], dict], Callable[[list], str]]:
+    deserializer = TypeDeserializer()
+
+    def deserialize(item: dict) -> dict:
+        return {name: deserializer.deserialize(value) for name, value in item.items()}
+
+    # default serializer of APIGatewayRestResolver
+    return deserialize, partial(json.dumps, separators=(",", ":"), cls=Encoder)
+
+
+def low_level_path() -> tuple[Callable[[dict], dict], Callable[[list], str]]:
+    return restaurant_store.to_restaurant, fast_json.dumps
+
+
+def measure(items: list[dict], deserialize: Callable, serialize: Callable, repeat: int) -> tuple[float, float, int]:
+    """
+    Median (deserialization, serialization) durations in seconds, and body size in bytes.
+    """
+    deserialize_durations, serialize_durations = [], []
+    body = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        restaurants = [deserialize(item) for item in items]
+        deserialize_durations.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        body = serialize(restaurants)
+        serialize_durations.append(time.perf_counter() - start)
+    return statistics.median(deserialize_durations), statistics.median(serialize_durations), len(body.encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print("JSON encoder: orjson" if fast_json.orjson else "JSON encoder: json (install `orjson` for the fast encoder)")
+    print("| items   | path      | deserialize (ms) | serialize (ms) | total (ms) | speedup | body (KB) |")
+    print("|---------|-----------|------------------|----------------|------------|---------|-----------|")
+    for count in args.items:
+        items = low_level_items(count)
+        baseline = None
+        for path_name, path in [("resource", resource_path), ("low-level", low_level_path)]:
+            deserialize_seconds, serialize_seconds, body_size = measure(items, *path(), repeat=args.repeat)
+            total = deserialize_seconds + serialize_seconds
+            baseline = baseline or total
+            print(f"| {count:>7} | {path_name:<9} | {deserialize_seconds * 1000:>16.1f} "
+                  f"| {serialize_seconds * 1000:>14.1f} | {total * 1000:>10.1f} | {baseline / total:>6.1f}x "
+                  f"| {body_size / 1024:>9.0f} |")
+
+
+if __name__ == "__main__":
+    main()
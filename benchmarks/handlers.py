@@ -0,0 +1,620 @@
+"""
+Cold start and per invocation cost of each function handler, invoked locally with synthetic API Gateway and
+EventBridge events, against local AWS stand-ins.
+
+Each scenario runs in a fresh interpreter, as in a new execution environment, and reports:
+
+* init: import of the handler module, i.e. the init phase of the cold start
+* first: duration of the first invocation, which creates the clients left out of the init (see `bootstrap`)
+* p50/p95/p99: durations of the warm invocations that follow, after the warm-up invocations of the scenario (e.g. one
+  per searched theme, whose first search misses the cache)
+* peak RSS of the interpreter
+* AWS calls made during the init, and per warm invocation
+
+By default, the tables, parameters, event bus and topic are created in an in-process `moto` server. Another stand-in
+(`moto_server`, DynamoDB local for the tables...) can be used instead:
+
+    PYTHONPATH=src/layers/shared python benchmarks/handlers.py
+    PYTHONPATH=src/layers/shared python benchmarks/handlers.py --endpoint-url http://localhost:5000
+
+The results are compared with the baselines (benchmarks/baselines/handlers.json): the run fails when a duration or the
+peak RSS exceeds its baseline by more than the tolerances, or when a handler makes more AWS calls than its baseline.
+The first invocation is a single sample, dominated by the creation of the clients: it is recorded, not compared.
+Durations depend on the machine: record the baselines where the comparison runs, e.g. on the CI runner:
+
+    PYTHONPATH=src/layers/shared python benchmarks/handlers.py --update-baselines
+
+The functions run on python 3.12: so should the benchmark.
+"""
+import argparse
+import importlib
+import importlib.abc
+import importlib.util
+import json
+import logging
+import math
+import os
+import platform
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+BASELINES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "handlers.json")
+
+SERVICE_NAME = "production-ready-serverless"
+MATURITY_LEVEL = "bench"
+
+TABLE_NAME = "bench_restaurants"
+INDEX_TABLE_NAME = "bench_restaurant_index"
+IDEMPOTENCY_TABLE_NAME = "bench_idempotency"
+ORDERS_TABLE_NAME = "bench_orders"
+# order polled by the get_order scenario
+BENCH_ORDER_ID = "01J00000000000000000000000"
+# orders of the restaurant of the restaurant_orders scenario
+FEED_ORDER_COUNT = 500
+EVENT_BUS_NAME = "bench_order_events"
+TOPIC_NAME = "bench_restaurant_notifications"
+
+SSM_PARAMETERS = {
+    "get_restaurants/config": json.dumps({"defaultResults": 8}),
+    "search_restaurants/config": json.dumps({"defaultResults": 8}),
+    "pagination/secrets": "secret",
+}
+
+THEMES = ["cartoon", "netflix", "movie", "rick and morty", "toy story", "harry potter", "true blood", "house of cards"]
+
+# durations are noisy, memory less so, AWS calls not at all
+DURATION_METRICS = ("init_ms", "p50_ms", "p95_ms", "p99_ms")
+MEMORY_METRICS = ("peak_rss_mb",)
+CALL_METRICS = ("init_aws_calls", "aws_calls_per_invocation")
+# recorded with the baselines, but too noisy to be compared
+RECORDED_METRICS = ("first_ms",)
+
+
+def api_event(method: str, path: str, query: dict | None = None, body: dict | None = None) -> dict:
+    """
+    REST API proxy event, as forwarded by API Gateway.
+    """
+    return {
+        "resource": path,
+        "path": path,
+        "httpMethod": method,
+        "headers": {
+            "Accept": "application/json, text/html",
+            "Accept-Encoding": "gzip, deflate, br",
+            "Content-Type": "application/json",
+        },
+        "multiValueHeaders": {},
+        "queryStringParameters": query,
+        "multiValueQueryStringParameters": None,
+        "pathParameters": None,
+        "requestContext": {
+            "resourcePath": path,
+            "httpMethod": method,
+            "path": f"/bench{path}",
+            "stage": "bench",
+            "requestId": "bench",
+        },
+        "body": json.dumps(body) if body is not None else None,
+        "isBase64Encoded": False,
+    }
+
+
+def order_placed_event(i: int) -> dict:
+    return {
+        "version": "0",
+        "id": f"bench-{i}",
+        "detail-type": "order_placed",
+        "source": "big-mouth",
+        "account": "123456789012",
+        "time": "2024-01-01T00:00:00Z",
+        "region": "eu-central-1",
+        "resources": [],
+        # a new order per invocation, otherwise the idempotent handler replays the first result
+        "detail": {"orderId": f"bench-order-{i}", "restaurantName": "restaurant 0000"},
+    }
+
+
+@dataclass(frozen=True)
+class Scenario:
+    function: str
+    environment: dict[str, str]
+    # event of the i-th invocation
+    event: Callable[[int], dict]
+    # warm invocations left out of the measures, e.g. the first one of each event whose result is cached
+    warmup: int = 0
+
+
+def ssm_snapshot(*parameters: str) -> dict[str, str]:
+    """
+    Shared context parameters baked into the environment, as by `svend_l3.ssm_snapshot` at deployment. The naming
+    is repeated from `big_mouth.config`: importing it here would import botocore before its calls are counted.
+    """
+    return {
+        "SSM_SNAPSHOT_TAKEN_AT": str(int(time.time())),
+        **{
+            "SSM_SNAPSHOT_" + re.sub(r"[^A-Za-z0-9]", "_", parameter).upper(): SSM_PARAMETERS[parameter]
+            for parameter in parameters
+        }
+    }
+
+
+def scenarios(topic_arn: str) -> dict[str, Scenario]:
+    tables = {"TABLE_NAME": TABLE_NAME, "INDEX_TABLE_NAME": INDEX_TABLE_NAME}
+    return {
+        "get_index": Scenario(
+            function="get_index",
+            environment={
+                **tables,
+                # the restaurants API is not available locally: the catalog is read from the table
+                "INDEX_DATA_SOURCE": "dynamodb",
+                "RESTAURANTS_API_URL": "https://example.com/restaurants",
+                "ORDER_API_URL": "https://example.com/orders",
+                "COGNITO_USER_POOL_ID": "eu-central-1_example",
+                "COGNITO_CLIENT_ID": "example",
+            },
+            event=lambda i: api_event("GET", "/"),
+        ),
+        "get_restaurants": Scenario(
+            function="get_restaurants",
+            environment=tables,
+            event=lambda i: api_event("GET", "/restaurants", query={"limit": "8"}),
+        ),
+        "get_restaurants_bulk": Scenario(
+            function="get_restaurants",
+            environment=tables,
+            event=lambda i: api_event("GET", "/restaurants", query={"bulk": "true"}),
+        ),
+        # deployed with the SSM snapshot: the cold start does not call SSM, the cursor key is read by the first page
+        "get_restaurants_snapshot": Scenario(
+            function="get_restaurants",
+            environment={**tables, **ssm_snapshot("get_restaurants/config")},
+            event=lambda i: api_event("GET", "/restaurants", query={"limit": "8"}),
+        ),
+        # no cursor at all: SSM is never called
+        "get_restaurants_bulk_snapshot": Scenario(
+            function="get_restaurants",
+            environment={**tables, **ssm_snapshot("get_restaurants/config")},
+            event=lambda i: api_event("GET", "/restaurants", query={"bulk": "true"}),
+        ),
+        "search_restaurants": Scenario(
+            function="search_restaurants",
+            environment=tables,
+            event=lambda i: api_event("POST", "/restaurants/search", body={"theme": THEMES[i % len(THEMES)]}),
+            # the first search of each theme queries the index, the next ones are served by the cache
+            warmup=len(THEMES),
+        ),
+        "place_order": Scenario(
+            function="place_order",
+            environment={"EVENT_BUS_NAME": EVENT_BUS_NAME, "ORDERS_TABLE_NAME": ORDERS_TABLE_NAME},
+            event=lambda i: api_event("POST", "/orders", body={"restaurantName": "restaurant 0000"}),
+        ),
+        # catering: 50 orders per invocation, i.e. 5 PutEvents calls
+        "place_order_batch": Scenario(
+            function="place_order",
+            environment={"EVENT_BUS_NAME": EVENT_BUS_NAME, "ORDERS_TABLE_NAME": ORDERS_TABLE_NAME},
+            event=lambda i: api_event(
+                "POST",
+                "/orders/batch",
+                body={"orders": [{"restaurantName": f"restaurant {j:04d}"} for j in range(50)]}
+            ),
+        ),
+        # status polling: mostly hits of the warm-container cache
+        "get_order": Scenario(
+            function="get_orders",
+            environment={"ORDERS_TABLE_NAME": ORDERS_TABLE_NAME},
+            event=lambda i: api_event("GET", f"/orders/{BENCH_ORDER_ID}"),
+        ),
+        # dashboard refresh: the 20 most recent orders of a restaurant
+        "restaurant_orders": Scenario(
+            function="get_orders",
+            environment={"ORDERS_TABLE_NAME": ORDERS_TABLE_NAME},
+            event=lambda i: api_event("GET", "/restaurants/restaurant%200001/orders", query={"limit": "20"}),
+        ),
+        "notify_restaurant": Scenario(
+            function="notify_restaurant",
+            environment={
+                "EVENT_BUS_NAME": EVENT_BUS_NAME,
+                "IDEMPOTENCY_TABLE_NAME": IDEMPOTENCY_TABLE_NAME,
+                "TOPIC_ARN": topic_arn,
+            },
+            event=order_placed_event,
+        ),
+    }
+
+
+def create_resources(endpoint_url: str, restaurant_count: int) -> str:
+    """
+    Creates (or recreates) the resources used by the functions, and returns the ARN of the notification topic.
+    """
+    import boto3
+    from big_mouth import ulid
+    from big_mouth.order_store import RESTAURANT_ORDERS_INDEX, OrderStore, new_order
+    from big_mouth.restaurant_writer import RestaurantWriter
+
+    dynamo_resource = boto3.resource("dynamodb", endpoint_url=endpoint_url)
+    dynamo_client = dynamo_resource.meta.client
+    existing_tables = dynamo_client.list_tables()["TableNames"]
+    tables = {
+        TABLE_NAME: [("name", "HASH")],
+        INDEX_TABLE_NAME: [("pk", "HASH"), ("sk", "RANGE")],
+        IDEMPOTENCY_TABLE_NAME: [("id", "HASH")],
+        ORDERS_TABLE_NAME: [("id", "HASH")],
+    }
+    indexes = {
+        ORDERS_TABLE_NAME: {RESTAURANT_ORDERS_INDEX: [("restaurantName", "HASH"), ("createdAt", "RANGE")]},
+    }
+    for table_name, keys in tables.items():
+        if table_name in existing_tables:
+            dynamo_client.delete_table(TableName=table_name)
+            dynamo_client.get_waiter("table_not_exists").wait(TableName=table_name)
+        table_indexes = indexes.get(table_name, {})
+        index_kwargs = {
+            "GlobalSecondaryIndexes": [
+                {
+                    "IndexName": index_name,
+                    "KeySchema": [{"AttributeName": name, "KeyType": key_type} for name, key_type in index_keys],
+                    "Projection": {"ProjectionType": "ALL"}
+                }
+                for index_name, index_keys in table_indexes.items()
+            ]
+        } if table_indexes else {}
+        attributes = dict.fromkeys(
+            [name for name, _ in keys]
+            + [name for index_keys in table_indexes.values() for name, _ in index_keys]
+        )
+        dynamo_client.create_table(
+            TableName=table_name,
+            KeySchema=[{"AttributeName": name, "KeyType": key_type} for name, key_type in keys],
+            AttributeDefinitions=[{"AttributeName": name, "AttributeType": "S"} for name in attributes],
+            BillingMode="PAY_PER_REQUEST",
+            **index_kwargs
+        )
+        dynamo_client.get_waiter("table_exists").wait(TableName=table_name)
+
+    restaurant_writer = RestaurantWriter(TABLE_NAME, INDEX_TABLE_NAME, dynamo_resource=dynamo_resource)
+    for i in range(restaurant_count):
+        restaurant_writer.put({
+            "name": f"restaurant {i:04d}",
+            "image": f"https://d2qt42rcwzspd6.cloudfront.net/manning/restaurant-{i:04d}.png",
+            "themes": [THEMES[i % len(THEMES)], THEMES[(i * 7 + 3) % len(THEMES)]]
+        })
+
+    # the client of a resource serializes python values itself: the store needs a plain one
+    orders = OrderStore(ORDERS_TABLE_NAME, dynamo_client=boto3.client("dynamodb", endpoint_url=endpoint_url))
+    orders.put_order(new_order(BENCH_ORDER_ID, "restaurant 0000"))
+    # order feed of a busy restaurant
+    orders.put_orders([new_order(order_id, "restaurant 0001") for order_id in ulid.new_many(FEED_ORDER_COUNT)])
+
+    ssm = boto3.client("ssm", endpoint_url=endpoint_url)
+    for suffix, value in SSM_PARAMETERS.items():
+        ssm.put_parameter(
+            Name=f"/{SERVICE_NAME.replace('-', '_')}/shared_context/{MATURITY_LEVEL}/{suffix}",
+            Value=value,
+            Type="String",
+            Overwrite=True
+        )
+
+    events = boto3.client("events", endpoint_url=endpoint_url)
+    if not any(bus["Name"] == EVENT_BUS_NAME for bus in events.list_event_buses()["EventBuses"]):
+        events.create_event_bus(Name=EVENT_BUS_NAME)
+
+    return boto3.client("sns", endpoint_url=endpoint_url).create_topic(Name=TOPIC_NAME)["TopicArn"]
+
+
+@dataclass(frozen=True)
+class Result:
+    init_ms: float
+    first_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    peak_rss_mb: float
+    init_aws_calls: int
+    aws_calls_per_invocation: float
+    # (service.operation: count) of the warm invocations
+    aws_calls: dict[str, int]
+
+
+class LambdaContext:
+    function_name = "bench"
+    function_version = "$LATEST"
+    invoked_function_arn = "arn:aws:lambda:eu-central-1:123456789012:function:bench"
+    memory_limit_in_mb = 1024
+    aws_request_id = "bench"
+    log_group_name = "/aws/lambda/bench"
+    log_stream_name = "bench"
+
+    def __init__(self, timeout_seconds: float = 30):
+        self._deadline = time.monotonic() + timeout_seconds
+
+    def get_remaining_time_in_millis(self) -> int:
+        return int((self._deadline - time.monotonic()) * 1000)
+
+
+class CountAwsCalls(importlib.abc.MetaPathFinder):
+    """
+    Counts the API calls of all the botocore clients of the interpreter, including the ones created by libraries.
+    botocore is patched when the handler imports it, so that its import is still part of the init.
+    """
+
+    def __init__(self):
+        self.calls = Counter()
+        sys.meta_path.insert(0, self)
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname != "botocore.client":
+            return None
+        sys.meta_path.remove(self)
+        spec = importlib.util.find_spec(fullname)
+        exec_module = spec.loader.exec_module
+
+        def exec_and_patch(module):
+            exec_module(module)
+            self.patch(module.BaseClient)
+
+        spec.loader.exec_module = exec_and_patch
+        return spec
+
+    def patch(self, client_class) -> None:
+        make_api_call = client_class._make_api_call
+
+        def counting_make_api_call(client, operation_name, api_params):
+            self.calls[f"{client.meta.service_model.service_name}.{operation_name}"] += 1
+            return make_api_call(client, operation_name, api_params)
+
+        client_class._make_api_call = counting_make_api_call
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of the interpreter. `ru_maxrss` also covers the parent process before `exec`, the high
+    water mark of `/proc` does not.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("VmHWM:")) / 1024
+    except FileNotFoundError:
+        import resource
+        # bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 / 1024
+
+
+def run_scenario(scenario: Scenario, invocations: int) -> Result:
+    """
+    Runs in the child interpreter: imports the handler, then invokes it.
+    """
+    calls = CountAwsCalls().calls
+
+    start = time.perf_counter()
+    module = importlib.import_module(scenario.function)
+    init_ms = (time.perf_counter() - start) * 1000
+    init_aws_calls = sum(calls.values())
+    calls.clear()
+
+    durations_ms = []
+    # the first invocation is part of the cold start, the warm-up ones are not measured either
+    skipped = 1 + scenario.warmup
+    for i in range(skipped + invocations):
+        event = scenario.event(i)
+        start = time.perf_counter()
+        response = module.handler(event, LambdaContext())
+        durations_ms.append((time.perf_counter() - start) * 1000)
+        if isinstance(response, dict) and response.get("statusCode", 200) >= 400:
+            raise RuntimeError(f"invocation failed: {response}")
+        if i < skipped:
+            calls.clear()
+
+    first_ms, warm_ms = durations_ms[0], durations_ms[skipped:]
+    percentiles = statistics.quantiles(warm_ms, n=100, method="inclusive")
+    return Result(
+        init_ms=init_ms,
+        first_ms=first_ms,
+        p50_ms=statistics.median(warm_ms),
+        p95_ms=percentiles[94],
+        p99_ms=percentiles[98],
+        peak_rss_mb=peak_rss_mb(),
+        init_aws_calls=init_aws_calls,
+        aws_calls_per_invocation=sum(calls.values()) / invocations,
+        aws_calls=dict(sorted(calls.items())),
+    )
+
+
+def child_environment(scenario: Scenario, endpoint_url: str) -> dict[str, str]:
+    return {
+        **os.environ,
+        **scenario.environment,
+        "POWERTOOLS_SERVICE_NAME": SERVICE_NAME,
+        "POWERTOOLS_METRICS_NAMESPACE": SERVICE_NAME,
+        "MATURITY_LEVEL": MATURITY_LEVEL,
+        "AWS_ENDPOINT_URL": endpoint_url,
+        "AWS_REGION": os.environ["AWS_DEFAULT_REGION"],
+        # the X-Ray SDK is still imported and patches botocore, but there is no daemon to send the segments to
+        "POWERTOOLS_TRACE_DISABLED": "true",
+        "AWS_XRAY_CONTEXT_MISSING": "IGNORE_ERROR",
+        # the handlers log every request: only the measures are printed
+        "POWERTOOLS_LOG_LEVEL": "ERROR",
+        "PYTHONPATH": os.pathsep.join([
+            os.path.join(ROOT, "src", "layers", "shared"),
+            os.path.join(ROOT, "src", "functions", scenario.function),
+            os.path.join(ROOT, "benchmarks"),
+        ]),
+    }
+
+
+def benchmark(name: str, scenario: Scenario, endpoint_url: str, invocations: int) -> Result | None:
+    """
+    Runs the scenario in a fresh interpreter. None if the handler could not be imported or invoked.
+    """
+    script = (
+        "import json, dataclasses, handlers\n"
+        f"scenario = handlers.scenarios({json.dumps(scenario.environment.get('TOPIC_ARN', ''))})[{name!r}]\n"
+        f"result = handlers.run_scenario(scenario, {invocations})\n"
+        "print('RESULT=' + json.dumps(dataclasses.asdict(result)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        env=child_environment(scenario, endpoint_url),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"exit code {result.returncode}"
+        print(f"{name}: failed ({error})", file=sys.stderr)
+        return None
+    return Result(**json.loads(result.stdout.split("RESULT=")[-1]))
+
+
+def regressions(
+        results: dict[str, Result | None],
+        baselines: dict[str, dict],
+        duration_tolerance: float,
+        duration_noise_ms: float,
+        memory_tolerance: float,
+        memory_noise_mb: float
+) -> list[str]:
+    found = []
+    for name, baseline in baselines.items():
+        if name not in results:
+            continue
+        result = results[name]
+        if result is None:
+            found.append(f"{name}: failed")
+            continue
+        measures = asdict(result)
+        # (relative tolerance, absolute margin): the tail of short durations is dominated by the noise of the machine
+        margins = {
+            **{metric: (duration_tolerance, duration_noise_ms) for metric in DURATION_METRICS},
+            **{metric: (memory_tolerance, memory_noise_mb) for metric in MEMORY_METRICS},
+            **{metric: (0, 1e-9) for metric in CALL_METRICS},
+        }
+        for metric, (tolerance, margin) in margins.items():
+            if metric in baseline and measures[metric] > baseline[metric] * (1 + tolerance) + margin:
+                found.append(f"{name}: {metric} {measures[metric]:.2f} > baseline {baseline[metric]:.2f}")
+    return found
+
+
+def environment_description() -> dict[str, str]:
+    return {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint-url", help="local AWS stand-in, an in-process moto server by default")
+    parser.add_argument("--scenarios", nargs="+", help="all by default")
+    parser.add_argument("--invocations", type=int, default=200, help="warm invocations per scenario")
+    parser.add_argument("--restaurants", type=int, default=100)
+    parser.add_argument("--baselines", default=BASELINES_FILE)
+    parser.add_argument("--update-baselines", action="store_true", help="records the results as the new baselines")
+    parser.add_argument("--duration-tolerance", type=float, default=0.5)
+    parser.add_argument("--duration-noise-ms", type=float, default=15)
+    parser.add_argument("--memory-tolerance", type=float, default=0.1)
+    parser.add_argument("--memory-noise-mb", type=float, default=5)
+    args = parser.parse_args()
+
+    # local stand-ins accept any credentials
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "local")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "local")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "eu-central-1")
+
+    endpoint_url = args.endpoint_url
+    moto_server = None
+    if not endpoint_url:
+        from moto.server import ThreadedMotoServer
+
+        # the server logs every request
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+        port = free_port()
+        moto_server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+        moto_server.start()
+        endpoint_url = f"http://127.0.0.1:{port}"
+
+    try:
+        topic_arn = create_resources(endpoint_url, args.restaurants)
+        all_scenarios = scenarios(topic_arn)
+        names = args.scenarios or list(all_scenarios)
+        results = {name: benchmark(name, all_scenarios[name], endpoint_url, args.invocations) for name in names}
+    finally:
+        if moto_server:
+            moto_server.stop()
+
+    print("| scenario             | init (ms) | first (ms) | p50 (ms) | p95 (ms) | p99 (ms) | peak RSS (MB) "
+          "| init AWS calls | AWS calls / invocation |")
+    print("|----------------------|-----------|------------|----------|----------|----------|---------------"
+          "|----------------|------------------------|")
+    for name, result in results.items():
+        if result is None:
+            continue
+        print(f"| {name:<20} | {result.init_ms:>9.0f} | {result.first_ms:>10.1f} | {result.p50_ms:>8.2f} "
+              f"| {result.p95_ms:>8.2f} | {result.p99_ms:>8.2f} | {result.peak_rss_mb:>13.1f} "
+              f"| {result.init_aws_calls:>14} | {result.aws_calls_per_invocation:>22.2f} |")
+
+    for name, result in results.items():
+        if result and result.aws_calls:
+            calls = ", ".join(f"{call} x{count / args.invocations:g}" for call, count in result.aws_calls.items())
+            print(f"\n{name}: {calls} per invocation")
+
+    if args.update_baselines:
+        baselines = {"environment": environment_description(), "scenarios": {}}
+        if os.path.exists(args.baselines):
+            with open(args.baselines) as f:
+                baselines["scenarios"] = json.load(f)["scenarios"]
+        for name, result in results.items():
+            if result is not None:
+                baselines["scenarios"][name] = {
+                    **{
+                        metric: round(getattr(result, metric), 2)
+                        for metric in DURATION_METRICS + RECORDED_METRICS + MEMORY_METRICS
+                    },
+                    **{metric: getattr(result, metric) for metric in CALL_METRICS},
+                }
+        os.makedirs(os.path.dirname(args.baselines), exist_ok=True)
+        with open(args.baselines, "w") as f:
+            json.dump(baselines, f, indent=2)
+            f.write("\n")
+        print(f"\nbaselines written to {args.baselines}")
+        return
+
+    if not os.path.exists(args.baselines):
+        print(f"\nno baselines in {args.baselines}, run with --update-baselines to record them")
+        return
+
+    with open(args.baselines) as f:
+        baselines = json.load(f)
+    duration_tolerance, memory_tolerance = args.duration_tolerance, args.memory_tolerance
+    if baselines["environment"] != environment_description():
+        # durations and memory are not comparable across machines and python versions, AWS calls are
+        print(f"\nwarning: baselines recorded on {baselines['environment']}, comparing on {environment_description()}: "
+              f"only the AWS calls are compared")
+        duration_tolerance = memory_tolerance = math.inf
+
+    found = regressions(
+        results,
+        baselines["scenarios"],
+        duration_tolerance,
+        args.duration_noise_ms,
+        memory_tolerance,
+        args.memory_noise_mb
+    )
+    if found:
+        print("\nregressions:\n" + "\n".join(f"* {regression}" for regression in found))
+        sys.exit(1)
+    print("\nno regression")
+
+
+if __name__ == "__main__":
+    main()
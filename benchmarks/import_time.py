@@ -0,0 +1,162 @@
+"""
+Import time profile of each function, i.e. the part of the cold start spent importing and initializing the handler
+module, à la `python -X importtime`.
+
+Each handler module is imported in a fresh interpreter, with the environment variables it expects. The functions
+reading their configuration at init need SSM: point them to a local stand-in (e.g. `moto_server`), in which the
+parameters are created:
+
+    PYTHONPATH=src/layers/shared \\
+      python benchmarks/import_time.py --endpoint-url http://localhost:5000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+import boto3
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+SERVICE_NAME = "production-ready-serverless"
+MATURITY_LEVEL = "bench"
+
+FUNCTIONS = {
+    "get_index": {
+        "RESTAURANTS_API_URL": "https://example.com/restaurants",
+        "ORDER_API_URL": "https://example.com/orders",
+        "COGNITO_USER_POOL_ID": "eu-central-1_example",
+        "COGNITO_CLIENT_ID": "example",
+    },
+    "get_restaurants": {
+        "TABLE_NAME": "restaurants",
+        "INDEX_TABLE_NAME": "restaurant_index",
+    },
+    "search_restaurants": {
+        "TABLE_NAME": "restaurants",
+        "INDEX_TABLE_NAME": "restaurant_index",
+    },
+    "place_order": {
+        "EVENT_BUS_NAME": "order_events",
+        "ORDERS_TABLE_NAME": "orders",
+    },
+    "get_orders": {
+        "ORDERS_TABLE_NAME": "orders",
+    },
+    "notify_restaurant": {
+        "EVENT_BUS_NAME": "order_events",
+        "IDEMPOTENCY_TABLE_NAME": "idempotency",
+        "TOPIC_ARN": "arn:aws:sns:eu-central-1:123456789012:restaurant_notifications",
+    },
+}
+
+SSM_PARAMETERS = {
+    "get_restaurants/config": json.dumps({"defaultResults": 8}),
+    "search_restaurants/config": json.dumps({"defaultResults": 8}),
+    "pagination/secrets": "secret",
+}
+
+# runs in the child interpreter: the import time of the handler module, as seen by the function
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import {module}
+print(f"IMPORT_SECONDS={{time.perf_counter() - start}}")
+"""
+
+
+def create_ssm_parameters(endpoint_url: str):
+    ssm = boto3.client("ssm", endpoint_url=endpoint_url)
+    for suffix, value in SSM_PARAMETERS.items():
+        ssm.put_parameter(
+            Name=f"/{SERVICE_NAME.replace('-', '_')}/shared_context/{MATURITY_LEVEL}/{suffix}",
+            Value=value,
+            Type="String",
+            Overwrite=True
+        )
+
+
+def profile(function: str, endpoint_url: str, repeat: int) -> tuple[float, list[tuple[str, int, int]]] | None:
+    """
+    Median import time of the handler module in seconds, and the (module, self µs, cumulative µs) of each imported
+    module. None if the module could not be imported.
+    """
+    env = {
+        **os.environ,
+        **FUNCTIONS[function],
+        "POWERTOOLS_SERVICE_NAME": SERVICE_NAME,
+        "MATURITY_LEVEL": MATURITY_LEVEL,
+        "AWS_ENDPOINT_URL": endpoint_url,
+        "PYTHONPATH": os.pathsep.join([
+            os.path.join(ROOT, "src", "layers", "shared"),
+            os.path.join(ROOT, "src", "functions", function),
+        ]),
+    }
+    script = IMPORT_SCRIPT.format(module=function)
+
+    # -X importtime slows the imports down: the init time is measured without it
+    durations = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1]
+            print(f"{function}: import failed ({error})", file=sys.stderr)
+            return None
+        durations.append(float(result.stdout.split("IMPORT_SECONDS=")[1]))
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", script], env=env, capture_output=True, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        modules.append((module.strip(), int(self_us), int(cumulative_us)))
+    return statistics.median(durations), modules
+
+
+def by_package(modules: list[tuple[str, int, int]]) -> dict[str, int]:
+    """
+    Self import time (µs) by top level package.
+    """
+    packages = defaultdict(int)
+    for module, self_us, _ in modules:
+        packages[module.split(".")[0]] += self_us
+    return packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint-url", default="http://localhost:5000")
+    parser.add_argument("--functions", nargs="+", default=list(FUNCTIONS), choices=list(FUNCTIONS))
+    parser.add_argument("--repeat", type=int, default=9)
+    parser.add_argument("--top", type=int, default=8, help="number of packages listed per function")
+    args = parser.parse_args()
+
+    # local stand-ins accept any credentials
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "local")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "local")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "eu-central-1")
+    create_ssm_parameters(args.endpoint_url)
+
+    profiles = {function: profile(function, args.endpoint_url, args.repeat) for function in args.functions}
+    profiles = {function: result for function, result in profiles.items() if result is not None}
+
+    print("| function           | median init (ms) | imported modules |")
+    print("|--------------------|------------------|------------------|")
+    for function, (seconds, modules) in profiles.items():
+        print(f"| {function:<18} | {seconds * 1000:>16.0f} | {len(modules):>16} |")
+
+    for function, (_, modules) in profiles.items():
+        print(f"\n{function}: self import time by package")
+        print("| package                        | self (ms) |")
+        print("|--------------------------------|-----------|")
+        packages = sorted(by_package(modules).items(), key=lambda item: item[1], reverse=True)
+        for package, self_us in packages[:args.top]:
+            print(f"| {package:<30} | {self_us / 1000:>9.1f} |")
+
+
+if __name__ == "__main__":
+    main()
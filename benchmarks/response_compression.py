@@ -0,0 +1,95 @@
+"""
+Bytes on the wire and CPU cost per request of the response compression, for the index page and for the
+`GET /restaurants?bulk=true` JSON, with synthetic catalogs of increasing size.
+
+The index page is compressed once per cached rendered page, so its per-request cost is the one of a cache lookup;
+the JSON responses are compressed on each request.
+
+    PYTHONPATH=src/layers/shared python benchmarks/response_compression.py
+"""
+import argparse
+import json
+import os
+import time
+
+import jinja2
+
+from big_mouth import http_compression
+
+INDEX_TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "..", "src", "functions", "get_index")
+
+
+def restaurants(count: int) -> list[dict]:
+    return [
+        {
+            "name": f"restaurant {i:05d}",
+            "image": f"https://d2qt42rcwzspd6.cloudfront.net/manning/restaurant-{i:05d}.png",
+            "themes": ["cartoon", f"theme {i % 50}"]
+        }
+        for i in range(count)
+    ]
+
+
+def render_index(catalog: list[dict]) -> str:
+    template = jinja2.Environment(loader=jinja2.FileSystemLoader(INDEX_TEMPLATE_DIR)).get_template("index.html")
+    return template.render(
+        dayOfWeek="Monday",
+        restaurants=catalog,
+        searchUrl="https://example.com/restaurants/search",
+        orderUrl="https://example.com/orders",
+        awsRegion="eu-central-1",
+        cognitoUserPoolId="eu-central-1_example",
+        cognitoClientId="example"
+    )
+
+
+def cpu_per_call(function, repeat: int) -> float:
+    """
+    CPU time of one call, in microseconds.
+    """
+    start = time.process_time()
+    for _ in range(repeat):
+        function()
+    return (time.process_time() - start) / repeat * 1e6
+
+
+def report(label: str, body: str, repeat: int, cached: bool):
+    identity_size = len(body.encode())
+    print(f"| {label:<26} | identity   | {identity_size:>11} |   100.0% | {0:>14.1f} |")
+
+    for encoding in http_compression.SUPPORTED_ENCODINGS:
+        # the cached page is compressed with the best level, once: per request, only the lookup remains
+        compressed = http_compression.compress(body, encoding, best=cached)
+        variants = {encoding: compressed}
+        per_request = (
+            cpu_per_call(lambda: variants[encoding], repeat) if cached
+            else cpu_per_call(lambda: http_compression.encoded_body(body, encoding), repeat)
+        )
+        print(
+            f"| {label:<26} | {encoding:<10} | {len(compressed):>11} "
+            f"| {len(compressed) / identity_size:>8.1%} | {per_request:>14.1f} |"
+        )
+
+        if cached:
+            # first request of each cached page
+            once = cpu_per_call(lambda: http_compression.encoded_body(body, encoding, best=True), max(repeat // 10, 1))
+            print(f"| {label:<26} | {encoding + ', miss':<10} | {'':>11} | {'':>8} | {once:>14.1f} |")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, nargs="+", default=[8, 100, 1_000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"encodings: {', '.join(http_compression.SUPPORTED_ENCODINGS)} (install `brotli` to include br)")
+    print("| response                   | encoding   | bytes sent  | ratio    | CPU / req (µs) |")
+    print("|----------------------------|------------|-------------|----------|----------------|")
+    for count in args.restaurants:
+        catalog = restaurants(count)
+        report(f"index page, {count} rest.", render_index(catalog), args.repeat, cached=True)
+        report(f"JSON, {count} rest.", json.dumps(catalog, separators=(",", ":")), args.repeat, cached=False)
+
+
+if __name__ == "__main__":
+    main()
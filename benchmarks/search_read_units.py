@@ -0,0 +1,103 @@
+"""
+Read units consumed by one theme search, with a filtered `Scan` of the restaurants table vs a `Query` of the
+restaurant index table.
+
+The consumed capacity is modelled with the DynamoDB sizing rules (item sizes are summed per request, rounded up to
+4 KB, half a read unit per 4 KB for eventually consistent reads, at most 1 MB read per request), on a synthetic
+catalog whose theme popularity follows a Zipf distribution, like real catalogs do.
+
+    PYTHONPATH=src/layers/shared python benchmarks/search_read_units.py --restaurants 10000 100000
+"""
+import argparse
+import math
+import random
+
+from big_mouth import restaurant_index
+
+READ_UNIT_BYTES = 4 * 1024
+MAX_PAGE_BYTES = 1024 * 1024
+THEME_COUNT = 200
+
+
+def attribute_size(value) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (int, float)):
+        return len(str(value).lstrip("-").replace(".", "")) // 2 + 2
+    if isinstance(value, list):
+        return 3 + sum(attribute_size(element) + 1 for element in value)
+    if isinstance(value, dict):
+        return 3 + sum(len(k) + attribute_size(v) + 1 for k, v in value.items())
+    raise TypeError(f"unsupported attribute type {type(value)}")
+
+
+def item_size(item: dict) -> int:
+    return sum(len(name.encode("utf-8")) + attribute_size(value) for name, value in item.items())
+
+
+def read_units(item_sizes: list[int]) -> float:
+    """
+    Read units consumed by reading those items in sequence with as many 1 MB requests as necessary.
+    """
+    units = 0.0
+    page_bytes = 0
+    for size in item_sizes:
+        if page_bytes + size > MAX_PAGE_BYTES:
+            units += math.ceil(page_bytes / READ_UNIT_BYTES) / 2
+            page_bytes = 0
+        page_bytes += size
+    return units + math.ceil(page_bytes / READ_UNIT_BYTES) / 2
+
+
+def synthetic_catalog(restaurant_count: int, rng: random.Random) -> list[dict]:
+    themes = [f"theme {i}" for i in range(THEME_COUNT)]
+    popularity = [1 / (rank + 1) for rank in range(THEME_COUNT)]
+    return [
+        {
+            "name": f"restaurant {i:07d}",
+            "image": f"https://d2qt42rcwzspd6.cloudfront.net/manning/restaurant-{i:07d}.png",
+            "themes": sorted(set(rng.choices(themes, weights=popularity, k=2)))
+        }
+        for i in range(restaurant_count)
+    ]
+
+
+def benchmark(restaurant_count: int, rng: random.Random) -> None:
+    catalog = synthetic_catalog(restaurant_count, rng)
+    scan_units = read_units([item_size(restaurant) for restaurant in catalog])
+
+    postings: dict[str, list[dict]] = {}
+    for restaurant in catalog:
+        for posting in restaurant_index.theme_postings(restaurant):
+            postings.setdefault(posting["pk"], []).append(posting)
+
+    by_popularity = sorted(postings, key=lambda theme_key: len(postings[theme_key]), reverse=True)
+    searched = {
+        "most popular": by_popularity[0],
+        "median": by_popularity[len(by_popularity) // 2],
+        "rarest": by_popularity[-1],
+    }
+
+    for label, theme_key in searched.items():
+        matches = postings[theme_key]
+        query_units = read_units([item_size(posting) for posting in matches])
+        print(
+            f"| {restaurant_count:>11} | {label:<12} | {len(matches):>7} "
+            f"| {scan_units:>10.1f} | {query_units:>10.1f} | {scan_units / query_units:>6.1f}x |"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print("| restaurants | theme        | matches |  scan RCU  |  query RCU | saving  |")
+    print("|-------------|--------------|---------|------------|------------|---------|")
+    for restaurant_count in args.restaurants:
+        benchmark(restaurant_count, random.Random(args.seed))
+
+
+if __name__ == "__main__":
+    main()
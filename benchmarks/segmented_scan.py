@@ -0,0 +1,86 @@
+"""
+Wall time of reading a whole restaurants table with a sequential scan vs a parallel segmented scan, as done by
+`GET /restaurants?bulk=true`.
+
+Runs against a local DynamoDB stand-in (DynamoDB local, moto_server,...) in which a temporary table is created,
+seeded and deleted:
+
+    PYTHONPATH=src/layers/shared python benchmarks/segmented_scan.py --endpoint-url http://localhost:8000
+"""
+import argparse
+import os
+import statistics
+import time
+import uuid
+
+import boto3
+
+from big_mouth import segmented_scan
+
+
+def create_table(dynamo_resource, item_count: int):
+    table = dynamo_resource.create_table(
+        TableName=f"bench_restaurants_{uuid.uuid4().hex[:8]}",
+        KeySchema=[{"AttributeName": "name", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "name", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST"
+    )
+    table.wait_until_exists()
+
+    with table.batch_writer() as batch:
+        for i in range(item_count):
+            batch.put_item(Item={
+                "name": f"restaurant {i:07d}",
+                "image": f"https://d2qt42rcwzspd6.cloudfront.net/manning/restaurant-{i:07d}.png",
+                "themes": ["cartoon", f"theme {i % 50}"]
+            })
+    return table
+
+
+def time_scan(dynamo_client, table_name: str, total_segments: int, repeat: int) -> tuple[float, int]:
+    durations = []
+    item_count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = segmented_scan.parallel_scan(
+            dynamo_client,
+            total_segments=total_segments,
+            sort_by=["name"],
+            TableName=table_name
+        )
+        durations.append(time.perf_counter() - start)
+        item_count = len(items)
+    return statistics.median(durations), item_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint-url", default="http://localhost:8000")
+    parser.add_argument("--items", type=int, default=20_000)
+    parser.add_argument("--segments", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # local stand-ins accept any credentials
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "local")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "local")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "eu-central-1")
+
+    dynamo_resource = boto3.resource("dynamodb", endpoint_url=args.endpoint_url)
+    print(f"seeding {args.items} restaurants...")
+    table = create_table(dynamo_resource, args.items)
+
+    try:
+        print("| segments | items | median wall time (s) | speedup |")
+        print("|----------|-------|----------------------|---------|")
+        baseline = None
+        for total_segments in args.segments:
+            duration, item_count = time_scan(dynamo_resource.meta.client, table.name, total_segments, args.repeat)
+            baseline = baseline or duration
+            print(f"| {total_segments:>8} | {item_count:>5} | {duration:>20.3f} | {baseline / duration:>6.2f}x |")
+    finally:
+        table.delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ from aws_cdk import (
     CfnOutput,
     Duration
 )
-from aws_cdk.aws_apigateway import StageOptions
+from aws_cdk.aws_apigateway import StageOptions, MethodDeploymentOptions
 from aws_cdk.aws_dynamodb import Table
 from aws_cdk.aws_iam import PolicyStatement, Effect
 from aws_cdk.aws_ssm import StringParameter
@@ -31,21 +31,64 @@ class ApiStack(Stack):
             maturity_level: str,
 
             restaurants_table: Table,
+            restaurant_index_table: Table,
+            orders_table: Table,
             event_bus: aws_events.EventBus,
             cognito_user_pool: aws_cognito.UserPool,
             cognito_web_user_pool_client: aws_cognito.UserPoolClient,
+
+            # degree of parallelism of GET /restaurants?bulk=true
+            bulk_scan_segments: int = 4,
+
+            # where get_index reads the catalog from: "http" (GET /restaurants), "lambda" (direct invocation of
+            # get_restaurants) or "dynamodb" (direct read of the tables)
+            index_data_source: str = "http",
+
+            # when set, the non secret shared context parameters are baked into the functions at deployment, and only read
+            # from SSM at runtime once the snapshot is older than this
+            ssm_snapshot_max_age: Duration | None = None,
+
+            # API Gateway stage caching, per method, e.g. {"/restaurants/GET": Duration.minutes(1), "//GET": ...}
+            # a cache cluster is only created if at least one method is cached
+            cached_methods: dict[str, Duration] | None = None,
             **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        assert index_data_source in ["http", "lambda", "dynamodb"], f"Invalid index data source: {index_data_source}"
+
+        cached_methods = cached_methods or {}
+
         api = aws_apigateway.RestApi(
             scope=self,
             id=f"api{feature_name}",
+            # compressed responses are returned base64 encoded by the lambdas, to be decoded by API Gateway
+            binary_media_types=["*/*"],
             deploy_options=StageOptions(
                 stage_name=feature_name,
-                tracing_enabled=True
+                tracing_enabled=True,
+                cache_cluster_enabled=bool(cached_methods),
+                cache_cluster_size="0.5" if cached_methods else None,
+                method_options={
+                    method_path: MethodDeploymentOptions(caching_enabled=True, cache_ttl=ttl)
+                    for method_path, ttl in cached_methods.items()
+                }
             )
         )
 
+        def cache_key_parameters(*parameters: str) -> dict[str, bool]:
+            """
+            Optional request parameters which must be part of the stage cache key. If-None-Match is always part of it,
+            so that a cached 304 is never served to a client without the matching ETag, and so is Accept-Encoding, so
+            that a compressed response is never served to a client which does not support it.
+            """
+            return {
+                parameter: False
+                for parameter in parameters + (
+                    "method.request.header.If-None-Match",
+                    "method.request.header.Accept-Encoding"
+                )
+            }
+
         api_logical_id = self.get_logical_id(api.node.default_child)
 
         def api_url(path: str = "/") -> str:
@@ -57,6 +100,13 @@ class ApiStack(Stack):
             """
             return Fn.sub(f"arn:aws:ssm:${{AWS::Region}}:${{AWS::AccountId}}:parameter/{service_name}/shared_context/{maturity_level}{suffix}")
 
+        def ssm_snapshot(*parameters: str) -> dict[str, str]:
+            if ssm_snapshot_max_age is None:
+                return {}
+            return svend_l3.ssm_snapshot(service_name, maturity_level, list(parameters), max_age=ssm_snapshot_max_age)
+
+        shared_layer = svend_l3.shared_layer(scope=self)
+
         cognito_authorizer = aws_apigateway.CognitoUserPoolsAuthorizer(
             scope=self,
             id="CognitoAuthorizer",
@@ -75,28 +125,45 @@ class ApiStack(Stack):
                 handler="handler",
                 timeout=Duration.seconds(15),
                 runtime=aws_lambda.Runtime.PYTHON_3_12,
+                layers=[shared_layer],
                 environment={
                     "POWERTOOLS_SERVICE_NAME": service_name,
                     "MATURITY_LEVEL": maturity_level,
                     "TABLE_NAME": restaurants_table.table_name,
+                    "INDEX_TABLE_NAME": restaurant_index_table.table_name,
+                    "BULK_SCAN_SEGMENTS": str(bulk_scan_segments),
+                    **ssm_snapshot("get_restaurants/config")
                 }
             )
         )
 
         restaurants_table.grant_read_data(get_restaurants_fn)
+        # catalog version, see CatalogCache
+        restaurant_index_table.grant_read_data(get_restaurants_fn)
         get_restaurants_fn.role.add_to_principal_policy(
             PolicyStatement(
-                actions=["ssm:GetParameter"],
+                actions=["ssm:GetParameters"],
                 resources=[
-                    ssm_params_path("/get_restaurants/*")
+                    ssm_params_path("/get_restaurants/*"),
+                    ssm_params_path("/pagination/*")
                 ],
                 effect=Effect.ALLOW
             )
         )
         restaurants_api = api.root.add_resource('restaurants')
+        get_restaurants_cache_key = cache_key_parameters(
+            "method.request.querystring.limit",
+            "method.request.querystring.cursor",
+            "method.request.querystring.bulk",
+            "method.request.querystring.fields"
+        )
         restaurants_api.add_method(
             http_method='GET',
-            integration=aws_apigateway.LambdaIntegration(get_restaurants_fn),
+            integration=aws_apigateway.LambdaIntegration(
+                get_restaurants_fn,
+                cache_key_parameters=list(get_restaurants_cache_key)
+            ),
+            request_parameters=get_restaurants_cache_key,
             authorization_type=aws_apigateway.AuthorizationType.IAM
         )
 
@@ -112,24 +179,31 @@ class ApiStack(Stack):
                 handler="handler",
                 timeout=Duration.seconds(15),
                 runtime=aws_lambda.Runtime.PYTHON_3_12,
+                layers=[shared_layer],
                 environment={
                     "POWERTOOLS_SERVICE_NAME": service_name,
                     "MATURITY_LEVEL": maturity_level,
                     "TABLE_NAME": restaurants_table.table_name,
+                    "INDEX_TABLE_NAME": restaurant_index_table.table_name,
+                    # the autocomplete index is built from the whole catalog
+                    "BULK_SCAN_SEGMENTS": str(bulk_scan_segments),
+                    **ssm_snapshot("search_restaurants/config")
                 }
             )
         )
         search_restaurants_fn.role.add_to_principal_policy(
             PolicyStatement(
-                actions=["ssm:GetParameter"],
+                actions=["ssm:GetParameters"],
                 resources=[
-                    ssm_params_path("/search_restaurants/*")
+                    ssm_params_path("/search_restaurants/*"),
+                    ssm_params_path("/pagination/*")
                 ],
                 effect=Effect.ALLOW
             )
         )
 
         restaurants_table.grant_read_data(search_restaurants_fn)
+        restaurant_index_table.grant_read_data(search_restaurants_fn)
         restaurants_api.add_resource('search').add_method(
             http_method='POST',
             integration=aws_apigateway.LambdaIntegration(search_restaurants_fn),
@@ -137,8 +211,59 @@ class ApiStack(Stack):
             authorizer=cognito_authorizer
         )
 
+        # POST /restaurants/nearby
+        # external API: nearest restaurants of a location, from the geohash postings of the restaurant index
+
+        restaurants_api.add_resource('nearby').add_method(
+            http_method='POST',
+            integration=aws_apigateway.LambdaIntegration(search_restaurants_fn),
+            authorization_type=aws_apigateway.AuthorizationType.COGNITO,
+            authorizer=cognito_authorizer
+        )
+
+        # GET /restaurants/themes
+        # external API: number of restaurants per theme, a single item maintained by the restaurant writes
+
+        restaurants_api.add_resource('themes').add_method(
+            http_method='GET',
+            integration=aws_apigateway.LambdaIntegration(search_restaurants_fn),
+            authorization_type=aws_apigateway.AuthorizationType.COGNITO,
+            authorizer=cognito_authorizer
+        )
+
+        # GET /restaurants/autocomplete
+        # external API, called on each keystroke of the search box: same function and protection as the search
+
+        autocomplete_cache_key = cache_key_parameters(
+            "method.request.querystring.q",
+            "method.request.querystring.limit"
+        )
+        restaurants_api.add_resource('autocomplete').add_method(
+            http_method='GET',
+            integration=aws_apigateway.LambdaIntegration(
+                search_restaurants_fn,
+                cache_key_parameters=list(autocomplete_cache_key)
+            ),
+            request_parameters=autocomplete_cache_key,
+            authorization_type=aws_apigateway.AuthorizationType.COGNITO,
+            authorizer=cognito_authorizer
+        )
+
         # GET /
-        # may access the internal API (via HTTP and signed requests with signature v4)
+        # reads the catalog from the internal API (via HTTP and signed requests with signature v4), from get_restaurants
+        # or from DynamoDB, depending on index_data_source
+
+        index_data_source_environment = {
+            "http": {},
+            "lambda": {
+                "RESTAURANTS_FUNCTION_NAME": get_restaurants_fn.function_name,
+            },
+            "dynamodb": {
+                "TABLE_NAME": restaurants_table.table_name,
+                "INDEX_TABLE_NAME": restaurant_index_table.table_name,
+                "BULK_SCAN_SEGMENTS": str(bulk_scan_segments),
+            },
+        }[index_data_source]
 
         get_index_fn = svend_l3.traced_python_function(
             scope=self,
@@ -149,29 +274,43 @@ class ApiStack(Stack):
                 handler="handler",
                 timeout=Duration.seconds(15),
                 runtime=aws_lambda.Runtime.PYTHON_3_12,
+                layers=[shared_layer],
                 environment={
                     "POWERTOOLS_SERVICE_NAME": service_name,
+                    "INDEX_DATA_SOURCE": index_data_source,
                     # we can't use the API Gateway resource here to know the URL because it would create a circular dependency
                     # "RESTAURANTS_API_URL": Fn.sub(f"https://${{{api_logical_id}}}.execute-api.${{AWS::Region}}.amazonaws.com/{stage_name}/restaurants"),
+                    # (also used by the browser, to build the search URL)
                     "RESTAURANTS_API_URL": api_url("/restaurants"),
                     "ORDER_API_URL": api_url("/orders"),
                     "COGNITO_USER_POOL_ID": cognito_user_pool.user_pool_id,
-                    "COGNITO_CLIENT_ID": cognito_web_user_pool_client.user_pool_client_id
+                    "COGNITO_CLIENT_ID": cognito_web_user_pool_client.user_pool_client_id,
+                    **index_data_source_environment
                 }
             )
         )
-        get_index_fn.role.add_to_principal_policy(
-            PolicyStatement(
-                actions=[ "execute-api:Invoke"],
-                resources=[
-                    Fn.sub(f"arn:aws:execute-api:${{AWS::Region}}:${{AWS::AccountId}}:${{{api_logical_id}}}/{feature_name}/GET/restaurants")
-                ],
-                effect=Effect.ALLOW
+        if index_data_source == "http":
+            get_index_fn.role.add_to_principal_policy(
+                PolicyStatement(
+                    actions=[ "execute-api:Invoke"],
+                    resources=[
+                        Fn.sub(f"arn:aws:execute-api:${{AWS::Region}}:${{AWS::AccountId}}:${{{api_logical_id}}}/{feature_name}/GET/restaurants")
+                    ],
+                    effect=Effect.ALLOW
+                )
             )
-        )
+        elif index_data_source == "lambda":
+            get_restaurants_fn.grant_invoke(get_index_fn)
+        else:
+            restaurants_table.grant_read_data(get_index_fn)
+            # catalog version, see CatalogCache
+            restaurant_index_table.grant_read_data(get_index_fn)
+
+        get_index_cache_key = cache_key_parameters()
         api.root.add_method(
             "GET",
-            aws_apigateway.LambdaIntegration(get_index_fn)
+            aws_apigateway.LambdaIntegration(get_index_fn, cache_key_parameters=list(get_index_cache_key)),
+            request_parameters=get_index_cache_key
         )
 
         # ------
@@ -186,21 +325,81 @@ class ApiStack(Stack):
                 handler="handler",
                 timeout=Duration.seconds(5),
                 runtime=aws_lambda.Runtime.PYTHON_3_12,
+                layers=[shared_layer],
                 environment={
                     "POWERTOOLS_SERVICE_NAME": service_name,
+                    # metrics of the event publisher
+                    "POWERTOOLS_METRICS_NAMESPACE": service_name,
                     "MATURITY_LEVEL": maturity_level,
                     "EVENT_BUS_NAME": event_bus.event_bus_name,
+                    "ORDERS_TABLE_NAME": orders_table.table_name,
                 }
             )
         )
         event_bus.grant_put_events_to(place_order_fn)
-        api.root.add_resource('orders').add_method(
+        # orders are written before their event is published, and deleted if it could not be
+        orders_table.grant_write_data(place_order_fn)
+        orders_api = api.root.add_resource('orders')
+        orders_api.add_method(
+            http_method='POST',
+            integration=aws_apigateway.LambdaIntegration(place_order_fn),
+            authorization_type=aws_apigateway.AuthorizationType.COGNITO,
+            authorizer=cognito_authorizer
+        )
+
+        # POST /orders/batch
+        # many orders in one request, their events are sent with as few PutEvents calls as possible
+        orders_api.add_resource('batch').add_method(
             http_method='POST',
             integration=aws_apigateway.LambdaIntegration(place_order_fn),
             authorization_type=aws_apigateway.AuthorizationType.COGNITO,
             authorizer=cognito_authorizer
         )
 
+        # GET /orders/{order_id}
+        # status of an order, polled by the browser: read through a short-lived warm-container cache
+        # GET /restaurants/{name}/orders
+        # internal API: recent orders of a restaurant, from the restaurant_orders index
+
+        get_orders_fn = svend_l3.traced_python_function(
+            scope=self,
+            id="get_orders",
+            props=aws_lambda_python_alpha.PythonFunctionProps(
+                entry="src/functions/get_orders",
+                index="get_orders.py",
+                handler="handler",
+                timeout=Duration.seconds(5),
+                runtime=aws_lambda.Runtime.PYTHON_3_12,
+                layers=[shared_layer],
+                environment={
+                    "POWERTOOLS_SERVICE_NAME": service_name,
+                    "MATURITY_LEVEL": maturity_level,
+                    "ORDERS_TABLE_NAME": orders_table.table_name,
+                }
+            )
+        )
+        # the table and its indexes
+        orders_table.grant_read_data(get_orders_fn)
+        # signing key of the cursors
+        get_orders_fn.role.add_to_principal_policy(
+            PolicyStatement(
+                actions=["ssm:GetParameters"],
+                resources=[ssm_params_path("/pagination/*")],
+                effect=Effect.ALLOW
+            )
+        )
+        orders_api.add_resource('{order_id}').add_method(
+            http_method='GET',
+            integration=aws_apigateway.LambdaIntegration(get_orders_fn),
+            authorization_type=aws_apigateway.AuthorizationType.COGNITO,
+            authorizer=cognito_authorizer
+        )
+        restaurants_api.add_resource('{name}').add_resource('orders').add_method(
+            http_method='GET',
+            integration=aws_apigateway.LambdaIntegration(get_orders_fn),
+            authorization_type=aws_apigateway.AuthorizationType.IAM
+        )
+
         # ----------
 
         CfnOutput(
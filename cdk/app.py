@@ -18,6 +18,16 @@ assert maturity_level in ["dev", "test", "acc", "prod"], f"Invalid maturity leve
 feature_name = os.getenv("FEATURE_NAME")
 assert feature_name, "FEATURE_NAME environment variable must be set"
 
+# optional API Gateway caching of the GET endpoints, disabled by default since the cache cluster is billed per hour
+api_cache_ttl_seconds = int(os.getenv("API_CACHE_TTL_SECONDS", "0"))
+
+# when set, the non secret SSM parameters are baked into the functions at deployment, and only read at runtime once
+# older than this
+ssm_snapshot_max_age_seconds = os.getenv("SSM_SNAPSHOT_MAX_AGE_SECONDS")
+
+# where the index page reads the catalog from: http (default), lambda or dynamodb
+index_data_source = os.getenv("INDEX_DATA_SOURCE", "http")
+
 db_stack = DbStack(
     app,
     construct_id=f"DB{feature_name}",
@@ -40,7 +50,7 @@ event_stack = EventStack(
 order_flow_stack = OrderFlowStack(
     app,
     construct_id=f"OrderFlow{feature_name}",
-    orders_table=db_stack.table,
+    orders_table=db_stack.orders,
     event_bus=event_stack.event_bus,
     restaurant_notification_topic=event_stack.restaurant_notification_topic,
     user_notification_topic=event_stack.user_notification_topic,
@@ -53,9 +63,17 @@ ApiStack(
     feature_name=feature_name,
     maturity_level=maturity_level,
     restaurants_table=db_stack.table,
+    restaurant_index_table=db_stack.restaurant_index_table,
+    orders_table=db_stack.orders,
     event_bus=event_stack.event_bus,
     cognito_user_pool=cognito_stack.user_pool,
     cognito_web_user_pool_client=cognito_stack.web_user_pool_client,
+    index_data_source=index_data_source,
+    ssm_snapshot_max_age=cdk.Duration.seconds(int(ssm_snapshot_max_age_seconds)) if ssm_snapshot_max_age_seconds else None,
+    cached_methods={
+        "/restaurants/GET": cdk.Duration.seconds(api_cache_ttl_seconds),
+        "//GET": cdk.Duration.seconds(api_cache_ttl_seconds),
+    } if api_cache_ttl_seconds else None,
     )
 
 app.synth()
@@ -21,6 +21,21 @@ class DbStack(Stack):
             billing_mode=aws_dynamodb.BillingMode.PAY_PER_REQUEST
         )
 
+        # per-theme copies of the restaurants, see src/layers/shared/big_mouth/restaurant_index.py
+        self.restaurant_index_table = aws_dynamodb.Table(
+            scope=self,
+            id="restaurant_index",
+            partition_key=aws_dynamodb.Attribute(
+                name="pk",
+                type=aws_dynamodb.AttributeType.STRING
+            ),
+            sort_key=aws_dynamodb.Attribute(
+                name="sk",
+                type=aws_dynamodb.AttributeType.STRING
+            ),
+            billing_mode=aws_dynamodb.BillingMode.PAY_PER_REQUEST
+        )
+
         self.orders = aws_dynamodb.Table(
             scope=self,
             id="orders",
@@ -30,6 +45,20 @@ class DbStack(Stack):
             ),
             billing_mode=aws_dynamodb.BillingMode.PAY_PER_REQUEST
         )
+        # orders of each restaurant by creation time, see src/layers/shared/big_mouth/order_store.py
+        self.orders.add_global_secondary_index(
+            index_name="restaurant_orders",
+            partition_key=aws_dynamodb.Attribute(
+                name="restaurantName",
+                type=aws_dynamodb.AttributeType.STRING
+            ),
+            sort_key=aws_dynamodb.Attribute(
+                name="createdAt",
+                type=aws_dynamodb.AttributeType.STRING
+            ),
+            # orders are small: a page is read from the index alone
+            projection_type=aws_dynamodb.ProjectionType.ALL
+        )
 
         self.idempotency_table = aws_dynamodb.Table(
             scope=self,
@@ -49,3 +78,17 @@ class DbStack(Stack):
             key="RestaurantsTableName",
             value=self.table.table_name
         )
+
+        CfnOutput(
+            scope=self,
+            id="restaurant_index_table_name",
+            key="RestaurantIndexTableName",
+            value=self.restaurant_index_table.table_name
+        )
+
+        CfnOutput(
+            scope=self,
+            id="orders_table_name",
+            key="OrdersTableName",
+            value=self.orders.table_name
+        )
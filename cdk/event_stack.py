@@ -51,6 +51,8 @@ class EventStack(Stack):
             id="AlarmTopic"
         )
 
+        shared_layer = svend_l3.shared_layer(scope=self)
+
         notify_restaurant_fn = svend_l3.traced_python_function(
             scope=self,
             id="notify_restaurant",
@@ -62,8 +64,11 @@ class EventStack(Stack):
                 on_failure=SqsDestination(queue=restaurant_notification_error_queue),
                 timeout=Duration.seconds(5),
                 runtime=aws_lambda.Runtime.PYTHON_3_12,
+                layers=[shared_layer],
                 environment={
                     "POWERTOOLS_SERVICE_NAME": service_name,
+                    # metrics of the event publisher
+                    "POWERTOOLS_METRICS_NAMESPACE": service_name,
                     "MATURITY_LEVEL": maturity_level,
                     "EVENT_BUS_NAME": self.event_bus.event_bus_name,
                     "TOPIC_ARN": self.restaurant_notification_topic.topic_arn,
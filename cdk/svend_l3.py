@@ -1,6 +1,9 @@
+import re
+import time
+
 from constructs import Construct
-from aws_cdk import aws_lambda as lambda_
-from aws_cdk.aws_lambda_python_alpha import PythonFunction, PythonFunctionProps
+from aws_cdk import aws_lambda as lambda_, Duration
+from aws_cdk.aws_lambda_python_alpha import PythonFunction, PythonFunctionProps, PythonLayerVersion
 
 
 def traced_python_function(scope: Construct, id: str, props: PythonFunctionProps) -> PythonFunction:
@@ -14,4 +17,41 @@ def traced_python_function(scope: Construct, id: str, props: PythonFunctionProps
     if "memory_size" not in props2:
         props2["memory_size"] = 1024
 
-    return PythonFunction(scope, id, **props2)
\ No newline at end of file
+    return PythonFunction(scope, id, **props2)
+
+
+def shared_layer(scope: Construct, id: str = "shared_layer") -> PythonLayerVersion:
+    """
+    Layer with the `big_mouth` package of src/layers/shared, importable by any function it is attached to.
+    """
+    return PythonLayerVersion(
+        scope,
+        id,
+        entry="src/layers/shared",
+        compatible_runtimes=[lambda_.Runtime.PYTHON_3_12]
+    )
+
+
+def ssm_snapshot(
+        service_name: str,
+        maturity_level: str,
+        parameters: list[str],
+        max_age: Duration = Duration.days(1)
+) -> dict[str, str]:
+    """
+    Environment variables baking the values of the given shared context parameters (e.g. "get_restaurants/config")
+    into a function, as expected by the `big_mouth.config` module.
+
+    The values are resolved by CloudFormation at deployment. The snapshot timestamp changes with each synth, so that
+    each deployment updates the function and resolves the values again. Secure strings cannot be resolved in lambda
+    environment variables: they must be left out and are read at runtime.
+    """
+    environment = {
+        # same naming as big_mouth.config.snapshot_variable
+        "SSM_SNAPSHOT_" + re.sub(r"[^A-Za-z0-9]", "_", parameter).upper():
+            f"{{{{resolve:ssm:/{service_name}/shared_context/{maturity_level}/{parameter}}}}}"
+        for parameter in parameters
+    }
+    environment["SSM_SNAPSHOT_TAKEN_AT"] = str(int(time.time()))
+    environment["SSM_SNAPSHOT_MAX_AGE_SECONDS"] = str(int(max_age.to_seconds()))
+    return environment
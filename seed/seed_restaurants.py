@@ -1,77 +1,124 @@
 import os
+from decimal import Decimal
+
 import boto3
 
+from big_mouth import restaurant_index
+from big_mouth.restaurant_writer import RestaurantWriter
+
 feature_name = os.environ['FEATURE_NAME']
 db_stack_name = f"DB{feature_name}"
 
 cfn_client = boto3.client('cloudformation')
 
 
-def restaurant_table_name():
+def db_stack_output(output_key: str) -> str:
     db_stack = cfn_client.describe_stacks(StackName=db_stack_name)
     outputs = db_stack["Stacks"][0]["Outputs"]
     for output in outputs:
-        if output["OutputKey"] == "RestaurantsTableName":
+        if output["OutputKey"] == output_key:
             return output["OutputValue"]
 
-    raise ValueError("RestaurantsTableName not found in stack outputs")
+    raise ValueError(f"{output_key} not found in stack outputs")
+
+
+def delete_all_items(table, key_attributes: list[str], keep: tuple[dict, ...] = ()) -> None:
+    scan_kwargs = {"ConsistentRead": True}
+    while True:
+        response = table.scan(**scan_kwargs)
+        with table.batch_writer() as batch:
+            for item in response['Items']:
+                key = {key: item[key] for key in key_attributes}
+                if key not in keep:
+                    batch.delete_item(Key=key)
+        if "LastEvaluatedKey" not in response:
+            return
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
 
 
 restaurants = [
     {
         "name": "Fangtasia",
         "image": "https://d2qt42rcwzspd6.cloudfront.net/manning/fangtasia.png",
-        "themes": ["true blood"]
+        "themes": ["true blood"],
+        # optional, indexed by geohash for POST /restaurants/nearby
+        "latitude": Decimal("51.5136"),
+        "longitude": Decimal("-0.1365")
     },
     {
         "name": "Shoney's",
         "image": "https://d2qt42rcwzspd6.cloudfront.net/manning/shoney's.png",
-        "themes": ["cartoon", "rick and morty"]
+        "themes": ["cartoon", "rick and morty"],
+        "latitude": Decimal("51.5155"),
+        "longitude": Decimal("-0.0922")
     },
     {
         "name": "Freddy's BBQ Joint",
         "image": "https://d2qt42rcwzspd6.cloudfront.net/manning/freddy's+bbq+joint.png",
-        "themes": ["netflix", "house of cards"]
+        "themes": ["netflix", "house of cards"],
+        "latitude": Decimal("51.5033"),
+        "longitude": Decimal("-0.1196")
     },
     {
         "name": "Pizza Planet",
         "image": "https://d2qt42rcwzspd6.cloudfront.net/manning/pizza+planet.png",
-        "themes": ["netflix", "toy story"]
+        "themes": ["netflix", "toy story"],
+        "latitude": Decimal("51.5007"),
+        "longitude": Decimal("-0.1246")
     },
     {
         "name": "Leaky Cauldron",
         "image": "https://d2qt42rcwzspd6.cloudfront.net/manning/leaky+cauldron.png",
-        "themes": ["movie", "harry potter"]
+        "themes": ["movie", "harry potter"],
+        "latitude": Decimal("51.5112"),
+        "longitude": Decimal("-0.1281")
     },
     {
         "name": "Lil' Bits",
         "image": "https://d2qt42rcwzspd6.cloudfront.net/manning/lil+bits.png",
-        "themes": ["cartoon", "rick and morty"]
+        "themes": ["cartoon", "rick and morty"],
+        "latitude": Decimal("51.5194"),
+        "longitude": Decimal("-0.1270")
     },
     {
         "name": "Fancy Eats",
         "image": "https://d2qt42rcwzspd6.cloudfront.net/manning/fancy+eats.png",
-        "themes": ["cartoon", "rick and morty"]
+        "themes": ["cartoon", "rick and morty"],
+        "latitude": Decimal("51.4975"),
+        "longitude": Decimal("-0.1357")
     },
     {
         "name": "Don Cuco",
         "image": "https://d2qt42rcwzspd6.cloudfront.net/manning/don%20cuco.png",
-        "themes": ["cartoon", "rick and morty"]
+        "themes": ["cartoon", "rick and morty"],
+        "latitude": Decimal("51.5416"),
+        "longitude": Decimal("-0.1430")
     },
 ]
 
 dynamo_resource = boto3.resource('dynamodb')
-table_name = restaurant_table_name()
-restaurant_table_client = dynamo_resource.Table(table_name)
+table_name = db_stack_output("RestaurantsTableName")
+index_table_name = db_stack_output("RestaurantIndexTableName")
 
 print(f"deleting all items from restaurants table {table_name}")
-response = restaurant_table_client.scan(ConsistentRead=True)
-with restaurant_table_client.batch_writer() as batch:
-    for item in response['Items']:
-        batch.delete_item(Key={'name': item['name']})
+delete_all_items(dynamo_resource.Table(table_name), key_attributes=["name"])
+
+print(f"deleting all items from restaurant index table {index_table_name}")
+# the catalog version keeps increasing across seeds, otherwise caches could mistake the new catalog for an old one
+delete_all_items(
+    dynamo_resource.Table(index_table_name),
+    key_attributes=["pk", "sk"],
+    keep=(restaurant_index.CATALOG_VERSION_KEY,)
+)
+
+# the writer maintains the restaurant index along with the restaurants table
+restaurant_writer = RestaurantWriter(
+    restaurants_table_name=table_name,
+    index_table_name=index_table_name,
+    dynamo_resource=dynamo_resource
+)
 
 print(f"seeding restaurants table {table_name} with {len(restaurants)} items")
-with restaurant_table_client.batch_writer() as batch:
-    for restaurant in restaurants:
-        print(f"adding restauran {restaurant['name']}")
-        batch.put_item(Item=restaurant)
+for restaurant in restaurants:
+    print(f"adding restauran {restaurant['name']}")
+    restaurant_writer.put(restaurant)
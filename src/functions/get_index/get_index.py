@@ -1,26 +1,27 @@
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from http import HTTPStatus
 
 import boto3
-import botocore.session
 import datetime
+import hashlib
+import json
 import os
 import jinja2
-import requests
 from aws_lambda_powertools.event_handler import APIGatewayRestResolver, Response, content_types
+from aws_lambda_powertools.event_handler.exceptions import ServiceError
 from aws_lambda_powertools.utilities.typing import LambdaContext
-from requests_aws4auth import AWS4Auth
 from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.tracing import Tracer
 
-from aws_xray_sdk.core import patch_all
-
-# patch all boto3 clients to also include x-ray tracing
-patch_all()
+from big_mouth import bootstrap, fast_json, http_caching, http_compression, resilience
 
 
 logger = Logger(log_uncaught_exceptions=True)
-tracer = Tracer()
-web_app = APIGatewayRestResolver(enable_validation=True)
+# only the libraries used by the data source are patched, see below
+tracer = Tracer(auto_patch=False)
+web_app = APIGatewayRestResolver(enable_validation=True, serializer=fast_json.dumps)
 
 
 RESTAURANTS_API_URL = os.getenv("RESTAURANTS_API_URL")
@@ -39,46 +40,208 @@ COGNITO_CLIENT_ID = os.getenv("COGNITO_CLIENT_ID")
 if not COGNITO_CLIENT_ID:
     raise ValueError("COGNITO_CLIENT_ID environment variable is not set")
 
-with open(os.path.join(os.path.dirname(__file__), "index.html")) as f:
-    index_html_template = f.read()
+# the template is parsed and compiled once per container. The bytecode cache (in the temp dir, i.e. /tmp) also spares
+# the compilation to a runtime re-initialized in the same execution environment
+jinja_env = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(os.path.dirname(__file__)),
+    bytecode_cache=jinja2.FileSystemBytecodeCache(),
+    auto_reload=False
+)
+index_html_template = jinja_env.get_template("index.html")
+
+# the rendered page only depends on the day of week and on the restaurants => warm containers keep the last few pages
+RENDERED_PAGE_CACHE_SIZE = 8
+
+# set by the lambda runtime, which spares creating a boto3 session
+aws_region = os.getenv("AWS_REGION") or boto3.session.Session().region_name
+
+# where the catalog is read from:
+# - "http": GET /restaurants?bulk=true, through API Gateway, with signed requests
+# - "lambda": direct invocation of the get_restaurants function, skipping API Gateway
+# - "dynamodb": direct read of the restaurants table, skipping API Gateway and get_restaurants
+INDEX_DATA_SOURCES = ("http", "lambda", "dynamodb")
+INDEX_DATA_SOURCE = os.getenv("INDEX_DATA_SOURCE", "http")
+if INDEX_DATA_SOURCE not in INDEX_DATA_SOURCES:
+    raise ValueError(f"INDEX_DATA_SOURCE must be one of {INDEX_DATA_SOURCES}, got {INDEX_DATA_SOURCE}")
+
+# the only attributes the page renders: the others are neither read nor transferred
+INDEX_FIELDS = ("name", "image")
+
 
-aws_region = boto3.session.Session().region_name
+def restaurants_from_http() -> Callable[[], list[dict]]:
+    import signed_http_client
 
+    bootstrap.patch_xray("botocore", "requests")
 
-def all_restaurants() -> list[dict]:
-    auth = AWS4Auth(
-        refreshable_credentials=botocore.session.Session().get_credentials(),
-        service='execute-api',
-        region=aws_region
+    # (connect, read) timeouts of the calls to the restaurants API
+    timeouts = (
+        float(os.getenv("RESTAURANTS_API_CONNECT_TIMEOUT_SECONDS", "1")),
+        float(os.getenv("RESTAURANTS_API_READ_TIMEOUT_SECONDS", "5"))
     )
-    response = requests.get(RESTAURANTS_API_URL, auth=auth)
-    response.raise_for_status()
-    return response.json()
 
+    # created once per container: connections and credentials are reused across invocations
+    session = signed_http_client.signed_session(service="execute-api", region=aws_region)
+
+    def all_restaurants() -> list[dict]:
+        # bulk mode: the whole catalog, scanned in parallel
+        response = session.get(
+            RESTAURANTS_API_URL,
+            params={"bulk": "true", "fields": ",".join(INDEX_FIELDS)},
+            timeout=timeouts
+        )
+        response.raise_for_status()
+        return response.json()
+
+    return all_restaurants
+
+
+def restaurants_from_lambda() -> Callable[[], list[dict]]:
+    function_name = os.getenv("RESTAURANTS_FUNCTION_NAME")
+    if not function_name:
+        raise ValueError("RESTAURANTS_FUNCTION_NAME environment variable is not set")
+
+    bootstrap.patch_xray("botocore")
+    lambda_client = bootstrap.client("lambda")
+
+    # same request as the one API Gateway would forward. No Accept-Encoding: the response is not compressed
+    bulk_request = json.dumps({
+        "path": "/restaurants",
+        "httpMethod": "GET",
+        "headers": {},
+        "queryStringParameters": {"bulk": "true", "fields": ",".join(INDEX_FIELDS)}
+    })
+
+    def all_restaurants() -> list[dict]:
+        response = lambda_client.invoke(FunctionName=function_name, Payload=bulk_request)
+        payload = json.loads(response["Payload"].read())
+        if "FunctionError" in response or payload.get("statusCode") != HTTPStatus.OK.value:
+            raise RuntimeError(f"get_restaurants invocation failed: {payload}")
+        return json.loads(payload["body"])
+
+    return all_restaurants
+
+
+def restaurants_from_dynamodb() -> Callable[[], list[dict]]:
+    from big_mouth import catalog
+
+    bootstrap.patch_xray("botocore")
+
+    table_name = os.getenv("TABLE_NAME")
+    if not table_name:
+        raise ValueError("TABLE_NAME environment variable is not set")
+
+    index_table_name = os.getenv("INDEX_TABLE_NAME")
+    if not index_table_name:
+        raise ValueError("INDEX_TABLE_NAME environment variable is not set")
+
+    # reads are cached in the warm container until the catalog version changes, as in get_restaurants
+    restaurant_catalog = catalog.Catalog(
+        table_name=table_name,
+        index_table_name=index_table_name,
+        bulk_scan_segments=int(os.getenv("BULK_SCAN_SEGMENTS", "4")),
+        cache_ttl_seconds=float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "300"))
+    )
+    return lambda: restaurant_catalog.all_restaurants(fields=INDEX_FIELDS)
+
+
+# only the clients of the configured data source are created, once per container
+all_restaurants = {
+    "http": restaurants_from_http,
+    "lambda": restaurants_from_lambda,
+    "dynamodb": restaurants_from_dynamodb,
+}[INDEX_DATA_SOURCE]()
+
+# the last good catalog is served while the data source is refreshed in the background, or while it is unavailable.
+# The page only fails when there is no catalog younger than INDEX_CATALOG_MAX_STALE_SECONDS
+restaurants_source = resilience.StaleWhileRevalidate(
+    load=all_restaurants,
+    fresh_seconds=float(os.getenv("INDEX_CATALOG_FRESH_SECONDS", "60")),
+    max_stale_seconds=float(os.getenv("INDEX_CATALOG_MAX_STALE_SECONDS", "3600")),
+    breaker=resilience.CircuitBreaker(failure_threshold=3, reset_timeout_seconds=30)
+)
+
+# max time a request waits for the data source when there is no catalog to serve (within the lambda remaining time)
+INDEX_CATALOG_BUDGET_SECONDS = float(os.getenv("INDEX_CATALOG_BUDGET_SECONDS", "3"))
+
+
+@dataclass(frozen=True)
+class RenderedPage:
+    html: str
+    etag: str
+
+    # (base64 body, etag) by content encoding, compressed once per cached page, with the best compression level
+    compressed: dict[str, tuple[str, str]] = field(default_factory=dict)
+
+    def compressed_variant(self, encoding: str) -> tuple[str, str]:
+        if encoding not in self.compressed:
+            body = http_compression.encoded_body(self.html, encoding, best=True)
+            self.compressed[encoding] = (body, http_caching.strong_etag(body))
+        return self.compressed[encoding]
+
+
+rendered_pages: OrderedDict[tuple[str, str], RenderedPage] = OrderedDict()
 
-@tracer.capture_lambda_handler
-@web_app.get("/")
-def get_index():
-    restaurants = all_restaurants()
-    logger.info(f"restaurants: {restaurants}")
-    day_of_week = datetime.datetime.today().strftime("%A")
 
-    template = jinja2.Template(source=index_html_template)
-    index_html = template.render(
+def restaurants_hash(restaurants: list[dict]) -> str:
+    return hashlib.sha256(json.dumps(restaurants, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def render_index(day_of_week: str, restaurants: list[dict]) -> RenderedPage:
+    cache_key = (day_of_week, restaurants_hash(restaurants))
+    if cache_key in rendered_pages:
+        rendered_pages.move_to_end(cache_key)
+        return rendered_pages[cache_key]
+
+    html = index_html_template.render(
         dayOfWeek=day_of_week,
         restaurants=restaurants,
         searchUrl=f"{RESTAURANTS_API_URL}/search",
+        autocompleteUrl=f"{RESTAURANTS_API_URL}/autocomplete",
         orderUrl=ORDER_API_URL,
         awsRegion=aws_region,
         cognitoUserPoolId=COGNITO_USER_POOL_ID,
         cognitoClientId=COGNITO_CLIENT_ID
     )
+    page = RenderedPage(html=html, etag=http_caching.strong_etag(html))
+    rendered_pages[cache_key] = page
+    while len(rendered_pages) > RENDERED_PAGE_CACHE_SIZE:
+        rendered_pages.popitem(last=False)
+    return page
 
-    return Response(
+
+@tracer.capture_lambda_handler
+@web_app.get(
+    "/",
+    middlewares=[
+        http_caching.cache_validation("public, max-age=60", serializer=fast_json.dumps),
+        http_compression.compression(serializer=fast_json.dumps)
+    ]
+)
+def get_index():
+    budget_seconds = resilience.latency_budget(web_app.lambda_context, max_seconds=INDEX_CATALOG_BUDGET_SECONDS)
+    try:
+        restaurants = restaurants_source.get(budget_seconds=budget_seconds)
+    except resilience.UpstreamUnavailableError as e:
+        logger.warning(f"restaurants unavailable: {e}")
+        raise ServiceError(HTTPStatus.SERVICE_UNAVAILABLE.value, "restaurants are temporarily unavailable")
+    logger.info(f"restaurants: {restaurants}")
+    day_of_week = datetime.datetime.today().strftime("%A")
+
+    page = render_index(day_of_week=day_of_week, restaurants=restaurants)
+
+    response = Response(
         status_code=HTTPStatus.OK.value,
         content_type=content_types.TEXT_HTML,
-        body=index_html
+        body=page.html,
+        headers={"ETag": page.etag}
     )
 
+    encoding = http_compression.negotiate(web_app.current_event)
+    if encoding and len(page.html) >= http_compression.MIN_COMPRESSED_SIZE:
+        body, etag = page.compressed_variant(encoding)
+        response.headers["ETag"] = etag
+        http_compression.set_encoded_body(response, body, encoding)
+    return response
+
 def handler(event: dict, context: LambdaContext) -> dict:
     return web_app.resolve(event, context)
@@ -0,0 +1,37 @@
+import botocore.session
+import requests
+from requests.adapters import HTTPAdapter
+from requests_aws4auth import AWS4Auth
+from urllib3.util.retry import Retry
+
+
+def signed_session(
+        service: str,
+        region: str,
+        max_retries: int = 2,
+        pool_size: int = 10
+) -> requests.Session:
+    """
+    HTTP session signing its requests with SigV4, meant to be created once per container and reused across
+    invocations: connections are kept alive in a pool (no new TLS handshake per request) and the credentials are only
+    resolved again when they are about to expire.
+
+    Idempotent requests are retried on connection errors and on throttling or gateway errors, with exponential
+    backoff. Once the retries are exhausted, the last response is returned as-is.
+    """
+    session = requests.Session()
+    session.auth = AWS4Auth(
+        refreshable_credentials=botocore.session.Session().get_credentials(),
+        service=service,
+        region=region
+    )
+
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=0.1,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry))
+    return session
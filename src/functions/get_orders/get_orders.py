@@ -0,0 +1,153 @@
+from datetime import datetime
+from http import HTTPStatus
+from typing import Annotated, Any, Optional
+from urllib.parse import unquote
+
+import json
+import os
+
+from aws_lambda_powertools.event_handler import APIGatewayRestResolver, Response, content_types
+from aws_lambda_powertools.event_handler.exceptions import BadRequestError, NotFoundError
+from aws_lambda_powertools.event_handler.openapi.params import Query
+from aws_lambda_powertools.logging import Logger
+from aws_lambda_powertools.utilities.typing import LambdaContext
+from pydantic import BaseModel, Field, SecretStr
+
+from big_mouth import bootstrap, config, fast_json, http_caching, pagination, ulid
+from big_mouth.order_store import (
+    MAX_RESTAURANT_NAME_LENGTH,
+    RESTAURANT_ORDERS_KEY_ATTRIBUTES,
+    OrderStore,
+    format_timestamp
+)
+from big_mouth.ttl_cache import TTLCache
+
+# x-ray tracing of the boto3 clients
+bootstrap.patch_xray("botocore")
+
+
+logger = Logger(log_uncaught_exceptions=True)
+web_app = APIGatewayRestResolver(enable_validation=True, serializer=fast_json.dumps)
+
+SERVICE_NAME = logger.service.replace("-", "_")
+
+ORDERS_TABLE_NAME = os.getenv("ORDERS_TABLE_NAME")
+if not ORDERS_TABLE_NAME:
+    raise ValueError("ORDERS_TABLE_NAME environment variable is not set")
+
+MATURITY_LEVEL = os.getenv("MATURITY_LEVEL")
+if not MATURITY_LEVEL:
+    raise ValueError("MATURITY_LEVEL environment variable is not set")
+
+# orders of a restaurant per page, unless requested otherwise
+DEFAULT_FEED_PAGE_SIZE = 20
+
+# orders are polled for their status: repeated reads within ORDER_CACHE_TTL_SECONDS are served by the warm container
+ORDER_CACHE_TTL_SECONDS = int(os.getenv("ORDER_CACHE_TTL_SECONDS", "2"))
+
+order_store = OrderStore(ORDERS_TABLE_NAME)
+order_cache = TTLCache(ttl_seconds=ORDER_CACHE_TTL_SECONDS, name="order cache")
+
+
+# browsers reuse the order for as long as the container does, then revalidate it with its ETag
+@web_app.get(
+    "/orders/<order_id>",
+    middlewares=[
+        http_caching.cache_validation(f"private, max-age={ORDER_CACHE_TTL_SECONDS}", serializer=fast_json.dumps)
+    ]
+)
+def get_order(order_id: str) -> Response[Any]:
+    # not an order id: not worth a read
+    if not ulid.is_valid(order_id):
+        raise NotFoundError(f"order {order_id} not found")
+    # ids are read case-insensitively but stored upper case: a lower case id is the same order, and the same cache entry
+    order_id = order_id.upper()
+
+    order = order_cache.get_or_load(order_id, lambda: order_store.get_order(order_id))
+    if order is None:
+        raise NotFoundError(f"order {order_id} not found")
+    return Response(
+        status_code=HTTPStatus.OK.value,
+        content_type=content_types.APPLICATION_JSON,
+        body=order
+    )
+
+
+class PaginationSecrets(BaseModel):
+    # /production_ready_serverless/shared_context/dev/pagination/secrets
+    pagination_key: SecretStr = Field(alias="pagination/secrets")
+
+
+# only the order feed needs the shared context: order status polls do not wait for SSM at cold start
+pagination_secrets = config.SharedConfig(
+    PaginationSecrets, service_name=SERVICE_NAME, maturity_level=MATURITY_LEVEL, lazy=True
+)
+
+
+def cursor_codec() -> pagination.CursorCodec:
+    return pagination.CursorCodec(signing_key=pagination_secrets.get().pagination_key.get_secret_value())
+
+
+def parse_timestamp(name: str, value: str | None) -> str | None:
+    if value is None:
+        return None
+    try:
+        return format_timestamp(datetime.fromisoformat(value))
+    except ValueError:
+        raise BadRequestError(f"{name} must be an ISO 8601 timestamp, e.g. 2024-06-01T12:00:00Z")
+
+
+# internal API, e.g. for the dashboards of the restaurants: recent orders first, with one Query on the
+# restaurant_orders index per page. Refreshes of an unchanged page are answered with a 304
+@web_app.get(
+    "/restaurants/<name>/orders",
+    middlewares=[http_caching.cache_validation("private, no-cache", serializer=fast_json.dumps)]
+)
+def restaurant_orders(
+        name: str,
+        limit: Annotated[int, Query(gt=0, le=pagination.MAX_PAGE_SIZE)] = DEFAULT_FEED_PAGE_SIZE,
+        since: Annotated[Optional[str], Query()] = None,
+        until: Annotated[Optional[str], Query()] = None,
+        cursor: Annotated[Optional[str], Query()] = None
+) -> Response[Any]:
+    # the path is matched as received, e.g. "Pizza%20Planet"
+    restaurant_name = unquote(name)
+    if len(restaurant_name) > MAX_RESTAURANT_NAME_LENGTH:
+        raise BadRequestError(f"restaurant names have at most {MAX_RESTAURANT_NAME_LENGTH} characters")
+    since, until = parse_timestamp("since", since), parse_timestamp("until", until)
+    if since is not None and until is not None and since > until:
+        raise BadRequestError("since must not be after until")
+
+    # a cursor only resumes the feed of the same restaurant and time range
+    scope = "restaurant_orders:" + json.dumps([restaurant_name, since, until])
+    try:
+        start_key = cursor_codec().decode(cursor, scope=scope) if cursor else None
+    except pagination.InvalidCursorError as e:
+        raise BadRequestError(str(e))
+
+    def query(exclusive_start_key: dict | None, page_limit: int) -> dict:
+        return order_store.query_restaurant_orders(
+            restaurant_name, exclusive_start_key, page_limit, since=since, until=until
+        )
+
+    page = pagination.read_page(
+        read=query,
+        page_size=limit,
+        key_attributes=RESTAURANT_ORDERS_KEY_ATTRIBUTES,
+        start_key=start_key
+    )
+
+    headers = {}
+    if page.next_key:
+        headers[pagination.NEXT_CURSOR_HEADER] = cursor_codec().encode(page.next_key, scope=scope)
+
+    return Response(
+        status_code=HTTPStatus.OK.value,
+        content_type=content_types.APPLICATION_JSON,
+        body=page.items,
+        headers=headers
+    )
+
+
+def handler(event: dict, context: LambdaContext) -> dict:
+    return web_app.resolve(event, context)
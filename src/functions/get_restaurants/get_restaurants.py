@@ -1,22 +1,26 @@
-from typing import cast
+from http import HTTPStatus
+from typing import Annotated, Any, Optional
 
-import boto3
+import json
 import os
 
-from aws_lambda_powertools.event_handler import APIGatewayRestResolver
-from aws_lambda_powertools.utilities import parameters
+from aws_lambda_powertools.event_handler import APIGatewayRestResolver, Response, content_types
+from aws_lambda_powertools.event_handler.exceptions import BadRequestError
+from aws_lambda_powertools.event_handler.openapi.params import Query
 from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
+from pydantic import BaseModel, Field, Json, SecretStr
 
+from big_mouth import bootstrap, catalog, config, fast_json, http_caching, http_compression, pagination, projection
+from big_mouth.catalog_cache import CompactRecords
 
-from aws_xray_sdk.core import patch_all
-
-# patch all boto3 clients to also include x-ray tracing
-patch_all()
+# x-ray tracing of the boto3 clients
+bootstrap.patch_xray("botocore")
 
 
 logger = Logger(log_uncaught_exceptions=True)
-web_app = APIGatewayRestResolver(enable_validation=True)
+# the bulk catalog is a large JSON body
+web_app = APIGatewayRestResolver(enable_validation=True, serializer=fast_json.dumps)
 
 SERVICE_NAME = logger.service.replace("-", "_")
 
@@ -24,32 +28,129 @@ TABLE_NAME = os.getenv("TABLE_NAME")
 if not TABLE_NAME:
     raise ValueError("TABLE_NAME environment variable is not set")
 
+INDEX_TABLE_NAME = os.getenv("INDEX_TABLE_NAME")
+if not INDEX_TABLE_NAME:
+    raise ValueError("INDEX_TABLE_NAME environment variable is not set")
+
 MATURITY_LEVEL = os.getenv("MATURITY_LEVEL")
 if not MATURITY_LEVEL:
     raise ValueError("MATURITY_LEVEL environment variable is not set")
 
-dynamo_client = boto3.client('dynamodb')
-dynamo_resource = boto3.resource('dynamodb')
-restaurant_table_client = dynamo_resource.Table(TABLE_NAME)
-
-
-def get_restaurants_from_db(result_limit: int) -> list[dict]:
-    response = restaurant_table_client.scan(Limit=result_limit)
-    return response['Items']
-
-
-@web_app.get("/restaurants")
-def get_restaurants() -> list[dict]:
-    result_limit_params = parameters.get_parameter(
-        # /production_ready_serverless/shared_context/dev/get_restaurants/config
-        name=f"/{SERVICE_NAME}/shared_context/{MATURITY_LEVEL}/get_restaurants/config",
-        transform="json",
-        max_age=60
+# reads are cached in warm containers until the catalog version changes, or at most for CATALOG_CACHE_TTL_SECONDS
+restaurant_catalog = catalog.Catalog(
+    table_name=TABLE_NAME,
+    index_table_name=INDEX_TABLE_NAME,
+    # number of concurrent segments of the bulk scan
+    bulk_scan_segments=int(os.getenv("BULK_SCAN_SEGMENTS", "4")),
+    cache_ttl_seconds=float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "300"))
+)
+catalog_cache = restaurant_catalog.cache
+
+CURSOR_SCOPE = "restaurants"
+
+
+class ResultsConfig(BaseModel):
+    defaultResults: int = Field(gt=0, le=pagination.MAX_PAGE_SIZE)
+
+
+class GetRestaurantsConfig(BaseModel):
+    # /production_ready_serverless/shared_context/dev/get_restaurants/config
+    results: Json[ResultsConfig] = Field(alias="get_restaurants/config")
+
+
+class PaginationSecrets(BaseModel):
+    # /production_ready_serverless/shared_context/dev/pagination/secrets
+    pagination_key: SecretStr = Field(alias="pagination/secrets")
+
+
+# read once at cold start, then refreshed in the background
+shared_config = config.SharedConfig(GetRestaurantsConfig, service_name=SERVICE_NAME, maturity_level=MATURITY_LEVEL)
+# secure string, which cannot be baked into the snapshot: only read when a cursor is first encoded or decoded
+pagination_secrets = config.SharedConfig(
+    PaginationSecrets, service_name=SERVICE_NAME, maturity_level=MATURITY_LEVEL, lazy=True
+)
+
+
+def cursor_codec() -> pagination.CursorCodec:
+    return pagination.CursorCodec(signing_key=pagination_secrets.get().pagination_key.get_secret_value())
+
+
+def get_restaurants_from_db(
+        result_limit: int,
+        start_key: dict | None = None,
+        fields: tuple[str, ...] | None = None
+) -> pagination.Page:
+    def scan(exclusive_start_key: dict | None, limit: int) -> dict:
+        return restaurant_catalog.store.scan(exclusive_start_key, limit, fields=fields)
+
+    page = pagination.read_page(read=scan, page_size=result_limit, key_attributes=["name"], start_key=start_key)
+    page.items = projection.trim(page.items, fields)
+    return page
+
+
+def get_cached_restaurants(
+        result_limit: int,
+        start_key: dict | None,
+        fields: tuple[str, ...] | None = None
+) -> pagination.Page:
+    def load() -> tuple[CompactRecords, dict | None]:
+        page = get_restaurants_from_db(result_limit=result_limit, start_key=start_key, fields=fields)
+        return CompactRecords.of(page.items), page.next_key
+
+    cache_key = ("page", result_limit, json.dumps(start_key, sort_keys=True), fields)
+    records, next_key = catalog_cache.get_or_load(cache_key, load)
+    return pagination.Page(items=records.expand(), next_key=next_key)
+
+
+# internal API: callers may keep the catalog a minute, and revalidate it cheaply with If-None-Match after that
+@web_app.get(
+    "/restaurants",
+    middlewares=[
+        http_caching.cache_validation("private, max-age=60", serializer=fast_json.dumps),
+        http_compression.compression(serializer=fast_json.dumps)
+    ]
+)
+def get_restaurants(
+        limit: Annotated[Optional[int], Query(gt=0, le=pagination.MAX_PAGE_SIZE)] = None,
+        cursor: Annotated[Optional[str], Query()] = None,
+        bulk: Annotated[bool, Query()] = False,
+        fields: Annotated[Optional[list[str]], Query()] = None
+) -> Response[Any]:
+    # e.g. "name,image": only those attributes are read and returned
+    try:
+        requested_fields = projection.parse_fields(fields)
+    except projection.InvalidFieldsError as e:
+        raise BadRequestError(str(e))
+
+    if bulk:
+        # whole catalog at once, sorted by name: pagination does not apply
+        return Response(
+            status_code=HTTPStatus.OK.value,
+            content_type=content_types.APPLICATION_JSON,
+            body=restaurant_catalog.all_restaurants(fields=requested_fields)
+        )
+
+    if limit is None:
+        limit = shared_config.get().results.defaultResults
+    logger.info(f"result_limit_params: {limit}")
+
+    try:
+        start_key = cursor_codec().decode(cursor, scope=CURSOR_SCOPE) if cursor else None
+    except pagination.InvalidCursorError as e:
+        raise BadRequestError(str(e))
+
+    page = get_cached_restaurants(result_limit=limit, start_key=start_key, fields=requested_fields)
+
+    headers = {}
+    if page.next_key:
+        headers[pagination.NEXT_CURSOR_HEADER] = cursor_codec().encode(page.next_key, scope=CURSOR_SCOPE)
+
+    return Response(
+        status_code=HTTPStatus.OK.value,
+        content_type=content_types.APPLICATION_JSON,
+        body=page.items,
+        headers=headers
     )
-    result_limit = int(cast(dict, result_limit_params)["defaultResults"])
-    logger.info(f"result_limit_params: {result_limit}")
-
-    return get_restaurants_from_db(result_limit=result_limit)
 
 
 def handler(event: dict, context: LambdaContext) -> dict:
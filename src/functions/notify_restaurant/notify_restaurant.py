@@ -1,17 +1,20 @@
 import os
 import json
-import boto3
+from aws_lambda_powertools import Metrics
 from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.utilities.data_classes import event_source, EventBridgeEvent
 from aws_lambda_powertools.utilities.idempotency import DynamoDBPersistenceLayer, idempotent, IdempotencyConfig
 
-from aws_xray_sdk.core import patch_all
+from big_mouth import bootstrap
+from big_mouth.event_publisher import EventPublisher
 
-# patch all boto3 clients to also include x-ray tracing
-patch_all()
+# x-ray tracing of the boto3 clients
+bootstrap.patch_xray("botocore")
 
 
 logger = Logger(log_uncaught_exceptions=True)
+# published, retried and dropped events (see EventPublisher), in the POWERTOOLS_METRICS_NAMESPACE namespace
+metrics = Metrics()
 
 bus_name = os.getenv("EVENT_BUS_NAME")
 if not bus_name:
@@ -25,9 +28,9 @@ topic_ARN = os.getenv("TOPIC_ARN")
 if not bus_name:
     raise ValueError("TOPIC_ARN environment variable is not set")
 
-eventbridge_client = boto3.client("events")
-sns_client = boto3.client("sns")
+publisher = EventPublisher(bus_name, metrics=metrics)
 
+@metrics.log_metrics
 @event_source(data_class=EventBridgeEvent)
 @idempotent(
     persistence_store=DynamoDBPersistenceLayer(table_name=idempotency_table),
@@ -36,20 +39,13 @@ sns_client = boto3.client("sns")
 def handler(event: EventBridgeEvent, context):
 
     order = event.detail
-    sns_client.publish(
+    bootstrap.client("sns").publish(
         TopicArn=topic_ARN,
         Message=json.dumps(order)
     )
 
     logger.info(f"notified restaurant of order: {order["orderId"]}")
 
-    eventbridge_client.put_events(
-        Entries=[
-            {
-                "Source": "big-mouth",
-                "DetailType": "restaurant_notified",
-                "Detail": json.dumps(order),
-                "EventBusName": bus_name
-            }
-        ]
-    )
+    # raises if the event could not be published: the invocation is then retried, the idempotency record being
+    # released
+    publisher.publish("restaurant_notified", order, context)
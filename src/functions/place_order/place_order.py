@@ -1,27 +1,59 @@
 import os
+from http import HTTPStatus
 
+from aws_lambda_powertools import Metrics
 from aws_lambda_powertools.event_handler import APIGatewayRestResolver
+from aws_lambda_powertools.event_handler.exceptions import ServiceError
+from aws_lambda_powertools.logging import Logger
+from botocore.exceptions import ClientError
 
-from place_order_logic import Order, do_place_order
+from big_mouth import bootstrap
+from big_mouth.event_publisher import EventPublisher, EventPublishError
+from big_mouth.order_store import OrderExistsError, OrderStore
 
-from aws_xray_sdk.core import patch_all
+from place_order_logic import Order, OrderBatch, do_place_order, do_place_orders
 
-# patch all boto3 clients to also include x-ray tracing
-patch_all()
+# x-ray tracing of the boto3 clients
+bootstrap.patch_xray("botocore")
 
 
+# parent of the child loggers of `EventPublisher` and `place_order_logic`, e.g. the dropped events
+logger = Logger(log_uncaught_exceptions=True)
 web_app = APIGatewayRestResolver(enable_validation=True)
 
+# published, retried and dropped events (see EventPublisher), in the POWERTOOLS_METRICS_NAMESPACE namespace
+metrics = Metrics()
+
 bus_name = os.getenv("EVENT_BUS_NAME")
 if not bus_name:
     raise ValueError("EVENT_BUS_NAME environment variable is not set")
 
+publisher = EventPublisher(bus_name, metrics=metrics)
+
+orders_table_name = os.getenv("ORDERS_TABLE_NAME")
+if not orders_table_name:
+    raise ValueError("ORDERS_TABLE_NAME environment variable is not set")
+
+# orders are written before their event is published, so that their status can be read right away (GET /orders/{id})
+orders = OrderStore(orders_table_name)
+
 
 @web_app.post("/orders")
 def place_order(event: Order) -> dict:
-    order_id = do_place_order(event, bus_name)
+    try:
+        order_id = do_place_order(event, publisher, orders, web_app.lambda_context)
+    except (ClientError, OrderExistsError, EventPublishError):
+        # not written (e.g. throttled), or deleted after its event failed: nothing is left of the order
+        raise ServiceError(HTTPStatus.SERVICE_UNAVAILABLE.value, "the order could not be placed, please retry")
     return {"orderId": order_id}
 
 
+# many orders at once (e.g. catering): their events are packed into as few PutEvents calls as possible
+@web_app.post("/orders/batch")
+def place_orders(batch: OrderBatch) -> dict:
+    return {"orders": do_place_orders(batch, publisher, orders, web_app.lambda_context)}
+
+
+@metrics.log_metrics
 def handler(event, context):
-    return web_app.resolve(event, context)
\ No newline at end of file
+    return web_app.resolve(event, context)
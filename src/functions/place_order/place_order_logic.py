@@ -1,35 +1,97 @@
-import random
-import json
+from aws_lambda_powertools.logging import Logger
+from botocore.exceptions import ClientError
+from pydantic import BaseModel, Field
 
-import boto3
-from pydantic import BaseModel
+from big_mouth import order_store, ulid
+from big_mouth.event_publisher import EventPublisher, EventPublishError
+from big_mouth.order_store import OrderStore, OrderWriteError
 
-from aws_xray_sdk.core import patch_all
+logger = Logger(child=True)
 
-# patch boto3 client to also include x-ray tracing
-patch_all()
+# max number of orders of POST /orders/batch
+MAX_BATCH_ORDERS = 100
 
 
 class Order(BaseModel):
-    restaurantName: str
-
-eventbridge_client = boto3.client("events")
-
-def do_place_order(event: Order, bus_name: str) -> int:
-    order_id = random.randint(1000, 9999)
-
-    eventbridge_client.put_events(
-        Entries=[
-            {
-                "Source": "big-mouth",
-                "DetailType": "order_placed",
-                "Detail": json.dumps({
-                    "orderId": order_id,
-                    "restaurantName": event.restaurantName
-                }),
-                "EventBusName": bus_name
-            },
-        ]
-    )
+    # checked before anything is written (see `order_store`)
+    restaurantName: str = Field(min_length=1, max_length=order_store.MAX_RESTAURANT_NAME_LENGTH)
+
+
+class OrderBatch(BaseModel):
+    orders: list[Order] = Field(min_length=1, max_length=MAX_BATCH_ORDERS)
+
+
+def new_order_id() -> str:
+    # unique across containers and sorted by time, see `ulid`
+    return ulid.new()
+
+
+def new_order_ids(count: int) -> list[str]:
+    return ulid.new_many(count)
+
+
+def order_placed_detail(order_id: str, order: Order) -> dict:
+    return {
+        "orderId": order_id,
+        "restaurantName": order.restaurantName
+    }
 
+
+def delete_unplaced_orders(orders: OrderStore, order_ids: list[str]) -> None:
+    """
+    Deletes the orders written but not placed. A failure to delete is logged, with the orders left without event,
+    rather than raised in place of the failure being compensated.
+    """
+    if not order_ids:
+        return
+    try:
+        orders.delete_orders(order_ids)
+    except (ClientError, OrderWriteError):
+        logger.exception("orders not placed left in the table", extra={"order_ids": order_ids})
+
+
+def do_place_order(event: Order, publisher: EventPublisher, orders: OrderStore, context=None) -> str:
+    """
+    Writes the order, then publishes its event. Raises `OrderExistsError` or `ClientError` if the order could not be
+    written, and `EventPublishError` if its event could not be published, in which case the order is deleted.
+    """
+    order_id = new_order_id()
+    orders.put_order(order_store.new_order(order_id, event.restaurantName))
+    try:
+        publisher.publish("order_placed", order_placed_detail(order_id, event), context)
+    except EventPublishError:
+        delete_unplaced_orders(orders, [order_id])
+        raise
     return order_id
+
+
+def do_place_orders(batch: OrderBatch, publisher: EventPublisher, orders: OrderStore, context=None) -> list[dict]:
+    """
+    Places the orders of a batch with as few PutEvents calls as possible (see `EventPublisher`). Returns the result of
+    each order, in order. The orders whose event could not be published are deleted, and so are all the orders of the
+    batch if one could not be written: none of them is placed then.
+    """
+    order_ids = new_order_ids(len(batch.orders))
+    try:
+        orders.put_orders(
+            [order_store.new_order(order_id, order.restaurantName) for order_id, order in zip(order_ids, batch.orders)]
+        )
+    except (ClientError, OrderWriteError) as e:
+        # no event was sent yet: none of the batch is placed, and the orders already written must not stay PLACED
+        error = e.response["Error"]["Code"] if isinstance(e, ClientError) else "UnprocessedItems"
+        logger.warning("orders not written", extra={"orders": len(order_ids), "error": error})
+        delete_unplaced_orders(orders, order_ids)
+        return [{"orderId": order_id, "placed": False, "error": error} for order_id in order_ids]
+
+    results = publisher.publish_all(
+        [("order_placed", order_placed_detail(order_id, order)) for order_id, order in zip(order_ids, batch.orders)],
+        context
+    )
+    delete_unplaced_orders(orders, [order_id for order_id, result in zip(order_ids, results) if not result.published])
+
+    return [
+        {"orderId": order_id, "placed": True}
+        if result.published
+        else {"orderId": order_id, "placed": False, "error": result.error_code}
+        for order_id, result in zip(order_ids, results)
+    ]
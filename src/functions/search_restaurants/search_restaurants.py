@@ -1,72 +1,316 @@
-from typing import cast
+from bisect import bisect_right
+from http import HTTPStatus
+from typing import Annotated, Any, Optional
 
-import boto3
+import json
 import os
 
-from aws_lambda_powertools.event_handler import APIGatewayRestResolver
-from aws_lambda_powertools.utilities import parameters
+from aws_lambda_powertools.event_handler import APIGatewayRestResolver, Response, content_types
+from aws_lambda_powertools.event_handler.exceptions import BadRequestError
+from aws_lambda_powertools.event_handler.openapi.params import Query
 from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, Json, SecretStr, model_validator
 
-from aws_xray_sdk.core import patch_all
+from big_mouth import (
+    autocomplete,
+    bootstrap,
+    config,
+    fast_json,
+    geo_search,
+    http_caching,
+    http_compression,
+    pagination,
+    projection,
+    restaurant_index,
+    theme_query
+)
+from big_mouth.catalog_cache import CatalogCache, CompactRecords
+from big_mouth.restaurant_store import RestaurantStore
 
-# patch all boto3 clients to also include x-ray tracing
-patch_all()
+# x-ray tracing of the boto3 clients
+bootstrap.patch_xray("botocore")
 
 
 logger = Logger(log_uncaught_exceptions=True)
-web_app = APIGatewayRestResolver(enable_validation=True)
+web_app = APIGatewayRestResolver(enable_validation=True, serializer=fast_json.dumps)
 
 
 TABLE_NAME = os.getenv("TABLE_NAME")
+INDEX_TABLE_NAME = os.getenv("INDEX_TABLE_NAME")
 MATURITY_LEVEL = os.getenv("MATURITY_LEVEL")
 SERVICE_NAME = logger.service.replace("-", "_")
 
 if not TABLE_NAME:
     raise ValueError("TABLE_NAME environment variable is not set")
 
+if not INDEX_TABLE_NAME:
+    raise ValueError("INDEX_TABLE_NAME environment variable is not set")
+
 if not MATURITY_LEVEL:
     raise ValueError("PARAM_GROUP environment variable is not set")
 
 
-dynamo_client = boto3.client('dynamodb')
-dynamo_resource = boto3.resource('dynamodb')
-restaurant_table_client = dynamo_resource.Table(TABLE_NAME)
+# low-level client, only created when first used
+restaurant_store = RestaurantStore(table_name=TABLE_NAME, index_table_name=INDEX_TABLE_NAME)
+
+# search results are cached in warm containers until the catalog version changes, or at most for this long
+catalog_cache = CatalogCache(
+    read_version=restaurant_store.read_catalog_version,
+    ttl_seconds=float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "300"))
+)
+
+# the autocomplete index is built from the whole catalog once per catalog version; keystrokes must not wait for
+# DynamoDB, so the version is only checked every AUTOCOMPLETE_VERSION_CHECK_SECONDS
+autocomplete_cache = CatalogCache(
+    read_version=restaurant_store.read_catalog_version,
+    ttl_seconds=float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "300")),
+    max_entries=1,
+    version_check_seconds=float(os.getenv("AUTOCOMPLETE_VERSION_CHECK_SECONDS", "30"))
+)
+AUTOCOMPLETE_FIELDS = ("name", "themes")
+
+class ResultsConfig(BaseModel):
+    defaultResults: int = Field(gt=0, le=pagination.MAX_PAGE_SIZE)
+
+class SearchRestaurantsConfig(BaseModel):
+    # /production_ready_serverless/shared_context/dev/search_restaurants/config
+    results: Json[ResultsConfig] = Field(alias="search_restaurants/config")
 
-def search_restaurants(theme: str, result_limit: int) -> list[dict]:
-    response = restaurant_table_client.scan(
-        Limit=int(result_limit),
-        FilterExpression="contains(themes, :theme)",
-        ExpressionAttributeValues={
-            ":theme": theme
-        }
+class PaginationSecrets(BaseModel):
+    # /production_ready_serverless/shared_context/dev/pagination/secrets
+    pagination_key: SecretStr = Field(alias="pagination/secrets")
+
+# read at cold start (from the snapshot when there is one), then refreshed in the background
+shared_config = config.SharedConfig(SearchRestaurantsConfig, service_name=SERVICE_NAME, maturity_level=MATURITY_LEVEL)
+# secure string, which cannot be baked into the snapshot: only read when a cursor is first encoded or decoded
+pagination_secrets = config.SharedConfig(
+    PaginationSecrets, service_name=SERVICE_NAME, maturity_level=MATURITY_LEVEL, lazy=True
+)
+
+def cursor_codec() -> pagination.CursorCodec:
+    return pagination.CursorCodec(signing_key=pagination_secrets.get().pagination_key.get_secret_value())
+
+def search_restaurants(
+        theme: str,
+        result_limit: int,
+        start_key: dict | None = None,
+        fields: tuple[str, ...] | None = None
+) -> pagination.Page:
+    # the theme index holds one copy of each restaurant per theme => a Query only reads the matching restaurants
+    def query(exclusive_start_key: dict | None, limit: int) -> dict:
+        return restaurant_store.query_theme(theme, exclusive_start_key=exclusive_start_key, limit=limit, fields=fields)
+
+    page = pagination.read_page(
+        read=query,
+        page_size=int(result_limit),
+        key_attributes=restaurant_index.INDEX_KEY_ATTRIBUTES,
+        start_key=start_key
+    )
+    page.items = projection.trim(
+        [restaurant_index.restaurant_from_posting(posting) for posting in page.items],
+        fields
     )
-    return response['Items']
+    return page
+
+def search_cached_restaurants(
+        theme: str,
+        result_limit: int,
+        start_key: dict | None,
+        fields: tuple[str, ...] | None = None
+) -> pagination.Page:
+    def load() -> tuple[CompactRecords, dict | None]:
+        page = search_restaurants(theme=theme, result_limit=result_limit, start_key=start_key, fields=fields)
+        return CompactRecords.of(page.items), page.next_key
+
+    cache_key = ("theme", theme, result_limit, json.dumps(start_key, sort_keys=True), fields)
+    records, next_key = catalog_cache.get_or_load(cache_key, load)
+    return pagination.Page(items=records.expand(), next_key=next_key)
+
+def search_restaurants_by_query(
+        query: theme_query.Node,
+        result_limit: int,
+        start_key: dict | None = None,
+        fields: tuple[str, ...] | None = None
+) -> pagination.Page:
+    # set algebra on the posting lists of the themes, then one BatchGetItem of the restaurants of the page
+    names = theme_query.evaluate(query, restaurant_store.theme_restaurant_names)
+    if start_key:
+        names = names[bisect_right(names, start_key["name"]):]
+
+    page_names = names[:result_limit]
+    restaurants = restaurant_store.get_restaurants(page_names, fields=fields)
+    return pagination.Page(
+        items=projection.trim(restaurants, fields),
+        next_key={"name": page_names[-1]} if len(names) > result_limit else None
+    )
+
+def search_cached_restaurants_by_query(
+        query: theme_query.Node,
+        result_limit: int,
+        start_key: dict | None,
+        fields: tuple[str, ...] | None = None
+) -> pagination.Page:
+    def load() -> tuple[CompactRecords, dict | None]:
+        page = search_restaurants_by_query(query=query, result_limit=result_limit, start_key=start_key, fields=fields)
+        return CompactRecords.of(page.items), page.next_key
+
+    cache_key = ("query", str(query), result_limit, json.dumps(start_key, sort_keys=True), fields)
+    records, next_key = catalog_cache.get_or_load(cache_key, load)
+    return pagination.Page(items=records.expand(), next_key=next_key)
 
 class SearchRestaurantsRequest(BaseModel):
-    theme: str
-
-@web_app.post("/restaurants/search")
-def search(body: SearchRestaurantsRequest) -> list[dict]:
-    result_limit_params = parameters.get_parameter(
-            # /production_ready_serverless/shared_context/dev/search_restaurants/config
-            name=f"/{SERVICE_NAME}/shared_context/{MATURITY_LEVEL}/search_restaurants/config",
-            transform="json",
-            max_age=60
-        )
-    result_limit = int(cast(dict, result_limit_params)["defaultResults"])
+    # either a single theme, or a boolean query on themes, e.g. 'cartoon AND NOT "rick and morty"' (see theme_query)
+    theme: Optional[str] = None
+    query: Optional[str] = None
+    limit: Optional[int] = Field(default=None, gt=0, le=pagination.MAX_PAGE_SIZE)
+    cursor: Optional[str] = None
+    # e.g. ["name", "image"]: only those attributes are read and returned
+    fields: Optional[list[str]] = None
+
+    @model_validator(mode="after")
+    def check_theme_or_query(self) -> "SearchRestaurantsRequest":
+        if (self.theme is None) == (self.query is None):
+            raise ValueError("either theme or query must be set")
+        return self
+
+# POST responses are not reused by HTTP caches, the ETag still lets clients detect unchanged results
+@web_app.post(
+    "/restaurants/search",
+    middlewares=[
+        http_caching.cache_validation("private, no-cache", serializer=fast_json.dumps),
+        http_compression.compression(serializer=fast_json.dumps)
+    ]
+)
+def search(body: SearchRestaurantsRequest) -> Response[Any]:
+    result_limit = body.limit
+    if result_limit is None:
+        result_limit = shared_config.get().results.defaultResults
     logger.info(f"result_limit_params: {result_limit}")
 
-    some_secret = parameters.get_parameter(
-        # /production_ready_serverless/shared_context/dev/search_restaurants/secrets
-        name=f"/{SERVICE_NAME}/shared_context/{MATURITY_LEVEL}/search_restaurants/secrets",
-        transform=None,
-        max_age=60
+    query = None
+    if body.query is not None:
+        try:
+            query = theme_query.parse(body.query)
+        except theme_query.InvalidQueryError as e:
+            raise BadRequestError(f"invalid query: {e}")
+
+    # cursors are only valid for the theme or the query they were issued for
+    cursor_scope = f"search:{body.theme}" if query is None else f"search-query:{query}"
+    try:
+        start_key = cursor_codec().decode(body.cursor, scope=cursor_scope) if body.cursor else None
+    except pagination.InvalidCursorError as e:
+        raise BadRequestError(str(e))
+
+    try:
+        fields = projection.parse_fields(body.fields)
+    except projection.InvalidFieldsError as e:
+        raise BadRequestError(str(e))
+
+    if query is None:
+        page = search_cached_restaurants(body.theme, result_limit=result_limit, start_key=start_key, fields=fields)
+    else:
+        page = search_cached_restaurants_by_query(query, result_limit=result_limit, start_key=start_key, fields=fields)
+
+    headers = {}
+    if page.next_key:
+        headers[pagination.NEXT_CURSOR_HEADER] = cursor_codec().encode(page.next_key, scope=cursor_scope)
+
+    return Response(
+        status_code=HTTPStatus.OK.value,
+        content_type=content_types.APPLICATION_JSON,
+        body=page.items,
+        headers=headers
+    )
+
+class NearbyRestaurantsRequest(BaseModel):
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+    # number of restaurants, the nearest first
+    limit: Optional[int] = Field(default=None, gt=0, le=pagination.MAX_PAGE_SIZE)
+    maxDistanceKm: Optional[float] = Field(default=None, gt=0)
+    # e.g. ["name", "image"]: only those attributes are read and returned, along with the distance
+    fields: Optional[list[str]] = None
+
+# results depend on the exact location of the user: they are not cached
+@web_app.post(
+    "/restaurants/nearby",
+    middlewares=[
+        http_caching.cache_validation("private, no-cache", serializer=fast_json.dumps),
+        http_compression.compression(serializer=fast_json.dumps)
+    ]
+)
+def nearby(body: NearbyRestaurantsRequest) -> Response[Any]:
+    result_limit = body.limit
+    if result_limit is None:
+        result_limit = shared_config.get().results.defaultResults
+
+    try:
+        fields = projection.parse_fields(body.fields)
+    except projection.InvalidFieldsError as e:
+        raise BadRequestError(str(e))
+
+    # the geo postings of the index are queried cell by cell, widening until the nearest restaurants are known
+    restaurants = geo_search.nearest(
+        body.latitude,
+        body.longitude,
+        k=result_limit,
+        read_cell=lambda cell: restaurant_store.query_geo_cell(cell, fields=fields),
+        max_distance_km=body.maxDistanceKm
+    )
+    items = projection.trim([nearby.restaurant for nearby in restaurants], fields)
+    return Response(
+        status_code=HTTPStatus.OK.value,
+        content_type=content_types.APPLICATION_JSON,
+        body=[
+            {**item, "distanceKm": round(nearby.distance_km, 3)}
+            for item, nearby in zip(items, restaurants)
+        ]
+    )
+
+# the counts are a single item of the index, kept up to date by the restaurant writes: no need for a container cache
+@web_app.get(
+    "/restaurants/themes",
+    middlewares=[http_caching.cache_validation("private, max-age=60", serializer=fast_json.dumps)]
+)
+def themes() -> Response[Any]:
+    counts = restaurant_store.read_theme_counts()
+    return Response(
+        status_code=HTTPStatus.OK.value,
+        content_type=content_types.APPLICATION_JSON,
+        # most common themes first
+        body=[
+            {"theme": theme, "count": count}
+            for theme, count in sorted(counts.items(), key=lambda theme_count: (-theme_count[1], theme_count[0]))
+        ]
     )
 
-    restaurants = search_restaurants(theme=body.theme, result_limit=result_limit)
-    return restaurants
+def autocomplete_index() -> autocomplete.AutocompleteIndex:
+    return autocomplete_cache.get_or_load(
+        "autocomplete",
+        lambda: autocomplete.AutocompleteIndex.build(
+            restaurant_store.scan_all(
+                total_segments=int(os.getenv("BULK_SCAN_SEGMENTS", "4")),
+                fields=AUTOCOMPLETE_FIELDS
+            )
+        )
+    )
+
+# typed in the search box: browsers may reuse suggestions for a minute
+@web_app.get(
+    "/restaurants/autocomplete",
+    middlewares=[http_caching.cache_validation("private, max-age=60", serializer=fast_json.dumps)]
+)
+def suggest(
+        q: Annotated[str, Query(max_length=autocomplete.MAX_QUERY_LENGTH)],
+        limit: Annotated[int, Query(gt=0, le=autocomplete.MAX_SUGGESTIONS)] = autocomplete.DEFAULT_SUGGESTIONS
+) -> Response[Any]:
+    suggestions = autocomplete_index().suggest(q, limit=limit)
+    return Response(
+        status_code=HTTPStatus.OK.value,
+        content_type=content_types.APPLICATION_JSON,
+        body=[{"text": suggestion.text, "type": suggestion.type} for suggestion in suggestions]
+    )
 
 def handler(event: dict, context: LambdaContext) -> dict:
     return web_app.resolve(event, context)
\ No newline at end of file
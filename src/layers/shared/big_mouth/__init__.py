@@ -0,0 +1,3 @@
+"""
+Code shared by the Big Mouth lambda functions, deployed as a lambda layer (see `svend_l3.shared_layer`).
+"""
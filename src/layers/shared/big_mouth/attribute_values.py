@@ -0,0 +1,112 @@
+"""
+Conversion of the DynamoDB AttributeValues returned by the low-level client (e.g. `{"S": "Fangtasia"}`) straight to
+JSON-ready python types.
+
+boto3's `TypeDeserializer` (used by resources) converts numbers to `Decimal`s and sets to python sets, which then have
+to be converted again to be serialized to JSON. Here, numbers become `int`s, or `float`s when they have a fractional
+part or an exponent, and sets become lists. Binary values become base64 strings.
+
+The converters of the attributes whose type is known can be given as a schema, which skips the generic dispatch on
+the type of the value:
+
+    to_restaurant = item_converter({"name": string, "image": string, "themes": string_list})
+    restaurants = [to_restaurant(item) for item in response["Items"]]
+
+A value that does not match its schema type falls back to the generic conversion.
+"""
+import base64
+from collections.abc import Callable, Mapping
+from typing import Any
+
+Converter = Callable[[dict], Any]
+
+
+def _number(value: str) -> int | float:
+    if "." in value or "e" in value or "E" in value:
+        return float(value)
+    return int(value)
+
+
+def _binary(value: bytes) -> str:
+    return base64.b64encode(value).decode()
+
+
+_CONVERTERS: dict[str, Callable[[Any], Any]] = {
+    "S": lambda v: v,
+    "N": _number,
+    "BOOL": lambda v: v,
+    "NULL": lambda v: None,
+    "L": lambda v: [to_python(e) for e in v],
+    "M": lambda v: {k: to_python(e) for k, e in v.items()},
+    "SS": list,
+    "NS": lambda v: [_number(n) for n in v],
+    "B": _binary,
+    "BS": lambda v: [_binary(b) for b in v],
+}
+
+
+def to_python(value: dict) -> Any:
+    """
+    Generic conversion of one AttributeValue.
+    """
+    for type_, v in value.items():
+        return _CONVERTERS[type_](v)
+    raise ValueError("empty attribute value")
+
+
+def string(value: dict) -> str:
+    try:
+        return value["S"]
+    except KeyError:
+        return to_python(value)
+
+
+def number(value: dict) -> int | float:
+    try:
+        return _number(value["N"])
+    except KeyError:
+        return to_python(value)
+
+
+def string_list(value: dict) -> list[str]:
+    """
+    List of strings, stored either as a list (L) or as a string set (SS).
+    """
+    try:
+        return [e["S"] for e in value["L"]]
+    except KeyError:
+        return to_python(value)
+
+
+def item_converter(schema: Mapping[str, Converter] | None = None) -> Callable[[dict], dict]:
+    """
+    Returns a function converting whole items, with the converters of `schema` for the attributes it names.
+    """
+    converters = dict(schema or {})
+
+    def convert(item: dict) -> dict:
+        return {name: converters.get(name, to_python)(value) for name, value in item.items()}
+
+    return convert
+
+
+def key_to_attribute_values(key: dict) -> dict:
+    """
+    Converts a primary key (e.g. `ExclusiveStartKey`) of string, number or binary attributes to AttributeValues.
+    """
+    return {name: attribute_value(value) for name, value in key.items()}
+
+
+def attribute_value(value: str | int | float | bytes) -> dict:
+    """
+    AttributeValue of a scalar, e.g. for `ExpressionAttributeValues`.
+    """
+    if isinstance(value, bool):
+        return {"BOOL": value}
+    if isinstance(value, str):
+        return {"S": value}
+    if isinstance(value, (int, float)):
+        return {"N": str(value)}
+    if isinstance(value, bytes):
+        return {"B": value}
+    raise TypeError(f"unsupported attribute value type {type(value)}")
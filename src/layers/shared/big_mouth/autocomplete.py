@@ -0,0 +1,181 @@
+"""
+Autocomplete of restaurant names and themes, for the search box (`GET /restaurants/autocomplete?q=`).
+
+The index is built in memory from the whole catalog, once per catalog version (see `CatalogCache`), so that answering
+a keystroke only costs a few dict lookups:
+
+* every prefix of every word of the names and themes is indexed, so `q=fan` finds "Fangtasia" and `q=true bl` finds
+  "true blood" (every word of the query must match a word of the suggestion, the last one being usually incomplete)
+* typos are tolerated with a deletion index (as in SymSpell): the prefixes are also indexed under all their variants
+  with one character removed, so that the prefixes at one edit (insertion, deletion, substitution or transposition)
+  of a query word are found without comparing it to every word of the catalog. `q=fangtsia` finds "Fangtasia"
+
+Suggestions are ranked by how well they match: exact words first, then prefixes, then words with a typo; then the
+suggestions starting with the query, the restaurants before the themes, and the shortest ones.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+# default and max number of suggestions of one request
+DEFAULT_SUGGESTIONS = 8
+MAX_SUGGESTIONS = 20
+
+# max length of a query, longer ones are rejected
+MAX_QUERY_LENGTH = 100
+
+# query words shorter than this are only matched exactly, one typo in 3 letters matches too many words
+MIN_FUZZY_LENGTH = 4
+
+# match quality of a query word
+_EXACT, _PREFIX, _TYPO = 3, 2, 1
+
+_KIND_ORDER = {"restaurant": 0, "theme": 1}
+
+_NOT_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    text: str
+    # "restaurant" or "theme"
+    type: str
+
+
+def normalize(text: str) -> list[str]:
+    """
+    Words of a text, case and accent insensitive: "Shoney's Café" -> ["shoney", "s", "cafe"].
+    """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    without_accents = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _NOT_ALPHANUMERIC.sub(" ", without_accents).split()
+
+
+def _deletions(word: str) -> set[str]:
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """
+    True if a and b are at most one insertion, deletion, substitution or transposition apart.
+    """
+    if abs(len(a) - len(b)) > 1:
+        return False
+    prefix = 0
+    while prefix < min(len(a), len(b)) and a[prefix] == b[prefix]:
+        prefix += 1
+    a, b = a[prefix:], b[prefix:]
+    return (
+        a[1:] == b[1:]  # substitution (or equal)
+        or a[1:] == b or a == b[1:]  # deletion, insertion
+        or (len(a) >= 2 and a[0] == b[1:2] and a[1] == b[0:1] and a[2:] == b[2:])  # transposition
+    )
+
+
+class AutocompleteIndex:
+
+    def __init__(self, suggestions: list[Suggestion]):
+        self.suggestions = suggestions
+        # word -> suggestions having it
+        self._word_suggestions: dict[str, list[int]] = defaultdict(list)
+        # prefix -> words starting with it
+        self._prefix_words: dict[str, set[str]] = defaultdict(set)
+        # prefix with one character removed -> prefixes
+        self._deleted_prefixes: dict[str, set[str]] = defaultdict(set)
+        # words of each suggestion, to rank the ones starting with the query
+        self._first_words: list[str] = []
+
+        for position, suggestion in enumerate(suggestions):
+            words = normalize(suggestion.text)
+            self._first_words.append(words[0] if words else "")
+            for word in dict.fromkeys(words):
+                self._word_suggestions[word].append(position)
+
+        for word in self._word_suggestions:
+            for length in range(1, len(word) + 1):
+                prefix = word[:length]
+                self._prefix_words[prefix].add(word)
+                if length >= MIN_FUZZY_LENGTH - 1:
+                    for deletion in _deletions(prefix):
+                        self._deleted_prefixes[deletion].add(prefix)
+
+    @staticmethod
+    def build(restaurants: Iterable[dict]) -> "AutocompleteIndex":
+        """
+        Index of the names and themes of the restaurants, e.g. as read by `RestaurantStore.scan_all`.
+        """
+        names: dict[str, None] = {}
+        themes: dict[str, None] = {}
+        for restaurant in restaurants:
+            names[restaurant["name"]] = None
+            themes.update(dict.fromkeys(restaurant.get("themes", [])))
+        return AutocompleteIndex(
+            [Suggestion(name, "restaurant") for name in names] + [Suggestion(theme, "theme") for theme in themes]
+        )
+
+    def _matching_prefixes(self, word: str) -> dict[str, int]:
+        """
+        Prefixes matching a query word, with the quality of the match.
+        """
+        matches = {word: _PREFIX} if word in self._prefix_words else {}
+        if len(word) < MIN_FUZZY_LENGTH:
+            return matches
+
+        # prefixes at one edit of the word share a deletion with it (or are one)
+        candidates = set(self._deleted_prefixes.get(word, ()))
+        for deletion in _deletions(word):
+            if deletion in self._prefix_words:
+                candidates.add(deletion)
+            candidates.update(self._deleted_prefixes.get(deletion, ()))
+        for prefix in candidates:
+            if prefix not in matches and _within_one_edit(word, prefix):
+                matches[prefix] = _TYPO
+        return matches
+
+    def _matching_suggestions(self, word: str) -> dict[int, int]:
+        """
+        Suggestions matching a query word, with the quality of the best match.
+        """
+        matches: dict[int, int] = {}
+        for prefix, quality in self._matching_prefixes(word).items():
+            for indexed_word in self._prefix_words[prefix]:
+                word_quality = _EXACT if quality == _PREFIX and indexed_word == word else quality
+                for position in self._word_suggestions[indexed_word]:
+                    if matches.get(position, 0) < word_quality:
+                        matches[position] = word_quality
+        return matches
+
+    def suggest(self, query: str, limit: int = DEFAULT_SUGGESTIONS) -> list[Suggestion]:
+        """
+        Best suggestions for a query, e.g. what has been typed in the search box so far.
+        """
+        words = list(dict.fromkeys(normalize(query)))
+        if not words:
+            return []
+
+        # every word of the query must match, rarest words first to intersect small sets
+        scores: dict[int, int] | None = None
+        for matches in sorted((self._matching_suggestions(word) for word in words), key=len):
+            if scores is None:
+                scores = matches
+            else:
+                scores = {
+                    position: score + matches[position] for position, score in scores.items() if position in matches
+                }
+            if not scores:
+                return []
+
+        def rank(position: int) -> tuple:
+            suggestion = self.suggestions[position]
+            starts_with_query = self._first_words[position].startswith(words[0])
+            return (
+                -scores[position],
+                not starts_with_query,
+                _KIND_ORDER.get(suggestion.type, len(_KIND_ORDER)),
+                len(suggestion.text),
+                suggestion.text
+            )
+
+        return [self.suggestions[position] for position in sorted(scores, key=rank)[:limit]]
@@ -0,0 +1,33 @@
+"""
+Cold start helpers: lazily constructed AWS clients, and selective X-Ray patching.
+
+Creating a boto3 client loads and parses its service model, which is a large part of the init duration of a function.
+The clients below are only created when first used, then reused for the life of the container, and shared between the
+modules of a function:
+
+    bootstrap.client("events").put_events(...)
+    bootstrap.client("dynamodb").query(...)
+
+Modules only needed by some code paths should be imported where they are used rather than at the top of the handler.
+"""
+import functools
+import os
+
+import boto3
+
+
+@functools.cache
+def client(service_name: str):
+    return boto3.client(service_name)
+
+
+def patch_xray(*libraries: str) -> None:
+    """
+    Patches only the given libraries (e.g. "botocore", "requests") for X-Ray tracing, instead of `patch_all()`, which
+    imports and patches every supported library it finds. Nothing is imported when the X-Ray SDK is disabled.
+    """
+    if os.getenv("AWS_XRAY_SDK_ENABLED", "true").lower() == "false":
+        return
+
+    from aws_xray_sdk.core import patch
+    patch(libraries)
@@ -0,0 +1,44 @@
+"""
+Read access to the whole restaurant catalog, shared by `get_restaurants` (bulk mode) and by the functions reading the
+catalog directly from DynamoDB instead of going through the restaurants API (e.g. `get_index`).
+"""
+from collections.abc import Sequence
+
+from big_mouth import projection
+from big_mouth.catalog_cache import CatalogCache, CompactRecords
+from big_mouth.restaurant_store import RestaurantStore
+
+
+class Catalog:
+    """
+    Whole catalog, sorted by name, read with a parallel segmented scan of the restaurants table and cached in the warm
+    container until the catalog version changes (see `CatalogCache`).
+    """
+
+    def __init__(
+            self,
+            table_name: str,
+            index_table_name: str,
+            bulk_scan_segments: int = 4,
+            cache_ttl_seconds: float = 300,
+            dynamo_client=None
+    ):
+        self.bulk_scan_segments = bulk_scan_segments
+        # low-level client, only created when first used
+        self.store = RestaurantStore(table_name, index_table_name, dynamo_client=dynamo_client)
+        self.cache = CatalogCache(read_version=self.store.read_catalog_version, ttl_seconds=cache_ttl_seconds)
+
+    def read_all_restaurants(self, fields: Sequence[str] | None = None) -> list[dict]:
+        """
+        Uncached read of the whole catalog, with all the fields of the restaurants, or only the given ones.
+        """
+        restaurants = self.store.scan_all(total_segments=self.bulk_scan_segments, fields=fields)
+        return projection.trim(restaurants, fields)
+
+    def all_restaurants(self, fields: Sequence[str] | None = None) -> list[dict]:
+        fields = tuple(sorted(fields)) if fields is not None else None
+        records = self.cache.get_or_load(
+            ("bulk", fields),
+            lambda: CompactRecords.of(self.read_all_restaurants(fields))
+        )
+        return records.expand()
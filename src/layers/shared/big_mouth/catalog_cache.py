@@ -0,0 +1,132 @@
+"""
+Warm-container cache of restaurant catalog reads.
+
+The catalog rarely changes, so the result of a read can be served again by the same container, as long as the
+catalog version item (see `restaurant_index`) did not change since it was cached: a hit costs one small `GetItem`
+instead of a `Scan` or `Query`. Entries also expire after a TTL, as a safety net.
+
+Reads on the hot path of keystroke-rate requests (e.g. the autocomplete index) can also reuse the version itself for
+a few seconds (`version_check_seconds`), so that a hit does not touch DynamoDB at all, at the cost of serving a
+changed catalog that much later.
+
+Cached restaurants are stored as `CompactRecords`, i.e. tuples sharing one field list, rather than one dict each.
+"""
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from aws_lambda_powertools.logging import Logger
+
+logger = Logger(child=True)
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class CompactRecords:
+    fields: tuple[str, ...]
+    rows: tuple[tuple, ...]
+
+    @staticmethod
+    def of(items: Iterable[dict]) -> "CompactRecords":
+        items = list(items)
+        fields = tuple(dict.fromkeys(field for item in items for field in item))
+        rows = tuple(
+            tuple(_freeze(item.get(field, _MISSING)) for field in fields)
+            for item in items
+        )
+        return CompactRecords(fields=fields, rows=rows)
+
+    def expand(self) -> list[dict]:
+        return [
+            {field: _thaw(value) for field, value in zip(self.fields, row) if value is not _MISSING}
+            for row in self.rows
+        ]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+def _freeze(value):
+    # lists (e.g. themes) are stored as tuples, which are smaller and immutable
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+@dataclass
+class _Entry:
+    version: int
+    loaded_at: float
+    value: Any
+
+
+class CatalogCache:
+    """
+    Caches the values returned by `load` functions, per key, for the catalog version returned by `read_version`.
+    """
+
+    def __init__(
+            self,
+            read_version: Callable[[], int],
+            ttl_seconds: float = 300,
+            max_entries: int = 256,
+            version_check_seconds: float = 0
+    ):
+        self._read_version = read_version
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._version_check_seconds = version_check_seconds
+        self._version: int | None = None
+        self._version_read_at = 0.0
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def current_version(self) -> int:
+        """
+        Catalog version, read again if it was read more than `version_check_seconds` ago.
+        """
+        now = time.monotonic()
+        if self._version is None or now - self._version_read_at >= self._version_check_seconds:
+            self._version = self._read_version()
+            self._version_read_at = now
+        return self._version
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        version = self.current_version()
+        entry = self._entries.get(key)
+
+        if entry and entry.version == version and time.monotonic() - entry.loaded_at < self._ttl_seconds:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            self._log(key, hit=True, version=version)
+            return entry.value
+
+        self.misses += 1
+        self._log(key, hit=False, version=version)
+        value = load()
+        self._entries[key] = _Entry(version=version, loaded_at=time.monotonic(), value=value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def _log(self, key: Hashable, hit: bool, version: int) -> None:
+        logger.info(
+            "catalog cache hit" if hit else "catalog cache miss",
+            extra={
+                "cache_key": str(key),
+                "catalog_version": version,
+                "cache_hits": self.hits,
+                "cache_misses": self.misses
+            }
+        )
@@ -0,0 +1,129 @@
+"""
+Configuration shared across deployments, stored in SSM under `/{SERVICE_NAME}/shared_context/{MATURITY_LEVEL}/...`.
+
+Each function declares the parameters it needs as a pydantic model, whose field aliases are the parameter paths
+relative to the shared context:
+
+    class SearchConfig(BaseModel):
+        search: Json[ResultsConfig] = Field(alias="search_restaurants/config")
+        pagination_key: SecretStr = Field(alias="pagination/secrets")
+
+    search_config = SharedConfig(SearchConfig, service_name=SERVICE_NAME, maturity_level=MATURITY_LEVEL)
+
+All the parameters are read with a single `GetParameters` call, when the `SharedConfig` is created (i.e. at cold
+start). After that, `get()` never waits for SSM: once the values are older than `refresh_seconds`, they are still
+returned while being refreshed in the background (see `resilience.StaleWhileRevalidate`).
+
+Parameter values may also be baked into the environment at deployment, as a snapshot (see `svend_l3.ssm_snapshot`):
+
+    SSM_SNAPSHOT_TAKEN_AT=<epoch seconds>
+    SSM_SNAPSHOT_GET_RESTAURANTS_CONFIG=<value of get_restaurants/config>
+
+Snapshot values are used without calling SSM until the snapshot is older than `SSM_SNAPSHOT_MAX_AGE_SECONDS`; only
+the parameters missing from the snapshot (e.g. secure strings, which cannot be baked) are read at runtime.
+
+Secure strings only needed by some requests (e.g. the signing key of pagination cursors) belong in a separate, `lazy`
+config, read on its first `get()` rather than at cold start, so that the snapshot takes SSM out of the cold start of
+the other requests:
+
+    pagination_secrets = SharedConfig(PaginationSecrets, ..., lazy=True)
+"""
+import math
+import os
+import re
+import time
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+from big_mouth import bootstrap, resilience
+
+M = TypeVar("M", bound=BaseModel)
+
+# max number of names of a GetParameters call
+MAX_PARAMETERS = 10
+
+# max time the cold start waits for SSM
+LOAD_TIMEOUT_SECONDS = 5.0
+
+SNAPSHOT_PREFIX = "SSM_SNAPSHOT_"
+SNAPSHOT_TAKEN_AT = f"{SNAPSHOT_PREFIX}TAKEN_AT"
+SNAPSHOT_MAX_AGE_SECONDS = "SSM_SNAPSHOT_MAX_AGE_SECONDS"
+
+
+def snapshot_variable(parameter: str) -> str:
+    """
+    Name of the environment variable holding the snapshot of a parameter, e.g. SSM_SNAPSHOT_GET_RESTAURANTS_CONFIG for
+    get_restaurants/config.
+    """
+    return SNAPSHOT_PREFIX + re.sub(r"[^A-Za-z0-9]", "_", parameter).upper()
+
+
+def read_snapshot(parameters: list[str], environ=os.environ) -> dict[str, str]:
+    """
+    Values of the given parameters baked into the environment, unless the snapshot is missing or too old.
+    """
+    taken_at = environ.get(SNAPSHOT_TAKEN_AT)
+    if not taken_at:
+        return {}
+    max_age_seconds = float(environ.get(SNAPSHOT_MAX_AGE_SECONDS, "86400"))
+    if time.time() - float(taken_at) > max_age_seconds:
+        return {}
+    return {
+        parameter: environ[snapshot_variable(parameter)]
+        for parameter in parameters
+        if snapshot_variable(parameter) in environ
+    }
+
+
+class SharedConfig(Generic[M]):
+
+    def __init__(
+            self,
+            model: type[M],
+            service_name: str,
+            maturity_level: str,
+            refresh_seconds: float = 60,
+            ssm_client=None,
+            # read on the first get() instead of now
+            lazy: bool = False
+    ):
+        self.model = model
+        self.path_prefix = f"/{service_name}/shared_context/{maturity_level}/"
+        self.parameters = [field.alias or name for name, field in model.model_fields.items()]
+        if len(self.parameters) > MAX_PARAMETERS:
+            raise ValueError(f"at most {MAX_PARAMETERS} parameters can be read at once")
+        # only created when a parameter is missing from the snapshot
+        self._ssm_client = ssm_client
+
+        self._values = resilience.StaleWhileRevalidate(
+            load=self.load,
+            fresh_seconds=refresh_seconds,
+            # the last values are served for as long as SSM cannot be read
+            max_stale_seconds=math.inf
+        )
+        if not lazy:
+            self._values.get(budget_seconds=LOAD_TIMEOUT_SECONDS)
+
+    def load(self) -> M:
+        """
+        Reads and validates all the parameters: from the snapshot when it is recent enough, and with one SSM call for
+        the others.
+        """
+        values = read_snapshot(self.parameters)
+        missing = [f"{self.path_prefix}{parameter}" for parameter in self.parameters if parameter not in values]
+
+        if missing:
+            self._ssm_client = self._ssm_client or bootstrap.client("ssm")
+            response = self._ssm_client.get_parameters(Names=missing, WithDecryption=True)
+            if response["InvalidParameters"]:
+                raise ValueError(f"missing SSM parameters: {response['InvalidParameters']}")
+            values.update({
+                parameter["Name"].removeprefix(self.path_prefix): parameter["Value"]
+                for parameter in response["Parameters"]
+            })
+
+        return self.model.model_validate(values)
+
+    def get(self) -> M:
+        return self._values.get(budget_seconds=LOAD_TIMEOUT_SECONDS)
@@ -0,0 +1,243 @@
+"""
+Reliable publishing of EventBridge events.
+
+`PutEvents` is not all or nothing: under throttling, some entries of a call fail (`FailedEntryCount`) while the others
+are published. `EventPublisher` sends the events it is given in as few calls as the limits allow (10 entries and
+256 KB per call), and sends the failed entries again, alone, with an exponential backoff with full jitter, as long as
+the lambda has time left. Entries still failing after that are reported as dropped, so that callers can fail loudly
+instead of losing events.
+
+When given a Powertools `Metrics`, the publisher emits the number of published, retried and dropped entries
+(`EventsPublished`, `EventsRetried`, `EventsDropped`), to be flushed by the handler (`@metrics.log_metrics`).
+"""
+import json
+import random
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import cached_property
+
+from aws_lambda_powertools.logging import Logger
+from aws_lambda_powertools.metrics import MetricUnit
+from botocore.exceptions import ClientError
+
+from big_mouth import bootstrap
+
+logger = Logger(child=True)
+
+# limits of a single PutEvents call
+MAX_ENTRIES_PER_PUT_EVENTS = 10
+MAX_PUT_EVENTS_BYTES = 256 * 1024
+
+# error code of the results of the events never sent, for exceeding MAX_PUT_EVENTS_BYTES
+ENTRY_TOO_LARGE = "EntryTooLarge"
+
+
+class EventPublishError(Exception):
+    """
+    Some events could not be published, see `results`.
+    """
+
+    def __init__(self, message: str, results: list["PublishResult"]):
+        super().__init__(message)
+        self.results = results
+
+
+@dataclass
+class PublishResult:
+    entry: dict
+    event_id: str | None = None
+    error_code: str | None = None
+    error_message: str | None = None
+    attempts: int = 0
+
+    @property
+    def published(self) -> bool:
+        return self.event_id is not None
+
+
+def entry_size(entry: dict) -> int:
+    """
+    Size of a PutEvents entry, as counted by EventBridge against the 256 KB limit of a call.
+    """
+    size = 14 if entry.get("Time") is not None else 0
+    for field in ("Source", "DetailType", "Detail"):
+        if entry.get(field):
+            size += len(entry[field].encode())
+    size += sum(len(resource.encode()) for resource in entry.get("Resources", []))
+    return size
+
+
+def batches(entries: list[dict]) -> Iterator[list[int]]:
+    """
+    Positions of the entries of each PutEvents call: at most 10 entries and 256 KB per call, in order.
+    """
+    batch, batch_size = [], 0
+    for position, entry in enumerate(entries):
+        size = entry_size(entry)
+        if size > MAX_PUT_EVENTS_BYTES:
+            raise ValueError(f"event of {size} bytes exceeds the {MAX_PUT_EVENTS_BYTES} bytes limit of PutEvents")
+        if len(batch) == MAX_ENTRIES_PER_PUT_EVENTS or batch_size + size > MAX_PUT_EVENTS_BYTES:
+            yield batch
+            batch, batch_size = [], 0
+        batch.append(position)
+        batch_size += size
+    if batch:
+        yield batch
+
+
+class EventPublisher:
+
+    def __init__(
+            self,
+            bus_name: str,
+            source: str = "big-mouth",
+            events_client=None,
+            metrics=None,
+            max_attempts: int = 5,
+            base_backoff_seconds: float = 0.05,
+            max_backoff_seconds: float = 1.0,
+            # time kept to answer after the last retry
+            reserve_seconds: float = 0.5,
+            # PutEvents calls of a flush sent at the same time
+            max_concurrency: int = 4
+    ):
+        self.bus_name = bus_name
+        self.source = source
+        self._events_client = events_client
+        self.metrics = metrics
+        self.max_attempts = max_attempts
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.reserve_seconds = reserve_seconds
+        self.max_concurrency = max_concurrency
+
+    @cached_property
+    def events_client(self):
+        # only created when first used, see `bootstrap`
+        return self._events_client or bootstrap.client("events")
+
+    def entry(self, detail_type: str, detail: dict) -> dict:
+        return {
+            "Source": self.source,
+            "DetailType": detail_type,
+            "Detail": json.dumps(detail),
+            "EventBusName": self.bus_name
+        }
+
+    def publish_all(self, events: list[tuple[str, dict]], context=None) -> list[PublishResult]:
+        """
+        Sends `(detail_type, detail)` events, and returns their results, in order. Retries stop early when less than
+        `reserve_seconds` would be left before the lambda (`context`) times out.
+
+        Events exceeding the size limit of PutEvents are not sent: their result has the `ENTRY_TOO_LARGE` error code,
+        the other events are sent as usual. The publisher keeps no state between calls.
+        """
+        entries = [self.entry(detail_type, detail) for detail_type, detail in events]
+        return self._publish_entries(entries, context)
+
+    def publish(self, detail_type: str, detail: dict, context=None) -> str:
+        """
+        Sends a single event right away, and returns its id. Raises `EventPublishError` if
+        it could not be published.
+        """
+        entry = self.entry(detail_type, detail)
+        result = self._publish_entries([entry], context)[0]
+        if not result.published:
+            raise EventPublishError(f"{detail_type} event not published: {result.error_code}", [result])
+        return result.event_id
+
+    def _publish_entries(self, entries: list[dict], context) -> list[PublishResult]:
+        if not entries:
+            return []
+
+        deadline = None
+        get_remaining_time = getattr(context, "get_remaining_time_in_millis", None)
+        if get_remaining_time is not None:
+            deadline = time.monotonic() + get_remaining_time() / 1000 - self.reserve_seconds
+
+        results: list[PublishResult] = [None] * len(entries)
+        # positions of the entries to send: the others would fail the whole call
+        sendable = []
+        for position, entry in enumerate(entries):
+            size = entry_size(entry)
+            if size > MAX_PUT_EVENTS_BYTES:
+                results[position] = PublishResult(
+                    entry=entry,
+                    error_code=ENTRY_TOO_LARGE,
+                    error_message=f"event of {size} bytes exceeds the {MAX_PUT_EVENTS_BYTES} bytes limit of PutEvents"
+                )
+            else:
+                sendable.append(position)
+
+        all_batches = [[sendable[i] for i in batch] for batch in batches([entries[p] for p in sendable])]
+        # created before the threads: boto3 clients are thread safe, their creation is not
+        events_client = self.events_client if all_batches else None
+        def send(batch: list[int]) -> list[PublishResult]:
+            return self._send(events_client, [entries[position] for position in batch], deadline)
+
+        if len(all_batches) <= 1:
+            # no thread for the common case of a single call
+            batch_results = [send(batch) for batch in all_batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(all_batches), self.max_concurrency)) as executor:
+                batch_results = list(executor.map(send, all_batches))
+
+        for batch, batch_result in zip(all_batches, batch_results):
+            for position, result in zip(batch, batch_result):
+                results[position] = result
+        self._record(results)
+        return results
+
+    def _send(self, events_client, entries: list[dict], deadline: float | None) -> list[PublishResult]:
+        """
+        One PutEvents call, then calls with the failed entries only, until they are published or the attempts or the
+        time run out.
+        """
+        results = [PublishResult(entry=entry) for entry in entries]
+        pending = list(range(len(entries)))
+        for attempt in range(self.max_attempts):
+            if attempt:
+                # full jitter: concurrent publishers throttled together do not retry together
+                delay = random.uniform(0, min(self.max_backoff_seconds, self.base_backoff_seconds * 2 ** attempt))
+                if deadline is not None and time.monotonic() + delay > deadline:
+                    break
+                time.sleep(delay)
+
+            try:
+                response = events_client.put_events(Entries=[entries[position] for position in pending])
+            except ClientError as e:
+                # the whole call failed (e.g. still throttled after the retries of botocore): so did its entries
+                error = e.response.get("Error", {})
+                response = {
+                    "FailedEntryCount": len(pending),
+                    "Entries": [{"ErrorCode": error.get("Code"), "ErrorMessage": error.get("Message")}] * len(pending)
+                }
+            for position, response_entry in zip(pending, response["Entries"]):
+                result = results[position]
+                result.attempts += 1
+                result.event_id = response_entry.get("EventId")
+                result.error_code = response_entry.get("ErrorCode")
+                result.error_message = response_entry.get("ErrorMessage")
+            if not response.get("FailedEntryCount"):
+                break
+            pending = [position for position in pending if not results[position].published]
+        return results
+
+    def _record(self, results: list[PublishResult]) -> None:
+        published = sum(1 for result in results if result.published)
+        retried = sum(1 for result in results if result.attempts > 1)
+        dropped = len(results) - published
+        if dropped:
+            logger.warning(
+                "events dropped",
+                extra={
+                    "dropped": dropped,
+                    "error_codes": sorted({result.error_code for result in results if not result.published})
+                }
+            )
+        if self.metrics is not None:
+            self.metrics.add_metric(name="EventsPublished", unit=MetricUnit.Count, value=published)
+            self.metrics.add_metric(name="EventsRetried", unit=MetricUnit.Count, value=retried)
+            self.metrics.add_metric(name="EventsDropped", unit=MetricUnit.Count, value=dropped)
@@ -0,0 +1,30 @@
+"""
+JSON serializer of the `APIGatewayRestResolver` apps returning large JSON bodies, with `orjson` when it is available:
+
+    web_app = APIGatewayRestResolver(enable_validation=True, serializer=fast_json.dumps)
+
+The output is compact, like the default serializer of the resolver. `Decimal`s (e.g. from DynamoDB resources) are
+converted to `int`s or `float`s.
+"""
+import json
+from decimal import Decimal
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> str:
+    if orjson:
+        return orjson.dumps(obj, default=_default).decode()
+    return json.dumps(obj, separators=(",", ":"), default=_default)
@@ -0,0 +1,94 @@
+"""
+Nearest restaurants of a point, read from the geo postings of the restaurant index (see `restaurant_index`).
+
+The search reads the geohash cell of the point at `START_PRECISION` (~150 m) and its 8 neighbours, concurrently, then
+the same 3 x 3 cells one precision coarser (32 times larger), and so on until `GEO_PARTITION_PRECISION`. It stops as
+soon as it found k restaurants closer than the edge of the area read so far: no restaurant outside of it can be
+closer, so these are the k nearest. Each level is a few `Query`s on prefixes of the sort key, whose cost only depends
+on the number of restaurants in the cells, so a dense city catalog is never scanned.
+
+A search widened to `GEO_PARTITION_PRECISION` without finding k restaurants returns the nearest ones it found, within
+~20 km at least (less towards the poles).
+"""
+import math
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from big_mouth import geohash
+from big_mouth.restaurant_index import GEO_PARTITION_PRECISION
+
+# precision of the first cells read: ~150 m x 150 m
+START_PRECISION = 7
+
+
+@dataclass(frozen=True)
+class NearbyRestaurant:
+    restaurant: dict
+    distance_km: float
+
+
+def searched_radius_km(latitude: float, longitude: float, precision: int) -> float:
+    """
+    Distance from the point to the nearest edge of its cell and the 8 neighbours, at this precision.
+    """
+    south, west, north, east = geohash.bounds(geohash.encode(latitude, longitude, precision))
+    height, width = north - south, east - west
+    south, west, north, east = south - height, west - width, north + height, east + width
+
+    # the shortest path to a parallel follows the meridian
+    edges = []
+    if south > -90:
+        edges.append(math.radians(latitude - south) * geohash.EARTH_RADIUS_KM)
+    if north < 90:
+        edges.append(math.radians(north - latitude) * geohash.EARTH_RADIUS_KM)
+    # great-circle distance to a meridian
+    for longitude_delta in (longitude - west, east - longitude):
+        across = math.cos(math.radians(latitude)) * math.sin(math.radians(min(longitude_delta, 90)))
+        edges.append(math.asin(min(1.0, across)) * geohash.EARTH_RADIUS_KM)
+    return min(edges)
+
+
+def nearest(
+        latitude: float,
+        longitude: float,
+        k: int,
+        read_cell: Callable[[str], list[dict]],
+        max_distance_km: float | None = None
+) -> list[NearbyRestaurant]:
+    """
+    The k restaurants nearest to the point, nearest first, optionally only the ones within `max_distance_km`.
+    `read_cell(geohash)` returns the restaurants of a cell (with their `name`, `latitude` and `longitude`); it is
+    called concurrently.
+    """
+    restaurants: dict[str, dict] = {}
+    candidates: list[NearbyRestaurant] = []
+    for precision in range(START_PRECISION, GEO_PARTITION_PRECISION - 1, -1):
+        center = geohash.encode(latitude, longitude, precision)
+        cells = [center] + geohash.neighbours(center)
+        # the cells of the previous level are within these ones: only the last read matters
+        with ThreadPoolExecutor(max_workers=len(cells)) as executor:
+            for cell_restaurants in executor.map(read_cell, cells):
+                for restaurant in cell_restaurants:
+                    restaurants[restaurant["name"]] = restaurant
+
+        candidates = sorted(
+            (
+                NearbyRestaurant(
+                    restaurant=restaurant,
+                    distance_km=geohash.distance_km(
+                        latitude, longitude, float(restaurant["latitude"]), float(restaurant["longitude"])
+                    )
+                )
+                for restaurant in restaurants.values()
+            ),
+            key=lambda nearby: (nearby.distance_km, nearby.restaurant["name"])
+        )
+        if max_distance_km is not None:
+            candidates = [nearby for nearby in candidates if nearby.distance_km <= max_distance_km]
+
+        radius = searched_radius_km(latitude, longitude, precision)
+        proven = [nearby for nearby in candidates if nearby.distance_km <= radius]
+        if len(proven) >= k or (max_distance_km is not None and max_distance_km <= radius):
+            return proven[:k]
+    return candidates[:k]
@@ -0,0 +1,94 @@
+"""
+Geohashes: a cell of the earth is the base 32 string of interleaved longitude and latitude bisections, so that a
+longer geohash is a smaller cell within the cells of its prefixes (e.g. "u09tvw" is within "u09t").
+
+Approximate cell sizes at the equator (cells get narrower towards the poles):
+
+    precision   width x height
+    4           39 km x 19.5 km
+    5           4.9 km x 4.9 km
+    6           1.2 km x 0.61 km
+    7           153 m x 153 m
+"""
+import math
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {char: i for i, char in enumerate(_BASE32)}
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def encode(latitude: float, longitude: float, precision: int) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        # even bits bisect the longitude, odd bits the latitude
+        value, interval = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def bounds(geohash: str) -> tuple[float, float, float, float]:
+    """
+    (south, west, north, east) of a cell.
+    """
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        try:
+            value = _DECODE[char]
+        except KeyError:
+            raise ValueError(f"invalid geohash {geohash!r}")
+        for shift in range(4, -1, -1):
+            interval = lon_range if even else lat_range
+            middle = (interval[0] + interval[1]) / 2
+            if value >> shift & 1:
+                interval[0] = middle
+            else:
+                interval[1] = middle
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def neighbours(geohash: str) -> list[str]:
+    """
+    The (up to) 8 cells around a cell, of the same precision. Longitudes wrap around, there is nothing beyond the
+    poles.
+    """
+    south, west, north, east = bounds(geohash)
+    height, width = north - south, east - west
+    latitude, longitude = (south + north) / 2, (west + east) / 2
+    cells = []
+    for lat_step in (-1, 0, 1):
+        for lon_step in (-1, 0, 1):
+            if lat_step == lon_step == 0:
+                continue
+            neighbour_latitude = latitude + lat_step * height
+            if not -90 < neighbour_latitude < 90:
+                continue
+            neighbour_longitude = (longitude + lon_step * width + 180) % 360 - 180
+            cells.append(encode(neighbour_latitude, neighbour_longitude, len(geohash)))
+    return list(dict.fromkeys(cells))
+
+
+def distance_km(latitude1: float, longitude1: float, latitude2: float, longitude2: float) -> float:
+    """
+    Great-circle (haversine) distance.
+    """
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(longitude2 - longitude1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
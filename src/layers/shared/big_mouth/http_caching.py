@@ -0,0 +1,78 @@
+"""
+HTTP caching for the `APIGatewayRestResolver` apps: strong ETags, conditional requests and Cache-Control.
+
+    web_app = APIGatewayRestResolver(enable_validation=True, serializer=fast_json.dumps)
+
+    @web_app.get(
+        "/restaurants",
+        middlewares=[http_caching.cache_validation("private, max-age=60", serializer=fast_json.dumps)]
+    )
+
+Routes using this middleware must not declare a body type in their return annotation (e.g. `-> Response[Any]`): JSON
+bodies are serialized by the middleware, with the serializer of the app, to compute the ETag on the exact bytes sent.
+"""
+import hashlib
+from collections.abc import Callable
+from typing import Any
+
+from aws_lambda_powertools.event_handler import Response
+from aws_lambda_powertools.event_handler.api_gateway import BaseRouter
+from aws_lambda_powertools.event_handler.middlewares import NextMiddleware
+
+# safe methods, for which a matching If-None-Match yields a 304
+CONDITIONAL_METHODS = {"GET", "HEAD"}
+
+
+def strong_etag(body: str | bytes) -> str:
+    if isinstance(body, str):
+        body = body.encode()
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    If-None-Match uses the weak comparison: W/ prefixes are ignored.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip().removeprefix("W/") for candidate in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+def cache_validation(
+        cache_control: str,
+        *,
+        serializer: Callable[[Any], str]
+) -> Callable[[BaseRouter, NextMiddleware], Response]:
+    """
+    Route middleware adding a strong ETag and the given Cache-Control to successful responses, and answering
+    `304 Not Modified` to GET/HEAD requests whose If-None-Match matches the ETag.
+
+    The ETag is a hash of the response body, unless the route already set one (e.g. computed once for a cached body).
+    `serializer` is the one the app is configured with, applied to the JSON bodies that are not serialized yet.
+    """
+
+    def middleware(app: BaseRouter, next_middleware: NextMiddleware) -> Response:
+        response = next_middleware(app)
+        if response.status_code != 200 or response.body is None:
+            return response
+
+        if response.is_json() and not isinstance(response.body, (str, bytes)):
+            # as the resolver would, which then skips bodies that are already strings
+            response.body = serializer(response.body)
+
+        etag = response.headers.get("ETag") or strong_etag(response.body)
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+
+        if_none_match = app.current_event.get_header_value("If-None-Match", case_sensitive=False)
+        if app.current_event.http_method in CONDITIONAL_METHODS and etag_matches(if_none_match, etag):
+            if "Vary" in response.headers:
+                headers["Vary"] = response.headers["Vary"]
+            return Response(status_code=304, body="", headers=headers)
+
+        response.headers.update(headers)
+        return response
+
+    return middleware
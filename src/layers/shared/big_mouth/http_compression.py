@@ -0,0 +1,124 @@
+"""
+Response compression for the `APIGatewayRestResolver` apps: gzip, and brotli when the `brotli` package is available.
+
+    @web_app.get(
+        "/restaurants",
+        middlewares=[
+            http_caching.cache_validation(..., serializer=fast_json.dumps),
+            http_compression.compression(serializer=fast_json.dumps)
+        ]
+    )
+
+When combined with `http_caching.cache_validation`, the compression middleware must come after it (i.e. run inside of
+it), so that each encoding of a response gets its own ETag.
+
+Compressed bodies are returned base64 encoded: the API must declare binary media types, for API Gateway to decode them.
+"""
+import base64
+import gzip
+from collections.abc import Callable
+from typing import Any
+
+from aws_lambda_powertools.event_handler import Response
+from aws_lambda_powertools.event_handler.api_gateway import BaseRouter
+from aws_lambda_powertools.event_handler.middlewares import NextMiddleware
+from aws_lambda_powertools.utilities.data_classes.common import BaseProxyEvent
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# below this size (in bytes), compression does not save enough to be worth the CPU
+MIN_COMPRESSED_SIZE = 1024
+
+# by order of preference, when the client accepts several of them equally
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+
+def negotiate(event: BaseProxyEvent) -> str | None:
+    """
+    Returns the supported encoding preferred by the client according to its Accept-Encoding, None for no compression.
+    """
+    accept_encoding = event.get_header_value("Accept-Encoding", default_value="", case_sensitive=False)
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        weight = 1.0
+        if params.strip().startswith("q="):
+            try:
+                weight = float(params.strip()[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    accepted = [
+        encoding for encoding in SUPPORTED_ENCODINGS
+        if weights.get(encoding, weights.get("*", 0.0)) > 0
+    ]
+    return max(accepted, key=lambda encoding: weights.get(encoding, weights.get("*")), default=None)
+
+
+def compress(body: str | bytes, encoding: str, best: bool = False) -> bytes:
+    """
+    Compresses the body with a fast setting by default. `best` trades CPU for size, for bodies compressed once and
+    served many times.
+    """
+    if isinstance(body, str):
+        body = body.encode()
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if best else 5)
+    if encoding == "gzip":
+        # no timestamp in the header: the same body always gives the same bytes, hence the same ETag
+        return gzip.compress(body, compresslevel=9 if best else 6, mtime=0)
+    raise ValueError(f"unsupported encoding: {encoding}")
+
+
+def encoded_body(body: str | bytes, encoding: str, best: bool = False) -> str:
+    """
+    Compressed body, base64 encoded as expected by API Gateway for binary responses.
+    """
+    return base64.b64encode(compress(body, encoding, best=best)).decode()
+
+
+def set_encoded_body(response: Response, body: str, encoding: str) -> Response:
+    """
+    Sets a body returned by `encoded_body` on the response.
+    """
+    response.body = body
+    response.base64_encoded = True
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def compression(
+        min_size: int = MIN_COMPRESSED_SIZE,
+        *,
+        serializer: Callable[[Any], str]
+) -> Callable[[BaseRouter, NextMiddleware], Response]:
+    """
+    Route middleware compressing the response bodies of at least `min_size` bytes with the encoding negotiated with
+    the client. Responses which already have a Content-Encoding are left as-is. `serializer` is the one the app is
+    configured with, applied to the JSON bodies that are not serialized yet.
+    """
+
+    def middleware(app: BaseRouter, next_middleware: NextMiddleware) -> Response:
+        response = next_middleware(app)
+        # the representation depends on Accept-Encoding, even when it ends up not compressed
+        response.headers["Vary"] = "Accept-Encoding"
+        if response.body is None or "Content-Encoding" in response.headers:
+            return response
+
+        if response.is_json() and not isinstance(response.body, (str, bytes)):
+            response.body = serializer(response.body)
+
+        body = response.body.encode() if isinstance(response.body, str) else response.body
+        if len(body) < min_size:
+            return response
+
+        encoding = negotiate(app.current_event)
+        if encoding is None:
+            return response
+        return set_encoded_body(response, encoded_body(body, encoding), encoding)
+
+    return middleware
@@ -0,0 +1,202 @@
+"""
+Orders table, with the low-level `dynamodb` client.
+
+An order is written by `place_order` before its `order_placed` event is published, with the `PLACED` status, then its
+status is updated by the order flow (`ACCEPTED`, `REJECTED`...). Orders are keyed by their id, a ULID (see `ulid`),
+and their `createdAt` is the time of the id, as an ISO 8601 UTC timestamp with milliseconds: these timestamps sort
+like the times they stand for.
+
+The `restaurant_orders` global secondary index (see cdk/db_stack.py) holds the orders of each restaurant sorted by
+`createdAt`, so that the recent orders of a restaurant are a `Query` reading only the returned orders, however many
+orders the table holds.
+"""
+import time
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from functools import cached_property
+
+from botocore.exceptions import ClientError
+
+from big_mouth import attribute_values, bootstrap, ulid
+from big_mouth.attribute_values import string
+
+STATUS_PLACED = "PLACED"
+
+# orders of each restaurant, by creation time
+RESTAURANT_ORDERS_INDEX = "restaurant_orders"
+# keys of the items of the index: the key of the table and the key of the index, to resume a page
+RESTAURANT_ORDERS_KEY_ATTRIBUTES = ("id", "restaurantName", "createdAt")
+# restaurant names are the partition key of the index, limited to 2048 bytes: 256 characters are at most 1024 bytes
+MAX_RESTAURANT_NAME_LENGTH = 256
+
+# max number of requests of a BatchWriteItem
+MAX_BATCH_WRITE_ITEMS = 25
+
+# the unprocessed items of a BatchWriteItem (throttling) are retried with an exponential backoff
+BATCH_WRITE_ATTEMPTS = 4
+BATCH_WRITE_BACKOFF_SECONDS = 0.05
+
+ORDER_SCHEMA = {
+    "id": string,
+    "restaurantName": string,
+    "status": string,
+    "createdAt": string,
+}
+
+to_order = attribute_values.item_converter(ORDER_SCHEMA)
+
+
+class OrderExistsError(Exception):
+    """
+    An order with the same id was already written.
+    """
+
+
+class OrderWriteError(Exception):
+    """
+    Orders could not be written, still unprocessed after `BATCH_WRITE_ATTEMPTS`.
+    """
+
+
+def format_timestamp(timestamp: datetime) -> str:
+    """
+    `createdAt` format, e.g. "2024-06-01T12:30:00.000Z". Naive datetimes are taken as UTC.
+    """
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def created_at(order_id: str) -> str:
+    return format_timestamp(datetime.fromtimestamp(ulid.timestamp_ms(order_id) / 1000, tz=timezone.utc))
+
+
+def new_order(order_id: str, restaurant_name: str) -> dict:
+    return {
+        "id": order_id,
+        "restaurantName": restaurant_name,
+        "status": STATUS_PLACED,
+        "createdAt": created_at(order_id),
+    }
+
+
+class OrderStore:
+
+    def __init__(self, table_name: str, dynamo_client=None):
+        self.table_name = table_name
+        self._dynamo_client = dynamo_client
+
+    @cached_property
+    def dynamo_client(self):
+        # only created when first used, see `bootstrap`
+        return self._dynamo_client or bootstrap.client("dynamodb")
+
+    def _put_request(self, order: dict) -> dict:
+        return {
+            "TableName": self.table_name,
+            "Item": attribute_values.key_to_attribute_values(order),
+            # never overwrite an order, whose status may have moved on already
+            "ConditionExpression": "attribute_not_exists(#id)",
+            "ExpressionAttributeNames": {"#id": "id"}
+        }
+
+    def put_order(self, order: dict) -> None:
+        """
+        Raises `OrderExistsError` if an order with the same id exists.
+        """
+        try:
+            self.dynamo_client.put_item(**self._put_request(order))
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                raise OrderExistsError(order["id"]) from e
+            raise
+
+    def put_orders(self, orders: Sequence[dict]) -> None:
+        """
+        Writes new orders with `BatchWriteItem`s of `MAX_BATCH_WRITE_ITEMS`. Unlike `put_order`, the writes are not
+        conditional: their ids are ULIDs generated for them, and a transaction would cost twice the write capacity.
+
+        Not atomic: when a `BatchWriteItem` fails (`ClientError`, `OrderWriteError`), the orders of the previous ones
+        are written.
+        """
+        self._batch_write([{"PutRequest": {"Item": attribute_values.key_to_attribute_values(order)}} for order in orders])
+
+    def delete_orders(self, order_ids: Sequence[str]) -> None:
+        """
+        Deletes orders, e.g. whose `order_placed` event could not be published.
+        """
+        self._batch_write([
+            {"DeleteRequest": {"Key": attribute_values.key_to_attribute_values({"id": order_id})}}
+            for order_id in order_ids
+        ])
+
+    def _batch_write(self, requests: list[dict]) -> None:
+        for start in range(0, len(requests), MAX_BATCH_WRITE_ITEMS):
+            request_items = {self.table_name: requests[start:start + MAX_BATCH_WRITE_ITEMS]}
+            for attempt in range(BATCH_WRITE_ATTEMPTS):
+                response = self.dynamo_client.batch_write_item(RequestItems=request_items)
+                request_items = response.get("UnprocessedItems")
+                if not request_items:
+                    break
+                time.sleep(BATCH_WRITE_BACKOFF_SECONDS * 2 ** attempt)
+            else:
+                unprocessed = len(request_items[self.table_name])
+                raise OrderWriteError(f"could not write {unprocessed} orders after {BATCH_WRITE_ATTEMPTS} attempts")
+
+    def get_order(self, order_id: str) -> dict | None:
+        """
+        Strongly consistent read: an order is found as soon as it was placed.
+        """
+        response = self.dynamo_client.get_item(
+            TableName=self.table_name,
+            Key=attribute_values.key_to_attribute_values({"id": order_id}),
+            ConsistentRead=True
+        )
+        item = response.get("Item")
+        return to_order(item) if item is not None else None
+
+    def query_restaurant_orders(
+            self,
+            restaurant_name: str,
+            exclusive_start_key: dict | None,
+            limit: int,
+            since: str | None = None,
+            until: str | None = None
+    ) -> dict:
+        """
+        One page of the orders of a restaurant, newest first, optionally only the ones created within `since` and
+        `until` (inclusive, `createdAt` timestamps). The response has the shape expected by `pagination.read_page`.
+        """
+        key_condition = "#restaurantName = :restaurantName"
+        values = {":restaurantName": attribute_values.attribute_value(restaurant_name)}
+        if since is not None and until is not None:
+            key_condition += " AND #createdAt BETWEEN :since AND :until"
+        elif since is not None:
+            key_condition += " AND #createdAt >= :since"
+        elif until is not None:
+            key_condition += " AND #createdAt <= :until"
+        if since is not None:
+            values[":since"] = attribute_values.attribute_value(since)
+        if until is not None:
+            values[":until"] = attribute_values.attribute_value(until)
+        names = {"#restaurantName": "restaurantName"}
+        if since is not None or until is not None:
+            names["#createdAt"] = "createdAt"
+
+        query_kwargs = {
+            "TableName": self.table_name,
+            "IndexName": RESTAURANT_ORDERS_INDEX,
+            "KeyConditionExpression": key_condition,
+            "ExpressionAttributeNames": names,
+            "ExpressionAttributeValues": values,
+            "ScanIndexForward": False,
+            "Limit": limit
+        }
+        if exclusive_start_key:
+            query_kwargs["ExclusiveStartKey"] = attribute_values.key_to_attribute_values(exclusive_start_key)
+
+        response = self.dynamo_client.query(**query_kwargs)
+        plain = {"Items": [to_order(item) for item in response["Items"]]}
+        if "LastEvaluatedKey" in response:
+            plain["LastEvaluatedKey"] = to_order(response["LastEvaluatedKey"])
+        return plain
@@ -0,0 +1,110 @@
+"""
+Cursor pagination over DynamoDB Scan and Query results.
+
+DynamoDB's `Limit` caps the number of items *evaluated* by a request, not the number of items returned, and a
+response may stop early (1 MB pages, filter expressions). `read_page` keeps reading until the requested page size is
+filled or the read budget is exhausted, and tells where to resume.
+
+Resume points are handed to clients as opaque cursors: a DynamoDB key signed with HMAC, so that clients can neither
+forge keys nor reuse a cursor of one query for another one.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+# max number of DynamoDB requests made to fill one page
+DEFAULT_MAX_READS = 5
+
+# max number of items a client may request in one page
+MAX_PAGE_SIZE = 100
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+@dataclass
+class Page:
+    items: list[dict]
+
+    # key from which the next page starts, None if this is the last page
+    next_key: dict | None
+
+
+def read_page(
+        read: Callable[[dict | None, int], dict],
+        page_size: int,
+        key_attributes: Sequence[str],
+        start_key: dict | None = None,
+        max_reads: int = DEFAULT_MAX_READS
+) -> Page:
+    """
+    Reads up to `page_size` items, making at most `max_reads` calls to `read`.
+
+    `read(exclusive_start_key, limit)` must perform one Scan or Query and return its raw response. `key_attributes`
+    are the primary key attributes of the read items, needed to resume right after the last returned item when a
+    response contains more items than the page can hold.
+    """
+    items: list[dict] = []
+    exclusive_start_key = start_key
+
+    for _ in range(max_reads):
+        remaining = page_size - len(items)
+        response = read(exclusive_start_key, remaining)
+        exclusive_start_key = response.get("LastEvaluatedKey")
+
+        if len(response["Items"]) > remaining:
+            items.extend(response["Items"][:remaining])
+            return Page(items=items, next_key={k: items[-1][k] for k in key_attributes})
+
+        items.extend(response["Items"])
+        if exclusive_start_key is None or len(items) == page_size:
+            break
+
+    return Page(items=items, next_key=exclusive_start_key)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class CursorCodec:
+    """
+    Converts DynamoDB keys to signed, opaque cursors and back.
+
+    The `scope` identifies the query a cursor belongs to (e.g. the searched theme): decoding a cursor with another
+    scope than the one it was encoded with fails.
+    """
+
+    def __init__(self, signing_key: str):
+        self._signing_key = signing_key.encode()
+
+    def _signature(self, scope: str, payload: bytes) -> bytes:
+        return hmac.new(self._signing_key, scope.encode() + b"\n" + payload, hashlib.sha256).digest()
+
+    def encode(self, key: dict, scope: str) -> str:
+        payload = json.dumps(key, separators=(",", ":"), sort_keys=True).encode()
+        return f"{_b64encode(payload)}.{_b64encode(self._signature(scope, payload))}"
+
+    def decode(self, cursor: str, scope: str) -> dict:
+        try:
+            encoded_payload, encoded_signature = cursor.split(".")
+            payload = _b64decode(encoded_payload)
+            signature = _b64decode(encoded_signature)
+        except (ValueError, binascii.Error) as e:
+            raise InvalidCursorError("malformed cursor") from e
+
+        if not hmac.compare_digest(signature, self._signature(scope, payload)):
+            raise InvalidCursorError("invalid cursor signature")
+
+        return json.loads(payload)
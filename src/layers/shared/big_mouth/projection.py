@@ -0,0 +1,65 @@
+"""
+Field selection of the restaurant endpoints: `fields=name,image` (or `fields=name&fields=image`) only reads
+(`ProjectionExpression`) and returns those attributes of the restaurants.
+
+The key attributes are always read, even when not requested, since pagination needs them to resume after the last
+returned item: responses are trimmed to the requested fields after that.
+"""
+import re
+from collections.abc import Iterable, Sequence
+
+# max number of fields of one request
+MAX_FIELDS = 20
+
+_FIELD_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]{0,254}")
+
+
+class InvalidFieldsError(ValueError):
+    pass
+
+
+def parse_fields(fields: str | Sequence[str] | None) -> tuple[str, ...] | None:
+    """
+    Validates the requested fields, given as a comma separated list, or as a sequence of those (e.g. repeated query
+    string parameters). None means all the fields. The result is sorted, so that it can be part of cache keys.
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = [fields]
+    fields = [field for value in fields for field in value.split(",")]
+
+    names = sorted({field.strip() for field in fields if field.strip()})
+    if not names:
+        raise InvalidFieldsError("no field requested")
+    if len(names) > MAX_FIELDS:
+        raise InvalidFieldsError(f"at most {MAX_FIELDS} fields can be requested")
+    invalid = [name for name in names if not _FIELD_NAME.fullmatch(name)]
+    if invalid:
+        raise InvalidFieldsError(f"invalid field names: {', '.join(invalid)}")
+    return tuple(names)
+
+
+def projection_kwargs(fields: Iterable[str] | None, key_attributes: Sequence[str]) -> dict:
+    """
+    `ProjectionExpression` and `ExpressionAttributeNames` of a Scan, Query or GetItem reading `fields` and the key
+    attributes. Names are always substituted, since many attribute names (e.g. "name") are reserved words.
+    """
+    if fields is None:
+        return {}
+    attributes = list(dict.fromkeys([*key_attributes, *fields]))
+    names = {f"#p{i}": attribute for i, attribute in enumerate(attributes)}
+    return {
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names
+    }
+
+
+def trim(items: list[dict], fields: Sequence[str] | None) -> list[dict]:
+    """
+    Removes the attributes which were not requested, i.e. the key attributes read for the pagination.
+    """
+    if fields is None:
+        return items
+    requested = set(fields)
+    return [{k: v for k, v in item.items() if k in requested} for item in items]
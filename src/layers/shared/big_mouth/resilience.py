@@ -0,0 +1,151 @@
+"""
+Resilience of the calls to slow or failing dependencies.
+
+`StaleWhileRevalidate` keeps the last good value of a dependency in the warm container: while it is fresh, the
+dependency is not called; once stale, it is still served while a refresh runs in the background. The dependency is
+only waited for when there is no usable value, and then at most for a latency budget (see `latency_budget`).
+
+`CircuitBreaker` stops calling a dependency after consecutive failures, and lets a single trial call through once a
+reset timeout elapsed.
+
+Note that the background refresh, like any thread, is frozen between invocations: when it does not complete during the
+invocation which started it, it completes during the next one.
+"""
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Generic, TypeVar
+
+from aws_lambda_powertools.logging import Logger
+
+logger = Logger(child=True)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UpstreamUnavailableError(Exception):
+    """
+    The dependency failed, timed out or its circuit is open, and there is no usable value to serve instead.
+    """
+
+
+def latency_budget(context, reserve_seconds: float = 1.0, max_seconds: float = 3.0) -> float:
+    """
+    Time, in seconds, a request may wait for a dependency: at most `max_seconds`, and never so long that less than
+    `reserve_seconds` remain to answer before the lambda times out.
+    """
+    get_remaining_time = getattr(context, "get_remaining_time_in_millis", None)
+    if get_remaining_time is None:
+        return max_seconds
+    return max(0.0, min(max_seconds, get_remaining_time() / 1000 - reserve_seconds))
+
+
+class CircuitBreaker:
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout_seconds: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """
+        Whether the dependency may be called. Once the reset timeout elapsed, an open circuit becomes half open and
+        allows one trial call, whose outcome closes or re-opens it.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout_seconds:
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("circuit closed")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning("circuit opened", extra={"consecutive_failures": self.consecutive_failures})
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+
+
+class StaleWhileRevalidate(Generic[T]):
+
+    def __init__(
+            self,
+            load: Callable[[], T],
+            fresh_seconds: float = 60,
+            max_stale_seconds: float = 3600,
+            breaker: CircuitBreaker | None = None
+    ):
+        self._load = load
+        self.fresh_seconds = fresh_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.breaker = breaker or CircuitBreaker()
+
+        self._value: T | None = None
+        self._loaded_at: float | None = None
+        self._in_flight: Future | None = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def get(self, budget_seconds: float) -> T:
+        age = None if self._loaded_at is None else time.monotonic() - self._loaded_at
+
+        if age is not None and age < self.fresh_seconds:
+            return self._value
+
+        if age is not None and age < self.max_stale_seconds:
+            logger.info("serving stale value while revalidating", extra={"age_seconds": round(age, 1)})
+            self._refresh()
+            return self._value
+
+        in_flight = self._refresh()
+        if in_flight is None:
+            raise UpstreamUnavailableError("circuit open")
+        try:
+            return in_flight.result(timeout=budget_seconds)
+        except TimeoutError:
+            raise UpstreamUnavailableError(f"no response within {budget_seconds:.2f}s")
+        except Exception as e:
+            raise UpstreamUnavailableError(str(e)) from e
+
+    def _refresh(self) -> Future | None:
+        """
+        Starts a call to the dependency, unless one is already in flight or the circuit is open.
+        """
+        with self._lock:
+            if self._in_flight is not None and not self._in_flight.done():
+                return self._in_flight
+            if not self.breaker.allow_request():
+                return None
+            self._in_flight = self._executor.submit(self._load_and_store)
+            return self._in_flight
+
+    def _load_and_store(self) -> T:
+        try:
+            value = self._load()
+        except Exception:
+            logger.exception("dependency call failed")
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        self._value = value
+        self._loaded_at = time.monotonic()
+        return value
@@ -0,0 +1,143 @@
+"""
+Key layout of the restaurant index table.
+
+The index table has a generic `pk`/`sk` primary key. Each restaurant gets one "posting" item per theme, which is a
+copy of the restaurant stored under the partition of that theme:
+
+    pk = "theme#{theme}", sk = "{restaurant name}"
+
+so that all the restaurants of a theme can be read with one `Query`, whose cost only depends on the number of matches.
+
+Restaurants with a location (optional `latitude` and `longitude` attributes) also get one geo posting, stored under
+the partition of their geohash cell of `GEO_PARTITION_PRECISION` (~39 km x 19.5 km), and sorted by their full geohash:
+
+    pk = "geo#{geohash[:4]}", sk = "{geohash}#{restaurant name}"
+
+so that the restaurants of any cell within a partition can be read with one `Query` on a prefix of the sort key (see
+`geo_search`).
+
+The counts of restaurants per theme (facets) are kept in a single item, one number attribute per theme, updated by
+the same writes:
+
+    pk = "facet#theme", sk = "counts", "theme#{theme}" = <number of restaurants>
+
+The table also holds a single catalog version item, incremented by every restaurant write, which readers use to
+cheaply check if the catalog changed:
+
+    pk = "catalog", sk = "version", version = <number>
+"""
+
+from big_mouth import geohash
+
+THEME_PREFIX = "theme#"
+GEO_PREFIX = "geo#"
+
+# precision of the geohash cells of the geo partitions, and of the geohashes of the restaurants
+GEO_PARTITION_PRECISION = 4
+GEO_PRECISION = 9
+
+INDEX_KEY_ATTRIBUTES = ("pk", "sk")
+
+CATALOG_VERSION_KEY = {"pk": "catalog", "sk": "version"}
+
+THEME_FACETS_KEY = {"pk": "facet#theme", "sk": "counts"}
+
+
+def theme_key(theme: str) -> str:
+    return f"{THEME_PREFIX}{theme}"
+
+
+def theme_posting_key(theme: str, restaurant_name: str) -> dict:
+    return {"pk": theme_key(theme), "sk": restaurant_name}
+
+
+def theme_postings(restaurant: dict) -> list[dict]:
+    """
+    Returns the index items to write for this restaurant, one per theme.
+    """
+    return [
+        {**theme_posting_key(theme, restaurant["name"]), **restaurant}
+        for theme in set(restaurant.get("themes", []))
+    ]
+
+
+def geo_key(cell: str) -> str:
+    """
+    Partition of the geo postings of a geohash cell, of at least `GEO_PARTITION_PRECISION`.
+    """
+    if len(cell) < GEO_PARTITION_PRECISION:
+        raise ValueError(f"geohash cells are indexed from precision {GEO_PARTITION_PRECISION}")
+    return f"{GEO_PREFIX}{cell[:GEO_PARTITION_PRECISION]}"
+
+
+def geo_posting_key(restaurant: dict) -> dict | None:
+    """
+    Key of the geo posting of the restaurant, None if it has no location.
+    """
+    if restaurant.get("latitude") is None or restaurant.get("longitude") is None:
+        return None
+    cell = geohash.encode(float(restaurant["latitude"]), float(restaurant["longitude"]), GEO_PRECISION)
+    return {"pk": geo_key(cell), "sk": f"{cell}#{restaurant['name']}"}
+
+
+def geo_postings(restaurant: dict) -> list[dict]:
+    """
+    Returns the geo index items to write for this restaurant: none, or one if it has a location.
+    """
+    key = geo_posting_key(restaurant)
+    return [{**key, **restaurant}] if key else []
+
+
+def restaurant_from_posting(posting: dict) -> dict:
+    return {k: v for k, v in posting.items() if k not in INDEX_KEY_ATTRIBUTES}
+
+
+def theme_facets_update(index_table_name: str, deltas: dict[str, int]) -> dict | None:
+    """
+    Transaction action adding the deltas (e.g. {"cartoon": 1, "netflix": -1}) to the theme counts, None if there is
+    nothing to change.
+    """
+    deltas = {theme: delta for theme, delta in deltas.items() if delta}
+    if not deltas:
+        return None
+    names, values, additions = {}, {}, []
+    for i, (theme, delta) in enumerate(sorted(deltas.items())):
+        names[f"#t{i}"] = theme_key(theme)
+        values[f":d{i}"] = delta
+        additions.append(f"#t{i} :d{i}")
+    return {
+        "Update": {
+            "TableName": index_table_name,
+            "Key": THEME_FACETS_KEY,
+            "UpdateExpression": f"ADD {', '.join(additions)}",
+            "ExpressionAttributeNames": names,
+            "ExpressionAttributeValues": values
+        }
+    }
+
+
+def theme_counts(facets_item: dict) -> dict[str, int]:
+    """
+    Number of restaurants per theme, from the facets item. Themes without restaurants anymore are left out.
+    """
+    return {
+        name[len(THEME_PREFIX):]: int(count)
+        for name, count in facets_item.items()
+        if name.startswith(THEME_PREFIX) and count > 0
+    }
+
+
+def catalog_version_increment(index_table_name: str) -> dict:
+    """
+    Transaction action incrementing the catalog version, to be part of every restaurant write.
+    """
+    return {
+        "Update": {
+            "TableName": index_table_name,
+            "Key": CATALOG_VERSION_KEY,
+            "UpdateExpression": "ADD #version :one",
+            "ExpressionAttributeNames": {"#version": "version"},
+            "ExpressionAttributeValues": {":one": 1}
+        }
+    }
+
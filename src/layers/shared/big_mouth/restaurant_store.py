@@ -0,0 +1,212 @@
+"""
+Read access to the restaurants and restaurant index tables with the low-level `dynamodb` client.
+
+The items are converted straight from AttributeValues to JSON-ready types (see `attribute_values`), instead of going
+through the `Decimal`s and sets of boto3's resources. The responses of `scan` and `query_theme` have the shape
+expected by `pagination.read_page`, with plain python items and keys.
+
+The reads accept the `fields` to read (see `projection`): the key attributes are read too, and must be trimmed from
+the results if they were not requested.
+"""
+import time
+from collections.abc import Sequence
+from functools import cached_property
+
+from big_mouth import attribute_values, bootstrap, projection, restaurant_index, segmented_scan
+from big_mouth.attribute_values import number, string, string_list
+
+RESTAURANT_KEY_ATTRIBUTES = ("name",)
+
+# max number of keys of a BatchGetItem
+MAX_BATCH_GET_KEYS = 100
+
+# the unprocessed keys of a BatchGetItem (throttling) are retried with an exponential backoff
+BATCH_GET_ATTEMPTS = 4
+BATCH_GET_BACKOFF_SECONDS = 0.05
+
+RESTAURANT_SCHEMA = {
+    "name": string,
+    "image": string,
+    "themes": string_list,
+    "latitude": number,
+    "longitude": number,
+    # index postings
+    "pk": string,
+    "sk": string,
+}
+
+to_restaurant = attribute_values.item_converter(RESTAURANT_SCHEMA)
+
+
+def _plain_response(response: dict) -> dict:
+    plain = {"Items": [to_restaurant(item) for item in response["Items"]]}
+    if "LastEvaluatedKey" in response:
+        # keys are made of restaurant attributes too: name, or pk and sk
+        plain["LastEvaluatedKey"] = to_restaurant(response["LastEvaluatedKey"])
+    return plain
+
+
+class RestaurantStore:
+
+    def __init__(self, table_name: str, index_table_name: str, dynamo_client=None):
+        self.table_name = table_name
+        self.index_table_name = index_table_name
+        self._dynamo_client = dynamo_client
+
+    @cached_property
+    def dynamo_client(self):
+        # only created when first used, see `bootstrap`
+        return self._dynamo_client or bootstrap.client("dynamodb")
+
+    def scan(self, exclusive_start_key: dict | None, limit: int, fields: Sequence[str] | None = None) -> dict:
+        """
+        One page of the restaurants table.
+        """
+        scan_kwargs = {
+            "TableName": self.table_name,
+            "Limit": limit,
+            **projection.projection_kwargs(fields, key_attributes=RESTAURANT_KEY_ATTRIBUTES)
+        }
+        if exclusive_start_key:
+            scan_kwargs["ExclusiveStartKey"] = attribute_values.key_to_attribute_values(exclusive_start_key)
+        return _plain_response(self.dynamo_client.scan(**scan_kwargs))
+
+    def query_theme(
+            self,
+            theme: str,
+            exclusive_start_key: dict | None,
+            limit: int,
+            fields: Sequence[str] | None = None
+    ) -> dict:
+        """
+        One page of the index postings of a theme.
+        """
+        projection_kwargs = projection.projection_kwargs(fields, key_attributes=restaurant_index.INDEX_KEY_ATTRIBUTES)
+        query_kwargs = {
+            "TableName": self.index_table_name,
+            "Limit": limit,
+            "KeyConditionExpression": "#pk = :pk",
+            "ExpressionAttributeNames": {"#pk": "pk", **projection_kwargs.pop("ExpressionAttributeNames", {})},
+            "ExpressionAttributeValues": {":pk": attribute_values.attribute_value(restaurant_index.theme_key(theme))},
+            **projection_kwargs
+        }
+        if exclusive_start_key:
+            query_kwargs["ExclusiveStartKey"] = attribute_values.key_to_attribute_values(exclusive_start_key)
+        return _plain_response(self.dynamo_client.query(**query_kwargs))
+
+    def theme_restaurant_names(self, theme: str) -> list[str]:
+        """
+        Posting list of a theme: the names of all its restaurants, read from the keys of the index postings only.
+        """
+        query_kwargs = {
+            "TableName": self.index_table_name,
+            "KeyConditionExpression": "#pk = :pk",
+            "ProjectionExpression": "#sk",
+            "ExpressionAttributeNames": {"#pk": "pk", "#sk": "sk"},
+            "ExpressionAttributeValues": {":pk": attribute_values.attribute_value(restaurant_index.theme_key(theme))}
+        }
+        names = []
+        while True:
+            response = self.dynamo_client.query(**query_kwargs)
+            names.extend(item["sk"]["S"] for item in response["Items"])
+            if "LastEvaluatedKey" not in response:
+                return names
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def query_geo_cell(self, cell: str, fields: Sequence[str] | None = None) -> list[dict]:
+        """
+        Restaurants located in a geohash cell (of at least `GEO_PARTITION_PRECISION`), from their geo postings. Their
+        name and location are always read.
+        """
+        key_attributes = restaurant_index.INDEX_KEY_ATTRIBUTES + ("name", "latitude", "longitude")
+        projection_kwargs = projection.projection_kwargs(fields, key_attributes=key_attributes)
+        key_condition = "#pk = :pk"
+        names = {"#pk": "pk", **projection_kwargs.pop("ExpressionAttributeNames", {})}
+        values = {":pk": attribute_values.attribute_value(restaurant_index.geo_key(cell))}
+        if len(cell) > restaurant_index.GEO_PARTITION_PRECISION:
+            # postings are sorted by geohash: the smaller cells of a partition are ranges of it
+            key_condition += " AND begins_with(#sk, :cell)"
+            names["#sk"] = "sk"
+            values[":cell"] = attribute_values.attribute_value(cell)
+        query_kwargs = {
+            "TableName": self.index_table_name,
+            "KeyConditionExpression": key_condition,
+            "ExpressionAttributeNames": names,
+            "ExpressionAttributeValues": values,
+            **projection_kwargs
+        }
+
+        restaurants = []
+        while True:
+            response = self.dynamo_client.query(**query_kwargs)
+            restaurants.extend(
+                restaurant_index.restaurant_from_posting(to_restaurant(item)) for item in response["Items"]
+            )
+            if "LastEvaluatedKey" not in response:
+                return restaurants
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def get_restaurants(self, names: Sequence[str], fields: Sequence[str] | None = None) -> list[dict]:
+        """
+        Restaurants with the given names (at most `MAX_BATCH_GET_KEYS`), in the same order, with one `BatchGetItem`
+        (plus retries of the unprocessed keys). Missing restaurants are skipped.
+        """
+        if len(names) > MAX_BATCH_GET_KEYS:
+            raise ValueError(f"at most {MAX_BATCH_GET_KEYS} restaurants can be read at once")
+        if not names:
+            return []
+
+        request = {
+            "Keys": [attribute_values.key_to_attribute_values({"name": name}) for name in dict.fromkeys(names)],
+            **projection.projection_kwargs(fields, key_attributes=RESTAURANT_KEY_ATTRIBUTES)
+        }
+        restaurants = {}
+        for attempt in range(BATCH_GET_ATTEMPTS):
+            response = self.dynamo_client.batch_get_item(RequestItems={self.table_name: request})
+            for item in response["Responses"].get(self.table_name, []):
+                restaurant = to_restaurant(item)
+                restaurants[restaurant["name"]] = restaurant
+
+            unprocessed = response.get("UnprocessedKeys", {}).get(self.table_name)
+            if not unprocessed:
+                return [restaurants[name] for name in names if name in restaurants]
+            request = unprocessed
+            time.sleep(BATCH_GET_BACKOFF_SECONDS * 2 ** attempt)
+
+        raise RuntimeError(f"could not read {len(request['Keys'])} restaurants after {BATCH_GET_ATTEMPTS} attempts")
+
+    def scan_all(self, total_segments: int, fields: Sequence[str] | None = None) -> list[dict]:
+        """
+        Whole restaurants table, sorted by name, read with a parallel segmented scan.
+        """
+        return segmented_scan.parallel_scan(
+            self.dynamo_client,
+            total_segments=total_segments,
+            sort_by=RESTAURANT_KEY_ATTRIBUTES,
+            convert=to_restaurant,
+            TableName=self.table_name,
+            **projection.projection_kwargs(fields, key_attributes=RESTAURANT_KEY_ATTRIBUTES)
+        )
+
+    def read_catalog_version(self) -> int:
+        """
+        Current catalog version, 0 if the catalog was never written (see `restaurant_index`).
+        """
+        response = self.dynamo_client.get_item(
+            TableName=self.index_table_name,
+            Key=attribute_values.key_to_attribute_values(restaurant_index.CATALOG_VERSION_KEY),
+            ProjectionExpression="#version",
+            ExpressionAttributeNames={"#version": "version"}
+        )
+        return int(attribute_values.to_python(response.get("Item", {}).get("version", {"N": "0"})))
+
+    def read_theme_counts(self) -> dict[str, int]:
+        """
+        Number of restaurants per theme, maintained by the restaurant writes: a single `GetItem`.
+        """
+        response = self.dynamo_client.get_item(
+            TableName=self.index_table_name,
+            Key=attribute_values.key_to_attribute_values(restaurant_index.THEME_FACETS_KEY)
+        )
+        facets = {name: attribute_values.to_python(value) for name, value in response.get("Item", {}).items()}
+        return restaurant_index.theme_counts(facets)
@@ -0,0 +1,155 @@
+import boto3
+from botocore.exceptions import ClientError
+
+from big_mouth import restaurant_index
+
+# max number of actions in a single DynamoDB transaction
+MAX_TRANSACTION_ITEMS = 100
+
+# a write racing with another write of the same restaurant is retried from a fresh read, this many times at most
+WRITE_ATTEMPTS = 3
+
+# attributes of a restaurant which its index items and the theme counts depend on
+INDEXED_ATTRIBUTES = ("themes", "latitude", "longitude")
+
+
+class ConcurrentWriteError(Exception):
+    pass
+
+
+class RestaurantWriter:
+    """
+    Single write path for restaurants: each write updates the restaurants table and the restaurant index table in one
+    DynamoDB transaction, so that the index (and the theme counts) never drifts from the catalog, and bumps the catalog
+    version so that readers caching the catalog see the change.
+    """
+
+    def __init__(self, restaurants_table_name: str, index_table_name: str, dynamo_resource=None):
+        self.restaurants_table_name = restaurants_table_name
+        self.index_table_name = index_table_name
+        dynamo_resource = dynamo_resource or boto3.resource("dynamodb")
+        self._restaurants_table = dynamo_resource.Table(restaurants_table_name)
+
+        # client of the resource, which accepts and returns plain python types instead of DynamoDB attribute values
+        self._dynamo_client = dynamo_resource.meta.client
+
+    def put(self, restaurant: dict) -> None:
+        self._retry_concurrent_writes(lambda: self._put(restaurant))
+
+    def delete(self, restaurant_name: str) -> None:
+        self._retry_concurrent_writes(lambda: self._delete(restaurant_name))
+
+    def _put(self, restaurant: dict) -> None:
+        previous = self._get(restaurant["name"])
+        previous_themes = set(previous.get("themes", [])) if previous else set()
+        themes = set(restaurant.get("themes", []))
+        removed_themes = previous_themes - themes
+
+        actions = [
+            {
+                "Put": {
+                    "TableName": self.restaurants_table_name,
+                    "Item": restaurant,
+                    **self._unchanged_since(previous)
+                }
+            }
+        ]
+        actions += [
+            {"Put": {"TableName": self.index_table_name, "Item": posting}}
+            for posting in restaurant_index.theme_postings(restaurant) + restaurant_index.geo_postings(restaurant)
+        ]
+        actions += [
+            {
+                "Delete": {
+                    "TableName": self.index_table_name,
+                    "Key": restaurant_index.theme_posting_key(theme, restaurant["name"])
+                }
+            }
+            for theme in removed_themes
+        ]
+        # the geo posting moves with the restaurant
+        previous_geo_key = restaurant_index.geo_posting_key(previous) if previous else None
+        if previous_geo_key and previous_geo_key != restaurant_index.geo_posting_key(restaurant):
+            actions.append({"Delete": {"TableName": self.index_table_name, "Key": previous_geo_key}})
+        self._transact(
+            actions,
+            theme_deltas={**{theme: 1 for theme in themes - previous_themes}, **{theme: -1 for theme in removed_themes}}
+        )
+
+    def _delete(self, restaurant_name: str) -> None:
+        previous = self._get(restaurant_name)
+        if previous is None:
+            return
+
+        actions = [
+            {
+                "Delete": {
+                    "TableName": self.restaurants_table_name,
+                    "Key": {"name": restaurant_name},
+                    **self._unchanged_since(previous)
+                }
+            }
+        ]
+        actions += [
+            {
+                "Delete": {
+                    "TableName": self.index_table_name,
+                    "Key": restaurant_index.theme_posting_key(theme, restaurant_name)
+                }
+            }
+            for theme in set(previous.get("themes", []))
+        ]
+        previous_geo_key = restaurant_index.geo_posting_key(previous)
+        if previous_geo_key:
+            actions.append({"Delete": {"TableName": self.index_table_name, "Key": previous_geo_key}})
+        self._transact(actions, theme_deltas={theme: -1 for theme in set(previous.get("themes", []))})
+
+    @staticmethod
+    def _unchanged_since(previous: dict | None) -> dict:
+        """
+        Condition of the restaurant write: the indexed attributes are still the ones read before computing the index
+        updates, otherwise a concurrent write would make the theme counts drift.
+        """
+        if previous is None:
+            return {
+                "ConditionExpression": "attribute_not_exists(#name)",
+                "ExpressionAttributeNames": {"#name": "name"}
+            }
+        conditions, names, values = [], {}, {}
+        for i, attribute in enumerate(INDEXED_ATTRIBUTES):
+            names[f"#a{i}"] = attribute
+            if attribute in previous:
+                conditions.append(f"#a{i} = :a{i}")
+                values[f":a{i}"] = previous[attribute]
+            else:
+                conditions.append(f"attribute_not_exists(#a{i})")
+        condition = {"ConditionExpression": " AND ".join(conditions), "ExpressionAttributeNames": names}
+        if values:
+            condition["ExpressionAttributeValues"] = values
+        return condition
+
+    @staticmethod
+    def _retry_concurrent_writes(write) -> None:
+        for _ in range(WRITE_ATTEMPTS):
+            try:
+                write()
+                return
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "TransactionCanceledException":
+                    raise
+                reasons = {reason.get("Code") for reason in e.response.get("CancellationReasons", [])}
+                if not reasons & {"ConditionalCheckFailed", "TransactionConflict"}:
+                    raise
+        raise ConcurrentWriteError(f"restaurant write still conflicting after {WRITE_ATTEMPTS} attempts")
+
+    def _get(self, restaurant_name: str) -> dict | None:
+        response = self._restaurants_table.get_item(Key={"name": restaurant_name}, ConsistentRead=True)
+        return response.get("Item")
+
+    def _transact(self, actions: list[dict], theme_deltas: dict[str, int]) -> None:
+        facets_update = restaurant_index.theme_facets_update(self.index_table_name, theme_deltas)
+        actions = actions + ([facets_update] if facets_update else [])
+        actions = actions + [restaurant_index.catalog_version_increment(self.index_table_name)]
+        if len(actions) > MAX_TRANSACTION_ITEMS:
+            raise ValueError(f"too many themes: a restaurant write is limited to {MAX_TRANSACTION_ITEMS} index updates")
+        self._dynamo_client.transact_write_items(TransactItems=actions)
@@ -0,0 +1,49 @@
+"""
+Parallel scan of a whole DynamoDB table, split in `TotalSegments` segments scanned concurrently.
+"""
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+
+
+def scan_segment(dynamo_client, segment: int, total_segments: int, **scan_kwargs) -> list[dict]:
+    """
+    Reads all the items of one segment, following `LastEvaluatedKey` until the end of the segment.
+    """
+    items = []
+    while True:
+        response = dynamo_client.scan(Segment=segment, TotalSegments=total_segments, **scan_kwargs)
+        items.extend(response["Items"])
+        if "LastEvaluatedKey" not in response:
+            return items
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def parallel_scan(
+        dynamo_client,
+        total_segments: int,
+        sort_by: Sequence[str],
+        convert: Callable[[dict], dict] | None = None,
+        **scan_kwargs
+) -> list[dict]:
+    """
+    Reads all the items of a table with `total_segments` concurrent segment scans.
+
+    `dynamo_client` must be a boto3 client (clients are thread safe, resources are not): the `meta.client` of a
+    DynamoDB resource also returns plain python types. The items of a low-level client can be converted with
+    `convert`. The merged items are sorted by the `sort_by` attributes, so the result does not depend on the number of
+    segments.
+    """
+    if total_segments == 1:
+        items = scan_segment(dynamo_client, 0, 1, **scan_kwargs)
+    else:
+        with ThreadPoolExecutor(max_workers=total_segments) as executor:
+            segments = executor.map(
+                lambda segment: scan_segment(dynamo_client, segment, total_segments, **scan_kwargs),
+                range(total_segments)
+            )
+            items = [item for segment_items in segments for item in segment_items]
+
+    if convert:
+        items = [convert(item) for item in items]
+
+    return sorted(items, key=lambda item: tuple(item[attribute] for attribute in sort_by))
@@ -0,0 +1,298 @@
+"""
+Boolean theme queries of `POST /restaurants/search`, e.g.:
+
+    cartoon AND NOT "rick and morty"
+    (netflix OR movie) AND NOT "house of cards"
+
+Operators are the upper case words AND, OR and NOT (NOT binds tighter than AND, which binds tighter than OR), and
+parentheses. A theme is a quoted string, or the words between two operators (`rick and morty` is one theme).
+
+A query must be bounded, i.e. its results must be a subset of the restaurants of some of its themes: `NOT cartoon`, or
+`cartoon OR NOT netflix`, would need the whole catalog and are rejected.
+
+Queries are evaluated on the posting lists of the restaurant index (the names of the restaurants of each theme), as
+bitmaps: each restaurant name gets a bit, each posting list is an `int`, and the set operations are bitwise. Python
+ints being infinite two's complement, `~` is the complement of a set within an unbounded universe, which is never
+materialized. The planner (`evaluate`):
+
+* fetches the posting lists of the positive themes concurrently, before evaluating anything
+* evaluates the terms of an AND from the most selective to the least, and stops as soon as the intersection is empty
+* only fetches the posting lists of the excluded themes when the intersection they apply to is not already empty
+"""
+import re
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+# max number of distinct themes in one query, i.e. of posting lists read
+MAX_THEMES = 10
+
+# max number of posting lists read concurrently
+MAX_CONCURRENT_LOOKUPS = 8
+
+
+class InvalidQueryError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Theme:
+    name: str
+
+    def __str__(self) -> str:
+        return f'"{self.name}"'
+
+
+@dataclass(frozen=True)
+class Not:
+    term: "Node"
+
+    def __str__(self) -> str:
+        return f"NOT {self.term}"
+
+
+@dataclass(frozen=True)
+class And:
+    terms: tuple["Node", ...]
+
+    def __str__(self) -> str:
+        return f"({' AND '.join(str(term) for term in self.terms)})"
+
+
+@dataclass(frozen=True)
+class Or:
+    terms: tuple["Node", ...]
+
+    def __str__(self) -> str:
+        return f"({' OR '.join(str(term) for term in self.terms)})"
+
+
+Node = Theme | Not | And | Or
+
+_TOKENS = re.compile(r'\s*(?:(?P<paren>[()])|"(?P<quoted>[^"]*)"|(?P<word>[^\s()"]+))')
+_OPERATORS = ("AND", "OR", "NOT")
+
+
+def _tokenize(query: str) -> list[tuple[str, str]]:
+    """
+    (kind, value) tokens: ("op", "AND"), ("paren", "("), ("theme", "rick and morty")...
+    """
+    tokens = []
+    words = []
+
+    def end_theme():
+        if words:
+            tokens.append(("theme", " ".join(words)))
+            words.clear()
+
+    position = 0
+    query = query.strip()
+    while position < len(query):
+        match = _TOKENS.match(query, position)
+        if not match:
+            raise InvalidQueryError(f"unexpected character at position {position}: {query[position]!r}")
+        position = match.end()
+        if match["paren"]:
+            end_theme()
+            tokens.append(("paren", match["paren"]))
+        elif match["quoted"] is not None:
+            end_theme()
+            tokens.append(("theme", match["quoted"].strip()))
+        elif match["word"] in _OPERATORS:
+            end_theme()
+            tokens.append(("op", match["word"]))
+        else:
+            words.append(match["word"])
+    end_theme()
+    return tokens
+
+
+class _Parser:
+
+    def __init__(self, tokens: list[tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> tuple[str, str] | None:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def accept(self, kind: str, value: str | None = None) -> bool:
+        token = self.peek()
+        if token and token[0] == kind and (value is None or token[1] == value):
+            self.position += 1
+            return True
+        return False
+
+    def parse(self) -> Node:
+        node = self.or_expression()
+        if self.peek():
+            raise InvalidQueryError(f"unexpected {self.peek()[1]!r}")
+        return node
+
+    def or_expression(self) -> Node:
+        terms = [self.and_expression()]
+        while self.accept("op", "OR"):
+            terms.append(self.and_expression())
+        return terms[0] if len(terms) == 1 else Or(tuple(terms))
+
+    def and_expression(self) -> Node:
+        terms = [self.not_expression()]
+        while self.accept("op", "AND"):
+            terms.append(self.not_expression())
+        return terms[0] if len(terms) == 1 else And(tuple(terms))
+
+    def not_expression(self) -> Node:
+        if self.accept("op", "NOT"):
+            term = self.not_expression()
+            # NOT NOT x is x
+            return term.term if isinstance(term, Not) else Not(term)
+        return self.atom()
+
+    def atom(self) -> Node:
+        token = self.peek()
+        if token is None:
+            raise InvalidQueryError("unexpected end of query")
+        if self.accept("paren", "("):
+            node = self.or_expression()
+            if not self.accept("paren", ")"):
+                raise InvalidQueryError("missing closing parenthesis")
+            return node
+        if token[0] == "theme" and token[1]:
+            self.position += 1
+            return Theme(token[1])
+        raise InvalidQueryError(f"expected a theme, got {token[1]!r}")
+
+
+def parse(query: str) -> Node:
+    """
+    Parses and validates a query: raises `InvalidQueryError` if it is malformed, unbounded or has too many themes.
+    """
+    node = _Parser(_tokenize(query)).parse()
+    if not bounded(node):
+        raise InvalidQueryError("a query cannot only exclude themes")
+    if len(themes(node)) > MAX_THEMES:
+        raise InvalidQueryError(f"a query can have at most {MAX_THEMES} themes")
+    return node
+
+
+def bounded(node: Node) -> bool:
+    """
+    True if the results of the query are within the restaurants of its (positive) themes.
+    """
+    if isinstance(node, Theme):
+        return True
+    if isinstance(node, Not):
+        return False
+    if isinstance(node, And):
+        return any(bounded(term) for term in node.terms)
+    return all(bounded(term) for term in node.terms)
+
+
+def themes(node: Node) -> set[str]:
+    if isinstance(node, Theme):
+        return {node.name}
+    if isinstance(node, Not):
+        return themes(node.term)
+    return {theme for term in node.terms for theme in themes(term)}
+
+
+def positive_themes(node: Node) -> set[str]:
+    """
+    Themes whose posting lists are always needed (the ones that are not excluded).
+    """
+    if isinstance(node, Theme):
+        return {node.name}
+    if isinstance(node, Not):
+        return set()
+    return {theme for term in node.terms for theme in positive_themes(term)}
+
+
+class Bitmaps:
+    """
+    Restaurant names as bits of python ints.
+    """
+
+    def __init__(self):
+        self._bits: dict[str, int] = {}
+        self._names: list[str] = []
+
+    def of(self, names: Iterable[str]) -> int:
+        bits = []
+        for name in names:
+            bit = self._bits.get(name)
+            if bit is None:
+                bit = self._bits[name] = len(self._names)
+                self._names.append(name)
+            bits.append(bit)
+
+        # built at once, in linear time, rather than with one `|=` (i.e. one copy of the int) per bit
+        data = bytearray(len(self._names) // 8 + 1)
+        for bit in bits:
+            data[bit >> 3] |= 1 << (bit & 7)
+        return int.from_bytes(data, "little")
+
+    def names(self, bitmap: int) -> list[str]:
+        if bitmap < 0:
+            raise ValueError("unbounded bitmap")
+        # lowest bit first, in linear time
+        return [self._names[bit] for bit, digit in enumerate(reversed(bin(bitmap)[2:])) if digit == "1"]
+
+
+class _Evaluation:
+
+    def __init__(self, read_posting_list: Callable[[str], list[str]], prefetched: dict[str, int], bitmaps: Bitmaps):
+        self.read_posting_list = read_posting_list
+        self.posting_lists = prefetched
+        self.bitmaps = bitmaps
+
+    def posting_list(self, theme: str) -> int:
+        if theme not in self.posting_lists:
+            self.posting_lists[theme] = self.bitmaps.of(self.read_posting_list(theme))
+        return self.posting_lists[theme]
+
+    def estimated_size(self, node: Node) -> float:
+        """
+        Upper bound of the number of results of a bounded node, from the posting lists read so far.
+        """
+        if isinstance(node, Theme):
+            return self.posting_lists[node.name].bit_count()
+        if isinstance(node, And):
+            return min(self.estimated_size(term) for term in node.terms if bounded(term))
+        return sum(self.estimated_size(term) for term in node.terms)
+
+    def evaluate(self, node: Node) -> int:
+        if isinstance(node, Theme):
+            return self.posting_list(node.name)
+        if isinstance(node, Not):
+            return ~self.evaluate(node.term)
+        if isinstance(node, Or):
+            result = 0
+            for term in node.terms:
+                result |= self.evaluate(term)
+            return result
+
+        # AND: most selective bounded terms first, then the exclusions, as long as something is left
+        included = sorted((term for term in node.terms if bounded(term)), key=self.estimated_size)
+        excluded = [term for term in node.terms if not bounded(term)]
+        result = ~0
+        for term in included + excluded:
+            result &= self.evaluate(term)
+            if result == 0:
+                break
+        return result
+
+
+def evaluate(node: Node, read_posting_list: Callable[[str], list[str]]) -> list[str]:
+    """
+    Names of the restaurants matching the query, sorted. `read_posting_list(theme)` returns the names of the
+    restaurants of a theme; it is called concurrently.
+    """
+    bitmaps = Bitmaps()
+    prefetch = sorted(positive_themes(node))
+    with ThreadPoolExecutor(max_workers=min(len(prefetch), MAX_CONCURRENT_LOOKUPS)) as executor:
+        posting_lists = dict(zip(prefetch, executor.map(read_posting_list, prefetch)))
+    # bits are assigned in a single thread
+    prefetched = {theme: bitmaps.of(names) for theme, names in posting_lists.items()}
+
+    result = _Evaluation(read_posting_list, prefetched, bitmaps).evaluate(node)
+    return sorted(bitmaps.names(result))
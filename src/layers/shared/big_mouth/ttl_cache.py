@@ -0,0 +1,54 @@
+"""
+Warm-container read-through cache with a short TTL, for items that change but are polled (e.g. the status of an
+order): within the TTL, repeated reads of the same key are served by the container without touching DynamoDB.
+
+Unlike `CatalogCache`, entries are not tied to a version: a change is served at most `ttl_seconds` later. Missing
+items (`None`) are not cached, so that an item written right after a miss is found by the next read.
+"""
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from aws_lambda_powertools.logging import Logger
+
+logger = Logger(child=True)
+
+
+class TTLCache:
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024, name: str = "ttl cache"):
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._name = name
+        # key -> (expiry, value), least recently used first
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and now < entry[0]:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            self._log(key, hit=True)
+            return entry[1]
+
+        self.misses += 1
+        self._log(key, hit=False)
+        value = load()
+        if value is None:
+            self._entries.pop(key, None)
+            return None
+        self._entries[key] = (time.monotonic() + self._ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def _log(self, key: Hashable, hit: bool) -> None:
+        logger.info(
+            f"{self._name} hit" if hit else f"{self._name} miss",
+            extra={"cache_key": str(key), "cache_hits": self.hits, "cache_misses": self.misses}
+        )
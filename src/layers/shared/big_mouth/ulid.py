@@ -0,0 +1,115 @@
+"""
+ULIDs: unique ids sorted by creation time, e.g. "01J9ZQ3X5T8K4M2N6P7R9S0V1W".
+
+A ULID is a 48 bits timestamp in milliseconds followed by 80 random bits, written as 26 characters of Crockford's
+base 32. Ids are unique across containers without any coordination (two containers generating ids in the same
+millisecond collide with a probability of 2^-80), and their string order is their time order, so that a time range
+is a key range: `lower_bound(start)` <= id < `lower_bound(end)`.
+
+As DynamoDB partition keys, ULIDs are spread evenly by the hash of the whole key, their common time prefix
+notwithstanding. Within a container, ids of the same millisecond are made increasing by incrementing the random part
+of the previous one, so that they keep the order in which they were generated.
+"""
+import os
+import threading
+import time
+
+_CROCKFORD_BASE32 = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_DECODE = {char: i for i, char in enumerate(_CROCKFORD_BASE32)}
+
+TIMESTAMP_BITS = 48
+RANDOM_BITS = 80
+LENGTH = 26
+
+_MAX_RANDOM = (1 << RANDOM_BITS) - 1
+MAX_TIMESTAMP_MS = (1 << TIMESTAMP_BITS) - 1
+
+_lock = threading.Lock()
+_last_timestamp_ms = -1
+_last_random = 0
+
+
+def _encode(value: int) -> str:
+    chars = []
+    for _ in range(LENGTH):
+        chars.append(_CROCKFORD_BASE32[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def _decode(ulid: str) -> int:
+    if len(ulid) != LENGTH:
+        raise ValueError(f"a ULID has {LENGTH} characters: {ulid!r}")
+    value = 0
+    for char in ulid.upper():
+        if char not in _DECODE:
+            raise ValueError(f"invalid ULID character {char!r}: {ulid!r}")
+        value = value << 5 | _DECODE[char]
+    if value >> (TIMESTAMP_BITS + RANDOM_BITS):
+        raise ValueError(f"ULID out of range: {ulid!r}")
+    return value
+
+
+def new() -> str:
+    """
+    A new ULID, greater than the previous ones of this container.
+    """
+    global _last_timestamp_ms, _last_random
+    with _lock:
+        # a clock going backwards keeps the last timestamp rather than breaking the order
+        timestamp_ms = max(time.time_ns() // 1_000_000, _last_timestamp_ms)
+        if timestamp_ms == _last_timestamp_ms:
+            if _last_random == _MAX_RANDOM:
+                # 2^80 ids in a millisecond: wait for the next one
+                while timestamp_ms <= _last_timestamp_ms:
+                    timestamp_ms = time.time_ns() // 1_000_000
+                random_part = int.from_bytes(os.urandom(10))
+            else:
+                random_part = _last_random + 1
+        else:
+            random_part = int.from_bytes(os.urandom(10))
+        _last_timestamp_ms, _last_random = timestamp_ms, random_part
+    return _encode(timestamp_ms << RANDOM_BITS | random_part)
+
+
+def new_many(count: int) -> list[str]:
+    """
+    `count` new ULIDs, in increasing order.
+    """
+    return [new() for _ in range(count)]
+
+
+def timestamp_ms(ulid: str) -> int:
+    """
+    Creation time of a ULID, in milliseconds since the epoch.
+    """
+    return _decode(ulid) >> RANDOM_BITS
+
+
+def lower_bound(timestamp_ms: int) -> str:
+    """
+    Smallest ULID of a millisecond: the ids created from `timestamp_ms` on are greater or equal.
+    """
+    if not 0 <= timestamp_ms <= MAX_TIMESTAMP_MS:
+        raise ValueError(f"timestamp out of the range of ULIDs: {timestamp_ms}")
+    return _encode(timestamp_ms << RANDOM_BITS)
+
+
+def upper_bound(timestamp_ms: int) -> str:
+    """
+    Greatest ULID of a millisecond: the ids created up to `timestamp_ms` are lower or equal.
+    """
+    if not 0 <= timestamp_ms <= MAX_TIMESTAMP_MS:
+        raise ValueError(f"timestamp out of the range of ULIDs: {timestamp_ms}")
+    return _encode(timestamp_ms << RANDOM_BITS | _MAX_RANDOM)
+
+
+def is_valid(ulid: str) -> bool:
+    """
+    Case-insensitive, as the spec: the canonical form of a valid id, as generated by `new`, is `ulid.upper()`.
+    """
+    try:
+        _decode(ulid)
+        return True
+    except (TypeError, ValueError):
+        return False
@@ -13,3 +13,23 @@ Feature ordering meals
     When The user orders a meal at Pizza Planet
     Then An order ID is returned synchronously
     And The event bus probe receives an order event for Pizza Planet
+
+  Scenario: Restaurants receive a batch of orders
+    Given A Cognito authenticated user
+    And A restaurant waiting for orders
+    When The user orders 12 meals at Fangtasia in one batch
+    Then 12 order IDs are returned synchronously
+    And The restaurant Fangtasia is notified of 12 orders
+
+  Scenario: The user follows the status of an order
+    Given A Cognito authenticated user
+    When The user orders a meal at Pizza Planet
+    Then An order ID is returned synchronously
+    And The order is PLACED at Pizza Planet
+
+  Scenario: The restaurant lists its recent orders
+    Given A Cognito authenticated user
+    And An IAM authenticated restaurant
+    When The user orders 3 meals at Pizza Planet in one batch
+    Then 3 order IDs are returned synchronously
+    And The 3 orders are the most recent orders of Pizza Planet
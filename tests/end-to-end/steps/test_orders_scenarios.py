@@ -1,12 +1,15 @@
 import json
+from urllib.parse import quote
 
+import botocore.session
 import requests
 from pytest_bdd import when, then, scenarios, parsers
 from requests import Response
+from requests_aws4auth import AWS4Auth
 
 from e2e_fixtures import  *
 from e2e_utils import temporary_queue_subscribed_to_sns, read_sqs_messages, temporary_queue_subscribed_to_event_bus
-from place_order_logic import Order
+from place_order_logic import Order, OrderBatch
 
 sqs_client = boto3.client("sqs")
 sns_client = boto3.client("sns")
@@ -19,6 +22,15 @@ def connect_restaurant_to_event_bus(restaurant_notification_topic_arn: str):
         yield tmp_queue.url
 
 
+@given("An IAM authenticated restaurant", target_fixture="restaurant_auth")
+def restaurant_auth() -> AWS4Auth:
+    return AWS4Auth(
+        refreshable_credentials=botocore.session.Session().get_credentials(),
+        service='execute-api',
+        region=boto3.session.Session().region_name
+    )
+
+
 @given("A probe on the event bus", target_fixture="event_bus_probe_queue_url")
 def connect_probe_to_event_bus(event_bus_name: str):
     with temporary_queue_subscribed_to_event_bus(
@@ -42,13 +54,25 @@ def place_order(order_api_url: str, restaurant_name: str, authenticated_user: Au
         data=Order(restaurantName=restaurant_name).model_dump_json()
     )
 
+@when(parsers.parse("The user orders {count:d} meals at {restaurant_name} in one batch"), target_fixture="place_order_response")
+def place_orders(order_api_url: str, count: int, restaurant_name: str, authenticated_user: AuthenticatedUser) -> Response:
+    print(f"placing {count} orders at {restaurant_name}")
+    return requests.post(
+        url=f"{order_api_url}/batch",
+        headers={
+            "Authorization": authenticated_user.id_token,
+            "Content-Type": "application/json"
+        },
+        data=OrderBatch(orders=[Order(restaurantName=restaurant_name)] * count).model_dump_json()
+    )
+
 @then("An order ID is returned synchronously")
 def check_place_order_response(place_order_response: Response):
     assert place_order_response.status_code == 200, place_order_response.text
     assert "application/json" in place_order_response.headers["Content-Type"]
     body = place_order_response.json()
     assert "orderId" in body
-    assert isinstance(body["orderId"], int)
+    assert isinstance(body["orderId"], str) and len(body["orderId"]) == 26
 
 @then(parsers.parse("The restaurant {restaurant_name} is notified of the order"))
 def expect_order_id_in_sqs(restaurant_name: str, restaurant_sqs_queue_url: str):
@@ -66,6 +90,27 @@ def expect_order_id_in_sqs(restaurant_name: str, restaurant_sqs_queue_url: str):
     assert "orderId" in order
     assert order["restaurantName"] == restaurant_name
 
+@then(parsers.parse("{count:d} order IDs are returned synchronously"))
+def check_place_orders_response(place_order_response: Response, count: int):
+    assert place_order_response.status_code == 200, place_order_response.text
+    orders = place_order_response.json()["orders"]
+    assert len(orders) == count
+    assert all(order["placed"] for order in orders)
+    assert len({order["orderId"] for order in orders}) == count
+
+@then(parsers.parse("The restaurant {restaurant_name} is notified of {count:d} orders"))
+def expect_order_ids_in_sqs(restaurant_name: str, count: int, restaurant_sqs_queue_url: str):
+
+    notifications = read_sqs_messages(
+        queue_url=restaurant_sqs_queue_url,
+        expected=count,
+        timeout_seconds=20
+    )
+
+    assert len(notifications) == count
+    for notification in notifications:
+        assert json.loads(notification["Message"])["restaurantName"] == restaurant_name
+
 @then(parsers.parse("The event bus probe receives an order event for {restaurant_name}"))
 def expect_order_event_in_event_bus_probe(restaurant_name: str, event_bus_probe_queue_url: str):
 
@@ -90,3 +135,43 @@ def expect_order_event_in_event_bus_probe(restaurant_name: str, event_bus_probe_
     assert restaurant_notification["source"] == "big-mouth"
     assert restaurant_notification["detail-type"] == 'restaurant_notified'
     assert restaurant_notification["detail"]["restaurantName"] == restaurant_name
+
+@then(parsers.parse("The order is {status} at {restaurant_name}"))
+def check_order_status(
+        order_api_url: str,
+        place_order_response: Response,
+        status: str,
+        restaurant_name: str,
+        authenticated_user: AuthenticatedUser
+):
+    order_id = place_order_response.json()["orderId"]
+    response = requests.get(
+        url=f"{order_api_url}/{order_id}",
+        headers={"Authorization": authenticated_user.id_token}
+    )
+    assert response.status_code == 200, response.text
+    assert "private" in response.headers["Cache-Control"]
+    order = response.json()
+    assert order["id"] == order_id
+    assert order["status"] == status
+    assert order["restaurantName"] == restaurant_name
+
+@then(parsers.parse("The {count:d} orders are the most recent orders of {restaurant_name}"))
+def check_restaurant_orders(
+        get_restaurant_api_url: str,
+        place_order_response: Response,
+        count: int,
+        restaurant_name: str,
+        restaurant_auth: AWS4Auth
+):
+    order_ids = [order["orderId"] for order in place_order_response.json()["orders"]]
+    response = requests.get(
+        url=f"{get_restaurant_api_url}/{quote(restaurant_name)}/orders",
+        params={"limit": count},
+        auth=restaurant_auth
+    )
+    assert response.status_code == 200, response.text
+    orders = response.json()
+    # newest first
+    assert [order["id"] for order in orders] == order_ids[::-1]
+    assert all(order["restaurantName"] == restaurant_name for order in orders)
@@ -0,0 +1,32 @@
+Feature Publishing events to EventBridge
+
+  Scenario: Events are sent 10 at a time
+    Given An event bus accepting every event
+    When I publish 25 events
+    Then 25 events are published
+    And They are sent in PutEvents calls of 10,10,5 events
+
+  Scenario: Large events are sent in calls of at most 256 KB
+    Given An event bus accepting every event
+    When I publish 5 events of 100 KB
+    Then 5 events are published
+    And They are sent in PutEvents calls of 2,2,1 events
+
+  Scenario: Only the failed entries are sent again
+    Given An event bus throttling the first 3 entries of its first call
+    When I publish 10 events
+    Then 10 events are published
+    And They are sent in PutEvents calls of 10,3 events
+    And The events 0,1,2 are published after 2 attempts
+
+  Scenario: A failed PutEvents call fails all its entries
+    Given An event bus rejecting every call with ThrottlingException
+    When I publish 3 events
+    Then 0 events are published
+    And The events 0,1,2 failed with ThrottlingException after 5 attempts
+
+  Scenario: Retries stop before the lambda times out
+    Given An event bus rejecting every call with ThrottlingException
+    When I publish 3 events with no time left for retries
+    Then 0 events are published
+    And The events 0,1,2 failed with ThrottlingException after 1 attempts
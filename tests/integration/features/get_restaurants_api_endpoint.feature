@@ -4,3 +4,26 @@ Feature GET restaurants API endpoint
     Given The get_restaurant handler
     When I call the restaurant API endpoint
     Then I get a list of 8 restaurants
+
+  Scenario: Paging through all restaurants
+    Given The get_restaurant handler
+    When I page through the restaurant API endpoint 3 restaurants at a time
+    Then I get 8 distinct restaurants in 3 pages
+
+  Scenario: Fetching the whole catalog in bulk
+    Given The get_restaurant handler
+    When I call the restaurant API endpoint in bulk mode
+    Then I get a list of 8 restaurants
+    And The restaurants are sorted by name
+
+  Scenario: Fetching only some fields of the restaurants
+    Given The get_restaurant handler
+    When I call the restaurant API endpoint for the fields name,image
+    Then I get a list of 8 restaurants
+    And The restaurants only have the fields name,image
+
+  Scenario: Revalidating the restaurant list
+    Given The get_restaurant handler
+    When I call the restaurant API endpoint
+    And I call the restaurant API endpoint again with the received ETag
+    Then I get a 304 Not Modified response
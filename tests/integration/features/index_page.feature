@@ -9,3 +9,8 @@ Feature Main page navigation
     Given The get_index lambda
     When I navigate to the main page
     Then I see 8 restaurants
+
+  Scenario: Main page is compressed for browsers accepting gzip
+    Given The get_index lambda
+    When I navigate to the main page accepting gzip
+    Then I see 8 restaurants
@@ -0,0 +1,9 @@
+Feature place order API endpoint
+
+  Scenario: An order whose event is too large fails alone
+    Given The place_order handler with a stubbed event bus
+    And The order_placed events of Pizza Planet exceed the size limit of PutEvents
+    When I order meals at Fangtasia,Pizza Planet,Shoney's in one batch
+    Then The orders at Fangtasia,Shoney's are placed and published
+    And The order at Pizza Planet is not placed, with the error EntryTooLarge
+    And The order at Pizza Planet is not stored
@@ -5,3 +5,46 @@ Feature search restaurants API endpoint
     When I search for the restaurant with theme cartoon
     Then I get a list of 4 restaurants
     And All restaurants have the theme cartoon
+
+  Scenario: Paging through themed restaurants
+    Given The search_restaurant handler
+    When I page through the restaurants with theme cartoon 3 at a time
+    Then I get 4 distinct restaurants in 2 pages
+
+  Scenario: Searching only some fields of themed restaurants
+    Given The search_restaurant handler
+    When I search for the name of the restaurants with theme cartoon
+    Then I get a list of 4 restaurants
+    And The restaurants only have the fields name
+
+  Scenario: Searching restaurants with a boolean query on themes
+    Given The search_restaurant handler
+    When I search for the restaurants matching netflix AND NOT "toy story"
+    Then I get a list of 1 restaurants
+    And All restaurants have the theme netflix
+
+  Scenario: Searching restaurants of several themes
+    Given The search_restaurant handler
+    When I search for the restaurants matching cartoon OR netflix
+    Then I get a list of 6 restaurants
+
+  Scenario: Autocompleting restaurant names
+    Given The search_restaurant handler
+    When I ask for the suggestions of fang
+    Then The first suggestion is Fangtasia
+
+  Scenario: Autocompleting themes with a typo
+    Given The search_restaurant handler
+    When I ask for the suggestions of cartono
+    Then The first suggestion is cartoon
+
+  Scenario: Searching the nearest restaurants
+    Given The search_restaurant handler
+    When I search for the 3 restaurants nearest to 51.5136,-0.1365
+    Then I get a list of 3 restaurants
+    And The nearest restaurant is Fangtasia
+
+  Scenario: Counting the restaurants of each theme
+    Given The search_restaurant handler
+    When I get the themes
+    Then The theme cartoon has 4 restaurants
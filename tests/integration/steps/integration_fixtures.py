@@ -53,6 +53,14 @@ def app_restaurant_url(app_root_url: str) -> str:
 def restaurant_table_name(db_stack_outputs: dict) -> str:
     return db_stack_outputs["RestaurantsTableName"]
 
+@fixture
+def restaurant_index_table_name(db_stack_outputs: dict) -> str:
+    return db_stack_outputs["RestaurantIndexTableName"]
+
+@fixture
+def orders_table_name(db_stack_outputs: dict) -> str:
+    return db_stack_outputs["OrdersTableName"]
+
 @fixture
 def app_order_url(app_root_url: str) -> str:
     return f"{app_root_url}/orders"
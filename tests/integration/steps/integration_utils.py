@@ -0,0 +1,34 @@
+import threading
+
+from botocore.exceptions import ClientError
+
+
+class StubEventsClient:
+    """
+    Stands for the events client: records the entries of each PutEvents call, and fails the ones it is told to.
+    """
+
+    def __init__(self, throttled_entries: int = 0, error_code: str | None = None):
+        # entries failed by the first call
+        self.throttled_entries = throttled_entries
+        # code of the ClientError of every call
+        self.error_code = error_code
+        self.calls: list[list[dict]] = []
+        self._lock = threading.Lock()
+
+    def put_events(self, Entries: list[dict]) -> dict:
+        with self._lock:
+            self.calls.append(Entries)
+            first_call = len(self.calls) == 1
+        if self.error_code:
+            raise ClientError({"Error": {"Code": self.error_code, "Message": "stubbed"}}, "PutEvents")
+        failed = self.throttled_entries if first_call else 0
+        return {
+            "FailedEntryCount": failed,
+            "Entries": [
+                {"ErrorCode": "ThrottlingException", "ErrorMessage": "stubbed"}
+                if position < failed
+                else {"EventId": f"event-{len(self.calls)}-{position}"}
+                for position in range(len(Entries))
+            ]
+        }
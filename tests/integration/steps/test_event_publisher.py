@@ -0,0 +1,80 @@
+from pytest_bdd import given, when, then, scenarios, parsers
+
+from big_mouth.event_publisher import EventPublisher, PublishResult
+from integration_utils import StubEventsClient
+
+scenarios("../features/event_publisher.feature")
+
+
+class NoTimeLeftContext:
+    """
+    Lambda context with just the time kept to answer left (see `EventPublisher.reserve_seconds`).
+    """
+
+    def __init__(self, publisher: EventPublisher):
+        self._remaining_ms = int(publisher.reserve_seconds * 1000)
+
+    def get_remaining_time_in_millis(self) -> int:
+        return self._remaining_ms
+
+
+@given("An event bus accepting every event", target_fixture="events_client")
+def accepting_event_bus() -> StubEventsClient:
+    return StubEventsClient()
+
+@given(parsers.parse("An event bus throttling the first {count:d} entries of its first call"), target_fixture="events_client")
+def throttling_event_bus(count: int) -> StubEventsClient:
+    return StubEventsClient(throttled_entries=count)
+
+@given(parsers.parse("An event bus rejecting every call with {error_code}"), target_fixture="events_client")
+def rejecting_event_bus(error_code: str) -> StubEventsClient:
+    return StubEventsClient(error_code=error_code)
+
+
+def publisher(events_client: StubEventsClient) -> EventPublisher:
+    # short backoffs: the scenarios do not wait for real throttling to end
+    return EventPublisher("bus", events_client=events_client, base_backoff_seconds=0.001)
+
+def events(count: int, padding_kb: int = 0) -> list[tuple[str, dict]]:
+    return [("order_placed", {"index": index, "padding": "x" * padding_kb * 1024}) for index in range(count)]
+
+
+@when(parsers.parse("I publish {count:d} events"), target_fixture="publish_results")
+def publish_events(events_client: StubEventsClient, count: int) -> list[PublishResult]:
+    return publisher(events_client).publish_all(events(count))
+
+@when(parsers.parse("I publish {count:d} events of {size:d} KB"), target_fixture="publish_results")
+def publish_large_events(events_client: StubEventsClient, count: int, size: int) -> list[PublishResult]:
+    return publisher(events_client).publish_all(events(count, padding_kb=size))
+
+@when(parsers.parse("I publish {count:d} events with no time left for retries"), target_fixture="publish_results")
+def publish_events_without_time(events_client: StubEventsClient, count: int) -> list[PublishResult]:
+    events_publisher = publisher(events_client)
+    return events_publisher.publish_all(events(count), NoTimeLeftContext(events_publisher))
+
+
+@then(parsers.parse("{count:d} events are published"))
+def check_published_count(publish_results: list[PublishResult], count: int):
+    assert sum(1 for result in publish_results if result.published) == count
+
+@then(parsers.parse("They are sent in PutEvents calls of {sizes} events"))
+def check_put_events_calls(events_client: StubEventsClient, sizes: str):
+    # the calls of different batches are sent concurrently, in any order
+    assert sorted(len(entries) for entries in events_client.calls) == sorted(int(size) for size in sizes.split(","))
+
+@then(parsers.parse("The events {indexes} are published after {attempts:d} attempts"))
+def check_retried_events(events_client: StubEventsClient, publish_results: list[PublishResult], indexes: str, attempts: int):
+    retried = [int(index) for index in indexes.split(",")]
+    for index, result in enumerate(publish_results):
+        assert result.published
+        assert result.attempts == (attempts if index in retried else 1)
+    # the retry call only sends the failed entries, not the whole batch again
+    assert events_client.calls[-1] == [publish_results[index].entry for index in retried]
+
+@then(parsers.parse("The events {indexes} failed with {error_code} after {attempts:d} attempts"))
+def check_failed_events(publish_results: list[PublishResult], indexes: str, error_code: str, attempts: int):
+    for index in (int(index) for index in indexes.split(",")):
+        result = publish_results[index]
+        assert not result.published
+        assert result.error_code == error_code
+        assert result.attempts == attempts
@@ -9,9 +9,10 @@ scenarios("../features/get_restaurants_api_endpoint.feature")
 
 
 @given("The get_restaurant handler", target_fixture="get_restaurants_handler")
-def get_restaurants(restaurant_table_name: str) -> Callable:
+def get_restaurants(restaurant_table_name: str, restaurant_index_table_name: str) -> Callable:
     # re-create the environment variables expected by the Lambda function
     os.environ["TABLE_NAME"] = restaurant_table_name
+    os.environ["INDEX_TABLE_NAME"] = restaurant_index_table_name
     os.environ["POWERTOOLS_SERVICE_NAME"] = "production-ready-serverless"
     import get_restaurants
     return get_restaurants.handler
@@ -26,9 +27,84 @@ def get_restaurants(get_restaurants_handler) -> dict:
         },
         {})
 
+@when("I call the restaurant API endpoint in bulk mode", target_fixture="restaurants_response")
+def get_restaurants_in_bulk(get_restaurants_handler) -> dict:
+    return get_restaurants_handler(
+        {
+            "path": "/restaurants",
+            "httpMethod": "GET",
+            "queryStringParameters": {"bulk": "true"}
+        },
+        {})
+
+@when(parsers.parse("I call the restaurant API endpoint for the fields {fields}"), target_fixture="restaurants_response")
+def get_restaurant_fields(get_restaurants_handler, fields: str) -> dict:
+    return get_restaurants_handler(
+        {
+            "path": "/restaurants",
+            "httpMethod": "GET",
+            "multiValueQueryStringParameters": {"fields": [fields]}
+        },
+        {})
+
 @then(parsers.parse("I get a list of {count:d} restaurants"))
 def check_get_restaurant_count(restaurants_response: dict, count: int):
     assert restaurants_response['statusCode'] == 200
     assert "application/json" in restaurants_response["multiValueHeaders"]['Content-Type']
     body = json.loads(restaurants_response['body'])
     assert len(body) == count
+
+@then(parsers.parse("The restaurants only have the fields {fields}"))
+def check_restaurant_fields(restaurants_response: dict, fields: str):
+    for restaurant in json.loads(restaurants_response['body']):
+        assert set(restaurant) == set(fields.split(","))
+
+@then("The restaurants are sorted by name")
+def check_restaurants_sorted(restaurants_response: dict):
+    names = [restaurant["name"] for restaurant in json.loads(restaurants_response['body'])]
+    assert names == sorted(names)
+
+@when(parsers.parse("I page through the restaurant API endpoint {page_size:d} restaurants at a time"), target_fixture="restaurant_pages")
+def page_through_restaurants(get_restaurants_handler, page_size: int) -> list[list[dict]]:
+    pages = []
+    cursor = None
+    while True:
+        query_string = {"limit": str(page_size)}
+        if cursor:
+            query_string["cursor"] = cursor
+        response = get_restaurants_handler(
+            {
+                "path": "/restaurants",
+                "httpMethod": "GET",
+                "queryStringParameters": query_string
+            },
+            {})
+        assert response['statusCode'] == 200
+        pages.append(json.loads(response['body']))
+
+        cursor = response["multiValueHeaders"].get("X-Next-Cursor", [None])[0]
+        if not cursor:
+            return pages
+
+@then(parsers.parse("I get {count:d} distinct restaurants in {page_count:d} pages"))
+def check_restaurant_pages(restaurant_pages: list[list[dict]], count: int, page_count: int):
+    assert len(restaurant_pages) == page_count
+    names = {restaurant["name"] for page in restaurant_pages for restaurant in page}
+    assert len(names) == count
+
+@when("I call the restaurant API endpoint again with the received ETag", target_fixture="revalidation_response")
+def revalidate_restaurants(get_restaurants_handler, restaurants_response: dict) -> dict:
+    etag = restaurants_response["multiValueHeaders"]["ETag"][0]
+    return get_restaurants_handler(
+        {
+            "path": "/restaurants",
+            "httpMethod": "GET",
+            "headers": {"If-None-Match": etag}
+        },
+        {})
+
+@then("I get a 304 Not Modified response")
+def check_not_modified(restaurants_response: dict, revalidation_response: dict):
+    assert revalidation_response['statusCode'] == 304
+    assert not revalidation_response['body']
+    assert revalidation_response["multiValueHeaders"]["ETag"] == restaurants_response["multiValueHeaders"]["ETag"]
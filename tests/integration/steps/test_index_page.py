@@ -1,3 +1,5 @@
+import base64
+import gzip
 import os
 from typing import Callable
 
@@ -32,6 +34,20 @@ def get_index_page(get_index_handler) -> dict:
         },
         {})
 
+@when("I navigate to the main page accepting gzip", target_fixture="index_response")
+def get_compressed_index_page(get_index_handler) -> dict:
+    response = get_index_handler(
+        {
+            "path": "/",
+            "httpMethod": "GET",
+            "headers": {"Accept-Encoding": "gzip, deflate"}
+        },
+        {})
+    assert response["isBase64Encoded"]
+    assert response["multiValueHeaders"]["Content-Encoding"] == ["gzip"]
+    # decoded as API Gateway and the browser would do
+    return {**response, "body": gzip.decompress(base64.b64decode(response["body"])).decode()}
+
 @then("I see the big mouth logo")
 def check_big_mouth_logo(index_response: dict):
     assert index_response['statusCode'] == 200
@@ -0,0 +1,76 @@
+import os
+from typing import Callable
+
+from integration_fixtures import *
+from integration_utils import StubEventsClient
+import json
+from pytest_bdd import given, when, then, scenarios, parsers
+
+from big_mouth.event_publisher import MAX_PUT_EVENTS_BYTES
+from big_mouth.order_store import OrderStore
+
+scenarios("../features/place_order_api_endpoint.feature")
+
+
+@given("The place_order handler with a stubbed event bus", target_fixture="place_order_module")
+def place_order_handler(orders_table_name: str, events_client: StubEventsClient, monkeypatch):
+    # re-create the environment variables expected by the Lambda function
+    os.environ["ORDERS_TABLE_NAME"] = orders_table_name
+    os.environ.setdefault("EVENT_BUS_NAME", "stubbed")
+    os.environ["POWERTOOLS_SERVICE_NAME"] = "production-ready-serverless"
+    os.environ["POWERTOOLS_METRICS_NAMESPACE"] = "production-ready-serverless"
+    import place_order
+    # the events are recorded instead of published
+    monkeypatch.setitem(place_order.publisher.__dict__, "events_client", events_client)
+    return place_order
+
+@fixture
+def events_client() -> StubEventsClient:
+    return StubEventsClient()
+
+@given(parsers.parse("The order_placed events of {restaurant_name} exceed the size limit of PutEvents"))
+def oversized_events(place_order_module, restaurant_name: str, monkeypatch):
+    import place_order_logic
+    order_placed_detail = place_order_logic.order_placed_detail
+
+    def padded_order_placed_detail(order_id, order) -> dict:
+        detail = order_placed_detail(order_id, order)
+        if order.restaurantName == restaurant_name:
+            detail["padding"] = "x" * MAX_PUT_EVENTS_BYTES
+        return detail
+
+    monkeypatch.setattr(place_order_logic, "order_placed_detail", padded_order_placed_detail)
+
+
+@when(parsers.parse("I order meals at {restaurant_names} in one batch"), target_fixture="placed_orders")
+def place_orders(place_order_module, restaurant_names: str) -> dict:
+    restaurant_names = restaurant_names.split(",")
+    response = place_order_module.handler(
+        {
+            "path": "/orders/batch",
+            "httpMethod": "POST",
+            "body": json.dumps({"orders": [{"restaurantName": name} for name in restaurant_names]})
+        },
+        {})
+    assert response["statusCode"] == 200
+    # results are in the order of the batch
+    return dict(zip(restaurant_names, json.loads(response["body"])["orders"]))
+
+
+@then(parsers.parse("The orders at {restaurant_names} are placed and published"))
+def check_placed_orders(placed_orders: dict, events_client: StubEventsClient, orders_table_name: str, restaurant_names: str):
+    orders = OrderStore(orders_table_name)
+    published = [json.loads(entry["Detail"])["orderId"] for entries in events_client.calls for entry in entries]
+    for name in restaurant_names.split(","):
+        assert placed_orders[name]["placed"]
+        assert placed_orders[name]["orderId"] in published
+        assert orders.get_order(placed_orders[name]["orderId"])["restaurantName"] == name
+
+@then(parsers.parse("The order at {restaurant_name} is not placed, with the error {error_code}"))
+def check_failed_order(placed_orders: dict, restaurant_name: str, error_code: str):
+    assert placed_orders[restaurant_name]["placed"] is False
+    assert placed_orders[restaurant_name]["error"] == error_code
+
+@then(parsers.parse("The order at {restaurant_name} is not stored"))
+def check_order_deleted(placed_orders: dict, orders_table_name: str, restaurant_name: str):
+    assert OrderStore(orders_table_name).get_order(placed_orders[restaurant_name]["orderId"]) is None
@@ -9,9 +9,10 @@ scenarios("../features/search_restaurants_api_endpoint.feature")
 
 
 @given("The search_restaurant handler", target_fixture="search_restaurants_handler")
-def search_restaurants(restaurant_table_name: str) -> Callable:
+def search_restaurants(restaurant_table_name: str, restaurant_index_table_name: str) -> Callable:
     # re-create the environment variables expected by the Lambda function
     os.environ["TABLE_NAME"] = restaurant_table_name
+    os.environ["INDEX_TABLE_NAME"] = restaurant_index_table_name
     os.environ["POWERTOOLS_SERVICE_NAME"] = "production-ready-serverless"
     import search_restaurants
     return search_restaurants.handler
@@ -29,6 +30,84 @@ def search_restaurants(search_restaurants_handler: Callable, theme: str) -> dict
     )
 
 
+@when(parsers.parse("I search for the {fields} of the restaurants with theme {theme}"), target_fixture="restaurants_response")
+def search_restaurant_fields(search_restaurants_handler: Callable, fields: str, theme: str) -> dict:
+    return search_restaurants_handler(
+        {
+            "path": "/restaurants/search",
+            "httpMethod": "POST",
+            "body": json.dumps({"theme": theme, "fields": fields.split(",")})
+        },
+        {}
+    )
+
+
+@when(parsers.parse("I search for the restaurants matching {query}"), target_fixture="restaurants_response")
+def search_restaurants_by_query(search_restaurants_handler: Callable, query: str) -> dict:
+    return search_restaurants_handler(
+        {
+            "path": "/restaurants/search",
+            "httpMethod": "POST",
+            "body": json.dumps({"query": query})
+        },
+        {}
+    )
+
+
+@when(parsers.parse("I page through the restaurants with theme {theme} {page_size:d} at a time"), target_fixture="restaurant_pages")
+def page_through_search_results(search_restaurants_handler: Callable, theme: str, page_size: int) -> list[list[dict]]:
+    pages = []
+    cursor = None
+    while True:
+        response = search_restaurants_handler(
+            {
+                "path": "/restaurants/search",
+                "httpMethod": "POST",
+                "body": json.dumps({"theme": theme, "limit": page_size, "cursor": cursor})
+            },
+            {}
+        )
+        assert response['statusCode'] == 200
+        pages.append(json.loads(response['body']))
+
+        cursor = response["multiValueHeaders"].get("X-Next-Cursor", [None])[0]
+        if not cursor:
+            return pages
+
+
+@when(
+    parsers.parse("I search for the {count:d} restaurants nearest to {latitude:f},{longitude:f}"),
+    target_fixture="restaurants_response"
+)
+def search_nearby_restaurants(search_restaurants_handler: Callable, count: int, latitude: float, longitude: float) -> dict:
+    return search_restaurants_handler(
+        {
+            "path": "/restaurants/nearby",
+            "httpMethod": "POST",
+            "body": json.dumps({"latitude": latitude, "longitude": longitude, "limit": count})
+        },
+        {}
+    )
+
+
+@when("I get the themes", target_fixture="themes_response")
+def get_themes(search_restaurants_handler: Callable) -> dict:
+    return search_restaurants_handler({"path": "/restaurants/themes", "httpMethod": "GET"}, {})
+
+
+@when(parsers.parse("I ask for the suggestions of {q}"), target_fixture="suggestions_response")
+def autocomplete(search_restaurants_handler: Callable, q: str) -> dict:
+    return search_restaurants_handler(
+        {
+            "path": "/restaurants/autocomplete",
+            "httpMethod": "GET",
+            "queryStringParameters": {"q": q},
+            "multiValueQueryStringParameters": {"q": [q]}
+        },
+        {}
+    )
+
+
 @then(parsers.parse("I get a list of {count:d} restaurants"))
 def check_search_restaurants_count(restaurants_response: dict, count: int):
     print(restaurants_response)
@@ -45,3 +124,36 @@ def check_search_restaurants_count(restaurants_response: dict, theme: str):
     body = json.loads(restaurants_response['body'])
     for restaurant in body:
         assert theme in restaurant['themes']
+
+
+@then(parsers.parse("I get {count:d} distinct restaurants in {page_count:d} pages"))
+def check_search_result_pages(restaurant_pages: list[list[dict]], count: int, page_count: int):
+    assert len(restaurant_pages) == page_count
+    names = {restaurant["name"] for page in restaurant_pages for restaurant in page}
+    assert len(names) == count
+
+
+@then(parsers.parse("The restaurants only have the fields {fields}"))
+def check_restaurant_fields(restaurants_response: dict, fields: str):
+    for restaurant in json.loads(restaurants_response['body']):
+        assert set(restaurant) == set(fields.split(","))
+
+
+@then(parsers.parse("The first suggestion is {text}"))
+def check_first_suggestion(suggestions_response: dict, text: str):
+    assert suggestions_response['statusCode'] == 200
+    assert json.loads(suggestions_response['body'])[0]["text"] == text
+
+
+@then(parsers.parse("The nearest restaurant is {name}"))
+def check_nearest_restaurant(restaurants_response: dict, name: str):
+    restaurants = json.loads(restaurants_response['body'])
+    assert restaurants[0]["name"] == name
+    assert restaurants == sorted(restaurants, key=lambda restaurant: restaurant["distanceKm"])
+
+
+@then(parsers.parse("The theme {theme} has {count:d} restaurants"))
+def check_theme_count(themes_response: dict, theme: str, count: int):
+    assert themes_response['statusCode'] == 200
+    counts = {facet["theme"]: facet["count"] for facet in json.loads(themes_response['body'])}
+    assert counts[theme] == count